@@ -38,7 +38,7 @@
 
 --works
 
-\copy openalex.works (id, doi, title, display_name, publication_year, publication_date, type, cited_by_count, is_retracted, is_paratext, cited_by_api_url, abstract_inverted_index, language) from program 'gunzip -c csv-files/works.csv.gz' csv header
+\copy openalex.works (id, doi, title, display_name, publication_year, publication_date, type, cited_by_count, is_retracted, is_paratext, cited_by_api_url, abstract_inverted_index, abstract, language, updated_date) from program 'gunzip -c csv-files/works.csv.gz' csv header
 \copy openalex.works_primary_locations (work_id, source_id, landing_page_url, pdf_url, is_oa, version, license) from program 'gunzip -c csv-files/works_primary_locations.csv.gz' csv header
 \copy openalex.works_locations (work_id, source_id, landing_page_url, pdf_url, is_oa, version, license) from program 'gunzip -c csv-files/works_locations.csv.gz' csv header
 \copy openalex.works_best_oa_locations (work_id, source_id, landing_page_url, pdf_url, is_oa, version, license) from program 'gunzip -c csv-files/works_best_oa_locations.csv.gz' csv header
@@ -52,3 +52,11 @@
 \copy openalex.works_referenced_works (work_id, referenced_work_id) from program 'gunzip -c csv-files/works_referenced_works.csv.gz' csv header
 \copy openalex.works_related_works (work_id, related_work_id) from program 'gunzip -c csv-files/works_related_works.csv.gz' csv header
 
+--identifiers
+
+\copy openalex.identifiers (entity_id, entity_type, id_type, id_value) from program 'gunzip -c csv-files/authors_identifiers.csv.gz' csv header
+\copy openalex.identifiers (entity_id, entity_type, id_type, id_value) from program 'gunzip -c csv-files/concepts_identifiers.csv.gz' csv header
+\copy openalex.identifiers (entity_id, entity_type, id_type, id_value) from program 'gunzip -c csv-files/institutions_identifiers.csv.gz' csv header
+\copy openalex.identifiers (entity_id, entity_type, id_type, id_value) from program 'gunzip -c csv-files/publishers_identifiers.csv.gz' csv header
+\copy openalex.identifiers (entity_id, entity_type, id_type, id_value) from program 'gunzip -c csv-files/sources_identifiers.csv.gz' csv header
+\copy openalex.identifiers (entity_id, entity_type, id_type, id_value) from program 'gunzip -c csv-files/works_identifiers.csv.gz' csv header
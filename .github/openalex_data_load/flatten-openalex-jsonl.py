@@ -5,11 +5,29 @@ Main takeaway from this script should be the detailed structure of the data used
 use this as a reference for flattening api retrieved data into flat data for database insertions.
 """
 
+import abc
+import argparse
+import contextlib
 import csv
+import functools
 import glob
 import gzip
 import json
 import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# the repo root, to share the abstract reconstruction and duckdb schema with the app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from parse.abstract import invert_abstract  # noqa: E402
+from parse.identifiers import identifier_rows  # noqa: E402
+from testing import finalize_duckdb_schema, setup_duckdb_schema  # noqa: E402
 
 SNAPSHOT_DIR = "openalex-snapshot"
 CSV_DIR = "csv-files"
@@ -18,6 +36,7 @@ if not os.path.exists(CSV_DIR):
     os.mkdir(CSV_DIR)
 
 FILES_PER_ENTITY = int(os.environ.get("OPENALEX_DEMO_FILES_PER_ENTITY", "0"))
+SHARDS_DIR = os.path.join(CSV_DIR, "shards")
 
 csv_files = {
     "authors": {
@@ -279,7 +298,9 @@ csv_files = {
                 "is_paratext",
                 "cited_by_api_url",
                 "abstract_inverted_index",
+                "abstract",
                 "language",
+                "updated_date",
             ],
         },
         "primary_locations": {
@@ -376,36 +397,280 @@ csv_files = {
     },
 }
 
+# the identifier index (see parse/identifiers.py) of every entity with ids, loaded into
+# a single identifiers table
+for entity, entity_spec in csv_files.items():
+    if "ids" in entity_spec:
+        entity_spec["identifiers"] = {
+            "name": os.path.join(CSV_DIR, f"{entity}_identifiers.csv.gz"),
+            "table": "identifiers",
+            "columns": ["entity_id", "entity_type", "id_type", "id_value"],
+        }
 
-def flatten_authors():
-    file_spec = csv_files["authors"]
-
-    with (
-        gzip.open(file_spec["authors"]["name"], "wt", encoding="utf-8") as authors_csv,
-        gzip.open(file_spec["ids"]["name"], "wt", encoding="utf-8") as ids_csv,
-        gzip.open(
-            file_spec["counts_by_year"]["name"], "wt", encoding="utf-8"
-        ) as counts_by_year_csv,
-    ):
-        authors_writer = csv.DictWriter(
-            authors_csv,
-            fieldnames=file_spec["authors"]["columns"],
-            extrasaction="ignore",
-        )
-        authors_writer.writeheader()
 
-        ids_writer = csv.DictWriter(ids_csv, fieldnames=file_spec["ids"]["columns"])
-        ids_writer.writeheader()
+def partitions(entity):
+    """
+    Get the snapshot partition files of an entity, limited to FILES_PER_ENTITY if set.
+    """
+    file_names = sorted(
+        glob.glob(os.path.join(SNAPSHOT_DIR, "data", entity, "*", "*.gz"))
+    )
+    if FILES_PER_ENTITY:
+        file_names = file_names[:FILES_PER_ENTITY]
+    return file_names
+
+
+# output formats: gzipped csv files, parquet files, or tables in a duckdb database
+OUTPUT_FORMATS = ("csv", "parquet", "duckdb")
+DUCKDB_PATH = "openalex_data.duckdb"
+DUCKDB_SCHEMA = "openalex"
+# number of rows buffered per table before they are written as a record batch
+BATCH_ROWS = 50_000
+
+BOOLEAN_COLUMNS = {"any_repository_has_fulltext", "is_major_topic"}
+INTEGER_COLUMNS = {"year", "level", "hierarchy_level", "publication_year"}
+FLOAT_COLUMNS = {"score", "latitude", "longitude"}
+
+
+def column_type(column):
+    """
+    Get the arrow type of a column in csv_files, based on its name.
+    """
+    if column in BOOLEAN_COLUMNS or column.startswith("is_"):
+        return pa.bool_()
+    if column in INTEGER_COLUMNS or column.endswith("_count"):
+        return pa.int64()
+    if column in FLOAT_COLUMNS:
+        return pa.float64()
+    return pa.string()
+
+
+def to_string(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def to_int(value):
+    return None if value in (None, "") else int(value)
+
+
+def to_float(value):
+    return None if value in (None, "") else float(value)
+
+
+def to_bool(value):
+    if isinstance(value, str):
+        return {"true": True, "false": False}.get(value.lower())
+    return value
+
 
-        counts_by_year_writer = csv.DictWriter(
-            counts_by_year_csv, fieldnames=file_spec["counts_by_year"]["columns"]
+def table_name(file_spec):
+    """
+    Get the table name for a csv_files entry, e.g. works_authorships: the "table" of the
+    entry if it has one, the name of its file otherwise
+    """
+    return file_spec.get("table") or os.path.basename(file_spec["name"]).split(".")[0]
+
+
+class CsvTableWriter:
+    """
+    Writes rows to a gzipped csv file with a header.
+    """
+
+    def __init__(self, file_spec, **kwargs):
+        self.csv_file = gzip.open(file_spec["name"], "wt", encoding="utf-8")  # noqa: SIM115
+        self.writer = init_dict_writer(self.csv_file, file_spec, **kwargs)
+
+    def writerow(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        self.csv_file.close()
+
+
+class ArrowTableWriter(abc.ABC):
+    """
+    Buffers rows as typed columns and writes them as arrow record batches of
+    BATCH_ROWS rows. Keys of a row that are not in the columns are ignored.
+    Subclasses implement write_batch().
+    """
+
+    def __init__(self, file_spec, **_):
+        self.columns = file_spec["columns"]
+        self.schema = pa.schema([(c, column_type(c)) for c in self.columns])
+        converters = {
+            pa.bool_(): to_bool,
+            pa.int64(): to_int,
+            pa.float64(): to_float,
+        }
+        self.converters = [
+            converters.get(field.type, to_string) for field in self.schema
+        ]
+        self.buffer = {column: [] for column in self.columns}
+        self.rows = 0
+
+    def writerow(self, row):
+        for column, convert in zip(self.columns, self.converters, strict=True):
+            self.buffer[column].append(convert(row.get(column)))
+        self.rows += 1
+        if self.rows >= BATCH_ROWS:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        batch = pa.RecordBatch.from_pydict(self.buffer, schema=self.schema)
+        self.buffer = {column: [] for column in self.columns}
+        self.rows = 0
+        self.write_batch(batch)
+
+    @abc.abstractmethod
+    def write_batch(self, batch):
+        """Write an arrow record batch with the columns of the writer."""
+
+    def write_table(self, table):
+        self.flush()
+        for batch in table.to_batches(max_chunksize=BATCH_ROWS):
+            self.write_batch(batch)
+
+    def close(self):
+        self.flush()
+
+
+class ParquetTableWriter(ArrowTableWriter):
+    """
+    Writes rows to a parquet file next to where the csv file would be,
+    e.g. csv-files/works_authorships.parquet
+    """
+
+    def __init__(self, file_spec, **kwargs):
+        super().__init__(file_spec, **kwargs)
+        self.writer = pq.ParquetWriter(
+            parquet_name(file_spec), self.schema, compression="zstd"
         )
-        counts_by_year_writer.writeheader()
 
-        files_done = 0
-        for jsonl_file_name in glob.glob(
-            os.path.join(SNAPSHOT_DIR, "data", "authors", "*", "*.gz")
-        ):
+    def write_batch(self, batch):
+        self.writer.write_batch(batch)
+
+    def close(self):
+        super().close()
+        self.writer.close()
+
+
+class DuckDBTableWriter(ArrowTableWriter):
+    """
+    Inserts rows into the table with the same name in the DUCKDB_SCHEMA schema,
+    e.g. openalex.works_authorships, as created by setup_duckdb_schema in testing.py.
+
+    Only the columns that exist in the table are inserted. If the table does not exist,
+    it is created from the columns in csv_files. Tables with a primary key are upserted.
+    """
+
+    def __init__(self, file_spec, **kwargs):
+        super().__init__(file_spec, **kwargs)
+        self.conn = duckdb_connection()
+        self.table = f"{DUCKDB_SCHEMA}.{table_name(file_spec)}"
+        self.conn.execute(f"CREATE SCHEMA IF NOT EXISTS {DUCKDB_SCHEMA}")
+        table_columns = {
+            row[0]
+            for row in self.conn.execute(
+                "SELECT column_name FROM duckdb_columns() "
+                "WHERE schema_name = ? AND table_name = ?",
+                [DUCKDB_SCHEMA, table_name(file_spec)],
+            ).fetchall()
+        }
+        if not table_columns:
+            self.create_table()
+            table_columns = set(self.columns)
+        has_primary_key = self.conn.execute(
+            "SELECT count(*) FROM duckdb_constraints() "
+            "WHERE schema_name = ? AND table_name = ? "
+            "AND constraint_type = 'PRIMARY KEY'",
+            [DUCKDB_SCHEMA, table_name(file_spec)],
+        ).fetchone()[0]
+        self.insert_columns = ", ".join(c for c in self.columns if c in table_columns)
+        self.insert = "INSERT OR REPLACE" if has_primary_key else "INSERT"
+
+    def create_table(self):
+        duckdb_types = {
+            pa.bool_(): "BOOLEAN",
+            pa.int64(): "BIGINT",
+            pa.float64(): "DOUBLE",
+            pa.string(): "TEXT",
+        }
+        columns = ", ".join(
+            f"{field.name} {duckdb_types[field.type]}" for field in self.schema
+        )
+        self.conn.execute(f"CREATE TABLE {self.table} ({columns})")
+
+    def write_batch(self, batch):
+        self.conn.register("batch", batch)
+        try:
+            self.conn.execute(
+                f"{self.insert} INTO {self.table} BY NAME "
+                f"SELECT {self.insert_columns} FROM batch"
+            )
+        finally:
+            self.conn.unregister("batch")
+
+
+def parquet_name(file_spec):
+    return file_spec["name"].removesuffix(".csv.gz") + ".parquet"
+
+
+@functools.cache
+def duckdb_connection():
+    """
+    Get the connection to DUCKDB_PATH, opened once per process.
+    """
+    return duckdb.connect(DUCKDB_PATH)
+
+
+TABLE_WRITERS = {
+    "csv": CsvTableWriter,
+    "parquet": ParquetTableWriter,
+    "duckdb": DuckDBTableWriter,
+}
+
+
+@contextlib.contextmanager
+def open_writers(file_spec, output="csv", ignore_extras=()):
+    """
+    Open a writer for every table in file_spec (an entry of csv_files).
+
+    Args:
+        file_spec: the table specs of an entity, e.g. csv_files["works"]
+        output: one of OUTPUT_FORMATS
+        ignore_extras: the tables for which keys of a row that are not in the
+            columns are ignored instead of raising an error (csv only)
+    Yields:
+        dict of table name: writer with a writerow(row) method
+    """
+    writers = {}
+    try:
+        for table, spec in file_spec.items():
+            kwargs = {"extrasaction": "ignore"} if table in ignore_extras else {}
+            writers[table] = TABLE_WRITERS[output](spec, **kwargs)
+        yield writers
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+
+def flatten_authors(jsonl_file_names=None, file_spec=None, output="csv"):
+    if file_spec is None:
+        file_spec = csv_files["authors"]
+
+    with open_writers(file_spec, output, ignore_extras={"authors"}) as writers:
+        authors_writer = writers["authors"]
+        ids_writer = writers["ids"]
+        identifiers_writer = writers["identifiers"]
+        counts_by_year_writer = writers["counts_by_year"]
+
+        for jsonl_file_name in jsonl_file_names or partitions("authors"):
             print(jsonl_file_name)
             with gzip.open(jsonl_file_name, "r") as authors_jsonl:
                 for author_json in authors_jsonl:
@@ -430,31 +695,25 @@ def flatten_authors():
                     if author_ids := author.get("ids"):
                         author_ids["author_id"] = author_id
                         ids_writer.writerow(author_ids)
+                        for row in identifier_rows(author_id, author_ids, "authors"):
+                            identifiers_writer.writerow(row)
 
                     # counts_by_year
                     if counts_by_year := author.get("counts_by_year"):
                         for count_by_year in counts_by_year:
                             count_by_year["author_id"] = author_id
                             counts_by_year_writer.writerow(count_by_year)
-            files_done += 1
-            if FILES_PER_ENTITY and files_done >= FILES_PER_ENTITY:
-                break
 
 
-def flatten_topics():
-    with gzip.open(
-        csv_files["topics"]["topics"]["name"], "wt", encoding="utf-8"
-    ) as topics_csv:
-        topics_writer = csv.DictWriter(
-            topics_csv, fieldnames=csv_files["topics"]["topics"]["columns"]
-        )
-        topics_writer.writeheader()
+def flatten_topics(jsonl_file_names=None, file_spec=None, output="csv"):
+    if file_spec is None:
+        file_spec = csv_files["topics"]
+
+    with open_writers(file_spec, output) as writers:
+        topics_writer = writers["topics"]
 
         seen_topic_ids = set()
-        files_done = 0
-        for jsonl_file_name in glob.glob(
-            os.path.join(SNAPSHOT_DIR, "data", "topics", "*", "*.gz")
-        ):
+        for jsonl_file_name in jsonl_file_names or partitions("topics"):
             print(jsonl_file_name)
             with gzip.open(jsonl_file_name, "r") as topics_jsonl:
                 for line in topics_jsonl:
@@ -475,64 +734,23 @@ def flatten_topics():
                     del topic["ids"]
                     del topic["created_date"]
                     topics_writer.writerow(topic)
-            files_done += 1
-            if FILES_PER_ENTITY and files_done >= FILES_PER_ENTITY:
-                break
-
-
-def flatten_concepts():
-    with (
-        gzip.open(
-            csv_files["concepts"]["concepts"]["name"], "wt", encoding="utf-8"
-        ) as concepts_csv,
-        gzip.open(
-            csv_files["concepts"]["ancestors"]["name"], "wt", encoding="utf-8"
-        ) as ancestors_csv,
-        gzip.open(
-            csv_files["concepts"]["counts_by_year"]["name"], "wt", encoding="utf-8"
-        ) as counts_by_year_csv,
-        gzip.open(
-            csv_files["concepts"]["ids"]["name"], "wt", encoding="utf-8"
-        ) as ids_csv,
-        gzip.open(
-            csv_files["concepts"]["related_concepts"]["name"], "wt", encoding="utf-8"
-        ) as related_concepts_csv,
-    ):
-        concepts_writer = csv.DictWriter(
-            concepts_csv,
-            fieldnames=csv_files["concepts"]["concepts"]["columns"],
-            extrasaction="ignore",
-        )
-        concepts_writer.writeheader()
-
-        ancestors_writer = csv.DictWriter(
-            ancestors_csv, fieldnames=csv_files["concepts"]["ancestors"]["columns"]
-        )
-        ancestors_writer.writeheader()
 
-        counts_by_year_writer = csv.DictWriter(
-            counts_by_year_csv,
-            fieldnames=csv_files["concepts"]["counts_by_year"]["columns"],
-        )
-        counts_by_year_writer.writeheader()
 
-        ids_writer = csv.DictWriter(
-            ids_csv, fieldnames=csv_files["concepts"]["ids"]["columns"]
-        )
-        ids_writer.writeheader()
+def flatten_concepts(jsonl_file_names=None, file_spec=None, output="csv"):
+    if file_spec is None:
+        file_spec = csv_files["concepts"]
 
-        related_concepts_writer = csv.DictWriter(
-            related_concepts_csv,
-            fieldnames=csv_files["concepts"]["related_concepts"]["columns"],
-        )
-        related_concepts_writer.writeheader()
+    with open_writers(file_spec, output, ignore_extras={"concepts"}) as writers:
+        concepts_writer = writers["concepts"]
+        ancestors_writer = writers["ancestors"]
+        counts_by_year_writer = writers["counts_by_year"]
+        ids_writer = writers["ids"]
+        identifiers_writer = writers["identifiers"]
+        related_concepts_writer = writers["related_concepts"]
 
         seen_concept_ids = set()
 
-        files_done = 0
-        for jsonl_file_name in glob.glob(
-            os.path.join(SNAPSHOT_DIR, "data", "concepts", "*", "*.gz")
-        ):
+        for jsonl_file_name in jsonl_file_names or partitions("concepts"):
             print(jsonl_file_name)
             with gzip.open(jsonl_file_name, "r") as concepts_jsonl:
                 for concept_json in concepts_jsonl:
@@ -560,6 +778,8 @@ def flatten_concepts():
                             concept_ids.get("umls_cui"), ensure_ascii=False
                         )
                         ids_writer.writerow(concept_ids)
+                        for row in identifier_rows(concept_id, concept_ids, "concepts"):
+                            identifiers_writer.writerow(row)
 
                     if ancestors := concept.get("ancestors"):
                         for ancestor in ancestors:
@@ -587,57 +807,22 @@ def flatten_concepts():
                                     }
                                 )
 
-            files_done += 1
-            if FILES_PER_ENTITY and files_done >= FILES_PER_ENTITY:
-                break
-
-
-def flatten_institutions():
-    file_spec = csv_files["institutions"]
-
-    with (
-        gzip.open(
-            file_spec["institutions"]["name"], "wt", encoding="utf-8"
-        ) as institutions_csv,
-        gzip.open(file_spec["ids"]["name"], "wt", encoding="utf-8") as ids_csv,
-        gzip.open(file_spec["geo"]["name"], "wt", encoding="utf-8") as geo_csv,
-        gzip.open(
-            file_spec["associated_institutions"]["name"], "wt", encoding="utf-8"
-        ) as associated_institutions_csv,
-        gzip.open(
-            file_spec["counts_by_year"]["name"], "wt", encoding="utf-8"
-        ) as counts_by_year_csv,
-    ):
-        institutions_writer = csv.DictWriter(
-            institutions_csv,
-            fieldnames=file_spec["institutions"]["columns"],
-            extrasaction="ignore",
-        )
-        institutions_writer.writeheader()
 
-        ids_writer = csv.DictWriter(ids_csv, fieldnames=file_spec["ids"]["columns"])
-        ids_writer.writeheader()
+def flatten_institutions(jsonl_file_names=None, file_spec=None, output="csv"):
+    if file_spec is None:
+        file_spec = csv_files["institutions"]
 
-        geo_writer = csv.DictWriter(geo_csv, fieldnames=file_spec["geo"]["columns"])
-        geo_writer.writeheader()
-
-        associated_institutions_writer = csv.DictWriter(
-            associated_institutions_csv,
-            fieldnames=file_spec["associated_institutions"]["columns"],
-        )
-        associated_institutions_writer.writeheader()
-
-        counts_by_year_writer = csv.DictWriter(
-            counts_by_year_csv, fieldnames=file_spec["counts_by_year"]["columns"]
-        )
-        counts_by_year_writer.writeheader()
+    with open_writers(file_spec, output, ignore_extras={"institutions"}) as writers:
+        institutions_writer = writers["institutions"]
+        ids_writer = writers["ids"]
+        identifiers_writer = writers["identifiers"]
+        geo_writer = writers["geo"]
+        associated_institutions_writer = writers["associated_institutions"]
+        counts_by_year_writer = writers["counts_by_year"]
 
         seen_institution_ids = set()
 
-        files_done = 0
-        for jsonl_file_name in glob.glob(
-            os.path.join(SNAPSHOT_DIR, "data", "institutions", "*", "*.gz")
-        ):
+        for jsonl_file_name in jsonl_file_names or partitions("institutions"):
             print(jsonl_file_name)
             with gzip.open(jsonl_file_name, "r") as institutions_jsonl:
                 for institution_json in institutions_jsonl:
@@ -667,6 +852,10 @@ def flatten_institutions():
                     if institution_ids := institution.get("ids"):
                         institution_ids["institution_id"] = institution_id
                         ids_writer.writerow(institution_ids)
+                        for row in identifier_rows(
+                            institution_id, institution_ids, "institutions"
+                        ):
+                            identifiers_writer.writerow(row)
 
                     # geo
                     if institution_geo := institution.get("geo"):
@@ -699,47 +888,20 @@ def flatten_institutions():
                             count_by_year["institution_id"] = institution_id
                             counts_by_year_writer.writerow(count_by_year)
 
-            files_done += 1
-            if FILES_PER_ENTITY and files_done >= FILES_PER_ENTITY:
-                break
-
-
-def flatten_publishers():
-    with (
-        gzip.open(
-            csv_files["publishers"]["publishers"]["name"], "wt", encoding="utf-8"
-        ) as publishers_csv,
-        gzip.open(
-            csv_files["publishers"]["counts_by_year"]["name"], "wt", encoding="utf-8"
-        ) as counts_by_year_csv,
-        gzip.open(
-            csv_files["publishers"]["ids"]["name"], "wt", encoding="utf-8"
-        ) as ids_csv,
-    ):
-        publishers_writer = csv.DictWriter(
-            publishers_csv,
-            fieldnames=csv_files["publishers"]["publishers"]["columns"],
-            extrasaction="ignore",
-        )
-        publishers_writer.writeheader()
 
-        counts_by_year_writer = csv.DictWriter(
-            counts_by_year_csv,
-            fieldnames=csv_files["publishers"]["counts_by_year"]["columns"],
-        )
-        counts_by_year_writer.writeheader()
+def flatten_publishers(jsonl_file_names=None, file_spec=None, output="csv"):
+    if file_spec is None:
+        file_spec = csv_files["publishers"]
 
-        ids_writer = csv.DictWriter(
-            ids_csv, fieldnames=csv_files["publishers"]["ids"]["columns"]
-        )
-        ids_writer.writeheader()
+    with open_writers(file_spec, output, ignore_extras={"publishers"}) as writers:
+        publishers_writer = writers["publishers"]
+        counts_by_year_writer = writers["counts_by_year"]
+        ids_writer = writers["ids"]
+        identifiers_writer = writers["identifiers"]
 
         seen_publisher_ids = set()
 
-        files_done = 0
-        for jsonl_file_name in glob.glob(
-            os.path.join(SNAPSHOT_DIR, "data", "publishers", "*", "*.gz")
-        ):
+        for jsonl_file_name in jsonl_file_names or partitions("publishers"):
             print(jsonl_file_name)
             with gzip.open(jsonl_file_name, "r") as concepts_jsonl:
                 for publisher_json in concepts_jsonl:
@@ -768,53 +930,30 @@ def flatten_publishers():
                     if publisher_ids := publisher.get("ids"):
                         publisher_ids["publisher_id"] = publisher_id
                         ids_writer.writerow(publisher_ids)
+                        for row in identifier_rows(
+                            publisher_id, publisher_ids, "publishers"
+                        ):
+                            identifiers_writer.writerow(row)
 
                     if counts_by_year := publisher.get("counts_by_year"):
                         for count_by_year in counts_by_year:
                             count_by_year["publisher_id"] = publisher_id
                             counts_by_year_writer.writerow(count_by_year)
 
-            files_done += 1
-            if FILES_PER_ENTITY and files_done >= FILES_PER_ENTITY:
-                break
-
-
-def flatten_sources():
-    with (
-        gzip.open(
-            csv_files["sources"]["sources"]["name"], "wt", encoding="utf-8"
-        ) as sources_csv,
-        gzip.open(
-            csv_files["sources"]["ids"]["name"], "wt", encoding="utf-8"
-        ) as ids_csv,
-        gzip.open(
-            csv_files["sources"]["counts_by_year"]["name"], "wt", encoding="utf-8"
-        ) as counts_by_year_csv,
-    ):
-        sources_writer = csv.DictWriter(
-            sources_csv,
-            fieldnames=csv_files["sources"]["sources"]["columns"],
-            extrasaction="ignore",
-        )
-        sources_writer.writeheader()
 
-        ids_writer = csv.DictWriter(
-            ids_csv, fieldnames=csv_files["sources"]["ids"]["columns"]
-        )
-        ids_writer.writeheader()
+def flatten_sources(jsonl_file_names=None, file_spec=None, output="csv"):
+    if file_spec is None:
+        file_spec = csv_files["sources"]
 
-        counts_by_year_writer = csv.DictWriter(
-            counts_by_year_csv,
-            fieldnames=csv_files["sources"]["counts_by_year"]["columns"],
-        )
-        counts_by_year_writer.writeheader()
+    with open_writers(file_spec, output, ignore_extras={"sources"}) as writers:
+        sources_writer = writers["sources"]
+        ids_writer = writers["ids"]
+        identifiers_writer = writers["identifiers"]
+        counts_by_year_writer = writers["counts_by_year"]
 
         seen_source_ids = set()
 
-        files_done = 0
-        for jsonl_file_name in glob.glob(
-            os.path.join(SNAPSHOT_DIR, "data", "sources", "*", "*.gz")
-        ):
+        for jsonl_file_name in jsonl_file_names or partitions("sources"):
             print(jsonl_file_name)
             with gzip.open(jsonl_file_name, "r") as sources_jsonl:
                 for source_json in sources_jsonl:
@@ -838,77 +977,36 @@ def flatten_sources():
                         source_ids["source_id"] = source_id
                         source_ids["issn"] = json.dumps(source_ids.get("issn"))
                         ids_writer.writerow(source_ids)
+                        for row in identifier_rows(source_id, source_ids, "sources"):
+                            identifiers_writer.writerow(row)
 
                     if counts_by_year := source.get("counts_by_year"):
                         for count_by_year in counts_by_year:
                             count_by_year["source_id"] = source_id
                             counts_by_year_writer.writerow(count_by_year)
 
-            files_done += 1
-            if FILES_PER_ENTITY and files_done >= FILES_PER_ENTITY:
-                break
-
-
-def flatten_works():
-    file_spec = csv_files["works"]
-
-    with (
-        gzip.open(file_spec["works"]["name"], "wt", encoding="utf-8") as works_csv,
-        gzip.open(
-            file_spec["primary_locations"]["name"], "wt", encoding="utf-8"
-        ) as primary_locations_csv,
-        gzip.open(file_spec["locations"]["name"], "wt", encoding="utf-8") as locations,
-        gzip.open(
-            file_spec["best_oa_locations"]["name"], "wt", encoding="utf-8"
-        ) as best_oa_locations,
-        gzip.open(
-            file_spec["authorships"]["name"], "wt", encoding="utf-8"
-        ) as authorships_csv,
-        gzip.open(file_spec["biblio"]["name"], "wt", encoding="utf-8") as biblio_csv,
-        gzip.open(file_spec["topics"]["name"], "wt", encoding="utf-8") as topics_csv,
-        gzip.open(
-            file_spec["concepts"]["name"], "wt", encoding="utf-8"
-        ) as concepts_csv,
-        gzip.open(file_spec["ids"]["name"], "wt", encoding="utf-8") as ids_csv,
-        gzip.open(file_spec["mesh"]["name"], "wt", encoding="utf-8") as mesh_csv,
-        gzip.open(
-            file_spec["open_access"]["name"], "wt", encoding="utf-8"
-        ) as open_access_csv,
-        gzip.open(
-            file_spec["referenced_works"]["name"], "wt", encoding="utf-8"
-        ) as referenced_works_csv,
-        gzip.open(
-            file_spec["related_works"]["name"], "wt", encoding="utf-8"
-        ) as related_works_csv,
-    ):
-        works_writer = init_dict_writer(
-            works_csv, file_spec["works"], extrasaction="ignore"
-        )
-        primary_locations_writer = init_dict_writer(
-            primary_locations_csv, file_spec["primary_locations"]
-        )
-        locations_writer = init_dict_writer(locations, file_spec["locations"])
-        best_oa_locations_writer = init_dict_writer(
-            best_oa_locations, file_spec["best_oa_locations"]
-        )
-        authorships_writer = init_dict_writer(authorships_csv, file_spec["authorships"])
-        biblio_writer = init_dict_writer(biblio_csv, file_spec["biblio"])
-        topics_writer = init_dict_writer(topics_csv, file_spec["topics"])
-        concepts_writer = init_dict_writer(concepts_csv, file_spec["concepts"])
-        ids_writer = init_dict_writer(ids_csv, file_spec["ids"], extrasaction="ignore")
-        mesh_writer = init_dict_writer(mesh_csv, file_spec["mesh"])
-        open_access_writer = init_dict_writer(open_access_csv, file_spec["open_access"])
-        referenced_works_writer = init_dict_writer(
-            referenced_works_csv, file_spec["referenced_works"]
-        )
-        related_works_writer = init_dict_writer(
-            related_works_csv, file_spec["related_works"]
-        )
 
-        files_done = 0
-        for jsonl_file_name in glob.glob(
-            os.path.join(SNAPSHOT_DIR, "data", "works", "*", "*.gz")
-        ):
+def flatten_works(jsonl_file_names=None, file_spec=None, output="csv"):
+    if file_spec is None:
+        file_spec = csv_files["works"]
+
+    with open_writers(file_spec, output, ignore_extras={"works", "ids"}) as writers:
+        works_writer = writers["works"]
+        primary_locations_writer = writers["primary_locations"]
+        locations_writer = writers["locations"]
+        best_oa_locations_writer = writers["best_oa_locations"]
+        authorships_writer = writers["authorships"]
+        biblio_writer = writers["biblio"]
+        topics_writer = writers["topics"]
+        concepts_writer = writers["concepts"]
+        ids_writer = writers["ids"]
+        identifiers_writer = writers["identifiers"]
+        mesh_writer = writers["mesh"]
+        open_access_writer = writers["open_access"]
+        referenced_works_writer = writers["referenced_works"]
+        related_works_writer = writers["related_works"]
+
+        for jsonl_file_name in jsonl_file_names or partitions("works"):
             print(jsonl_file_name)
             with gzip.open(jsonl_file_name, "r") as works_jsonl:
                 for work_json in works_jsonl:
@@ -922,6 +1020,7 @@ def flatten_works():
 
                     # works
                     if (abstract := work.get("abstract_inverted_index")) is not None:
+                        work["abstract"] = invert_abstract(abstract)
                         work["abstract_inverted_index"] = json.dumps(
                             abstract, ensure_ascii=False
                         )
@@ -1041,6 +1140,8 @@ def flatten_works():
                     if ids := work.get("ids"):
                         ids["work_id"] = work_id
                         ids_writer.writerow(ids)
+                        for row in identifier_rows(work_id, ids, "works"):
+                            identifiers_writer.writerow(row)
 
                     # mesh
                     for mesh in work.get("mesh"):
@@ -1069,10 +1170,6 @@ def flatten_works():
                                 {"work_id": work_id, "related_work_id": related_work}
                             )
 
-            files_done += 1
-            if FILES_PER_ENTITY and files_done >= FILES_PER_ENTITY:
-                break
-
 
 def init_dict_writer(csv_file, file_spec, **kwargs):
     writer = csv.DictWriter(csv_file, fieldnames=file_spec["columns"], **kwargs)
@@ -1080,11 +1177,190 @@ def init_dict_writer(csv_file, file_spec, **kwargs):
     return writer
 
 
+FLATTENERS = {
+    "topics": flatten_topics,
+    "authors": flatten_authors,
+    "concepts": flatten_concepts,
+    "institutions": flatten_institutions,
+    "publishers": flatten_publishers,
+    "sources": flatten_sources,
+    "works": flatten_works,
+}
+
+# entities that can occur in multiple partitions, deduplicated on their id
+DEDUPLICATED_ENTITIES = {"topics", "concepts", "institutions", "publishers", "sources"}
+
+
+def shard_spec(entity, jsonl_file_name):
+    """
+    Get a copy of the csv_files spec of an entity, with the output files renamed to
+    per-partition shards: SHARDS_DIR/<entity>/<updated_date=...>_<part>/<file name>.
+    The columns (and table names) are the same as in csv_files.
+    """
+    partition = os.path.basename(os.path.dirname(jsonl_file_name))
+    part = os.path.basename(jsonl_file_name).split(".")[0]
+    shard_dir = os.path.join(SHARDS_DIR, entity, f"{partition}_{part}")
+    os.makedirs(shard_dir, exist_ok=True)
+    return {
+        table: spec
+        | {
+            "name": os.path.join(shard_dir, os.path.basename(spec["name"])),
+        }
+        for table, spec in csv_files[entity].items()
+    }
+
+
+def flatten_partition(entity, jsonl_file_name, output="csv"):
+    """
+    Flatten a single partition file into its own shard files. Runs in a worker process.
+    Shards are written as csv files for csv output, and as parquet files otherwise.
+    """
+    file_spec = shard_spec(entity, jsonl_file_name)
+    FLATTENERS[entity]([jsonl_file_name], file_spec, shard_format(output))
+    return file_spec
+
+
+def shard_format(output):
+    # a duckdb database can only be written to by one process
+    return "csv" if output == "csv" else "parquet"
+
+
+def merge_shards(entity, file_specs, output="csv"):
+    """
+    Merge the shard files of an entity into the output (csv_files, parquet files or
+    duckdb tables) in partition order, and remove the shards afterwards.
+
+    For deduplicated entities, rows of an entity that was already written by an earlier
+    shard are skipped (the first column of every table is the entity id).
+    """
+    if shard_format(output) == "parquet":
+        merge_parquet_shards(entity, file_specs, output)
+        return
+
+    seen_ids = set()
+    with contextlib.ExitStack() as stack:
+        writers = {}
+        for table, spec in csv_files[entity].items():
+            csv_file = stack.enter_context(
+                gzip.open(spec["name"], "wt", encoding="utf-8")
+            )
+            writers[table] = (csv_file, init_dict_writer(csv_file, spec))
+
+        for file_spec in file_specs:
+            new_ids = None
+            if entity in DEDUPLICATED_ENTITIES:
+                with gzip.open(file_spec[entity]["name"], "rt", encoding="utf-8") as f:
+                    new_ids = {
+                        row[0] for row in csv.reader(f) if row[0] not in seen_ids
+                    }
+                new_ids.discard("id")
+                seen_ids |= new_ids
+
+            for table, spec in file_spec.items():
+                csv_file, writer = writers[table]
+                with gzip.open(spec["name"], "rt", encoding="utf-8") as shard:
+                    if new_ids is None:
+                        shard.readline()  # header
+                        shutil.copyfileobj(shard, csv_file)
+                    else:
+                        reader = csv.reader(shard)
+                        next(reader, None)  # header
+                        csv.writer(csv_file).writerows(
+                            row for row in reader if row[0] in new_ids
+                        )
+            shutil.rmtree(os.path.dirname(file_spec[entity]["name"]))
+
+
+def merge_parquet_shards(entity, file_specs, output):
+    """
+    Merge the parquet shards of an entity, see merge_shards
+    """
+    seen_ids = pa.array([], pa.string())
+    with open_writers(csv_files[entity], output) as writers:
+        for file_spec in file_specs:
+            new_ids = None
+            if entity in DEDUPLICATED_ENTITIES:
+                ids = pq.read_table(parquet_name(file_spec[entity]), columns=["id"])
+                ids = ids.column("id").combine_chunks()
+                new_ids = ids.filter(pc.invert(pc.is_in(ids, value_set=seen_ids)))
+                seen_ids = pa.concat_arrays([seen_ids, new_ids])
+
+            for table, spec in file_spec.items():
+                shard = pq.read_table(parquet_name(spec))
+                if new_ids is not None:
+                    key = shard.column(0)
+                    shard = shard.filter(pc.is_in(key, value_set=new_ids))
+                writers[table].write_table(shard)
+            shutil.rmtree(os.path.dirname(file_spec[entity]["name"]))
+
+
+def flatten_parallel(entity, workers=None, output="csv", *, merge=True):
+    """
+    Flatten all partitions of an entity with a pool of worker processes.
+    Every partition is written to its own shard files (see shard_spec), which are merged
+    into the output if merge is True.
+    """
+    file_names = partitions(entity)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        file_specs = list(
+            executor.map(
+                flatten_partition,
+                [entity] * len(file_names),
+                file_names,
+                [output] * len(file_names),
+            )
+        )
+    if merge:
+        merge_shards(entity, file_specs, output)
+
+
 if __name__ == "__main__":
-    flatten_topics()
-    flatten_authors()
-    flatten_concepts()
-    flatten_institutions()
-    flatten_publishers()
-    flatten_sources()
-    flatten_works()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "entities",
+        nargs="*",
+        help=f"the entities to flatten: {', '.join(FLATTENERS)} (default: all)",
+    )
+    parser.add_argument(
+        "--output",
+        choices=OUTPUT_FORMATS,
+        default="csv",
+        help=f"write gzipped csv files or parquet files to {CSV_DIR}, "
+        f"or insert into the {DUCKDB_SCHEMA} schema of {DUCKDB_PATH} (default: csv)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="flatten partitions in parallel with this many processes "
+        "(default: a single process)",
+    )
+    parser.add_argument(
+        "--no-merge",
+        action="store_true",
+        help="in parallel mode, keep the per-partition shards in "
+        f"{SHARDS_DIR} instead of merging them",
+    )
+    parser.add_argument(
+        "--bulk-load",
+        action="store_true",
+        help="with --output duckdb, create the tables without primary keys and "
+        "indexes, and add them (removing duplicate keys) after loading",
+    )
+    args = parser.parse_args()
+    if unknown := set(args.entities) - set(FLATTENERS):
+        parser.error(f"unknown entities: {', '.join(sorted(unknown))}")
+    if args.bulk_load and args.output != "duckdb":
+        parser.error("--bulk-load requires --output duckdb")
+
+    if args.bulk_load:
+        setup_duckdb_schema(duckdb_connection(), bulk_load=True)
+
+    for entity in args.entities or FLATTENERS:
+        if args.workers:
+            flatten_parallel(entity, args.workers, args.output, merge=not args.no_merge)
+        else:
+            FLATTENERS[entity](output=args.output)
+
+    if args.bulk_load:
+        print(finalize_duckdb_schema(duckdb_connection(), deduplicate=True))
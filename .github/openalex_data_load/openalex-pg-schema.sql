@@ -156,6 +156,18 @@ CREATE TABLE openalex.concepts_related_concepts (
 );
 
 
+--
+-- Name: identifiers; Type: TABLE; Schema: openalex; Owner: -
+--
+
+CREATE TABLE openalex.identifiers (
+    entity_id text NOT NULL,
+    entity_type text NOT NULL,
+    id_type text NOT NULL,
+    id_value text NOT NULL
+);
+
+
 --
 -- Name: institutions; Type: TABLE; Schema: openalex; Owner: -
 --
@@ -341,7 +353,9 @@ CREATE TABLE openalex.works (
     is_paratext boolean,
     cited_by_api_url text,
     abstract_inverted_index json,
-    language text
+    abstract text,
+    language text,
+    updated_date timestamp without time zone
 );
 
 --
@@ -561,6 +575,14 @@ CREATE TABLE openalex.works_related_works (
 --
 --
 ----
+---- Name: identifiers identifiers_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
+----
+--
+--ALTER TABLE ONLY openalex.identifiers
+--    ADD CONSTRAINT identifiers_pkey PRIMARY KEY (id_type, id_value, entity_type);
+--
+--
+----
 ---- Name: institutions_ids institutions_ids_pkey; Type: CONSTRAINT; Schema: openalex; Owner: -
 ----
 --
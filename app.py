@@ -67,11 +67,18 @@ def _():
     )
 
 
+@app.cell
+def _():
+    from models.classify import detect_ids, split_identifiers
+    return detect_ids, split_identifiers
+
+
 @app.cell
 def _():
     from retrieve import Retriever
+    from retrieve.transport import get_async_client
     from models.enums import Identifier
-    return Identifier, Retriever
+    return Identifier, Retriever, get_async_client
 
 
 @app.cell(hide_code=True)
@@ -112,6 +119,10 @@ def _(mo):
         - {patent_number}
         - {orcid}
 
+        **by pasting a list of identifiers of any type**
+
+        - {identifiers}
+
         **by searching for names**
 
         - {title}
@@ -130,6 +141,9 @@ def _(mo):
             pure_id=mo.ui.text(label="Pure ID"),
             pmid=mo.ui.text(label="PMID"),
             arxiv_id=mo.ui.text(label="Arxiv ID"),
+            identifiers=mo.ui.text_area(
+                label="Identifiers", placeholder="one per line or spreadsheet cell"
+            ),
             title=mo.ui.text(label="Title"),
             author_name=mo.ui.text(label="Author Name"),
             journal_name=mo.ui.text(label="Journal Name"),
@@ -147,7 +161,7 @@ def _(mo):
 
 
 @app.cell(hide_code=True)
-def _(Callable, form, get_validator, mo):
+def _(Callable, detect_ids, form, get_validator, mo, split_identifiers):
     # Parse, normalize and validate user input
     # then display it for review
     final_stack = ""
@@ -164,6 +178,10 @@ def _(Callable, form, get_validator, mo):
                 input_data[k] = ""
                 continue
             entries += 1
+            if k == "identifiers":
+                # detect the type of every pasted identifier
+                input_data[k] = detect_ids(split_identifiers(v))
+                continue
             validator: Callable[[str], str] = get_validator(k)
             if not validator:
                 continue
@@ -194,7 +212,14 @@ def _(Callable, form, get_validator, mo):
                     mo.hstack(
                         [
                             mo.md(f"**{k.replace('_', ' ').capitalize()}**"),
-                            mo.md(f"{v}"),
+                            mo.md(
+                                "<br>".join(
+                                    f"{id_type.value}: {id_value}"
+                                    for id_type, id_value in v
+                                )
+                                if k == "identifiers"
+                                else f"{v}"
+                            ),
                         ],
                         justify="center",
                         widths=[1, 2],
@@ -230,7 +255,10 @@ def _(Identifier, Retriever):
         # parse the input
         input: list[tuple[str | Identifier, str]] = []
         for k, v in form_values.items():
-            if all([v, not isinstance(v, Exception)]):
+            if k == "identifiers":
+                # already detected and normalized: a list of (id type, id) tuples
+                input.extend(v)
+            elif all([v, not isinstance(v, Exception)]):
                 input.append((k, v))
         if not input:
             return {}
@@ -418,7 +446,7 @@ def _(mo):
 
 
 @app.cell
-async def _(autocomplete_input, entity_dropdown, httpx, mo, pl):
+async def _(autocomplete_input, entity_dropdown, get_async_client, httpx, mo, pl):
     async def get_from_autocomplete(input_str:str, client:httpx.AsyncClient, entity_type: str | None = None) -> tuple[int, pl.DataFrame]:
         """
         use the OA autocomplete endpoint to get suggestions for a search string.
@@ -441,19 +469,19 @@ async def _(autocomplete_input, entity_dropdown, httpx, mo, pl):
         return count, results
 
 
-    async with httpx.AsyncClient() as client:
-        new_count, result = await get_from_autocomplete(autocomplete_input.value, client, entity_dropdown.value)
-        if new_count > 0:
-            autocomple_result_table = mo.ui.table(result,
-                                                 pagination=False, selection='multi')
-            search_results = mo.vstack([
-                    mo.md(f"## `{new_count}` results found for query: `{autocomplete_input.value}` with entity type `{entity_dropdown.value}`"),
-                    mo.md(f"### first `{min(new_count, 10)}` shown below."),
-                autocomple_result_table
-                
-            ])
-        else:
-            search_results = mo.md(f"## No results found for query: `{autocomplete_input.value or '---'} ` with entity type `{entity_dropdown.value or '---'} ` ")
+    client = get_async_client()
+    new_count, result = await get_from_autocomplete(autocomplete_input.value, client, entity_dropdown.value)
+    if new_count > 0:
+        autocomple_result_table = mo.ui.table(result,
+                                             pagination=False, selection='multi')
+        search_results = mo.vstack([
+                mo.md(f"## `{new_count}` results found for query: `{autocomplete_input.value}` with entity type `{entity_dropdown.value}`"),
+                mo.md(f"### first `{min(new_count, 10)}` shown below."),
+            autocomple_result_table
+            
+        ])
+    else:
+        search_results = mo.md(f"## No results found for query: `{autocomplete_input.value or '---'} ` with entity type `{entity_dropdown.value or '---'} ` ")
     
     
 
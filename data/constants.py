@@ -4,6 +4,7 @@ Global constants for the MEEWI application.
 This module defines constants that are used throughout the application.
 """
 
+import os
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -45,10 +46,51 @@ EXPORT_FORMATS: list[str] = ["json", "csv", "bibtex", "bib", "parquet", "cerif"]
 MAX_RETRIES = 3
 RETRY_BACKOFF_FACTOR = 0.5
 RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+MAX_RETRY_WAIT = 60  # Max seconds to wait before a retry, also caps Retry-After
+
+# HTTP settings
+HTTP_TIMEOUT = 30  # seconds
+DEFAULT_RATE_LIMIT = 10  # requests per second for hosts not in RATE_LIMITS
+# NCBI E-utilities api key (from the environment), raises the rate limit to 10/s
+NCBI_API_KEY = os.getenv("NCBI_API_KEY")
+RATE_LIMITS: dict[str, float] = {
+    "api.openalex.org": 10,
+    "api.crossref.org": 20,
+    "api.datacite.org": 10,
+    "api.openaire.eu": 5,
+    "eutils.ncbi.nlm.nih.gov": 10 if NCBI_API_KEY else 3,
+    "pub.orcid.org": 20,
+}
+
+# OpenAlex premium api key (from the environment), needed for some filters such as
+# from_updated_date
+OPENALEX_API_KEY = os.getenv("OPENALEX_API_KEY")
+
+# Contact email sent to apis with a "polite pool" for identified clients (e.g. Crossref)
+CONTACT_EMAIL = os.getenv("CONTACT_EMAIL")
+
+# Pure research information system: the url of its web service api (e.g.
+# https://research.example.edu/ws/api) and api key, from the environment
+PURE_API_URL = os.getenv("PURE_API_URL")
+PURE_API_KEY = os.getenv("PURE_API_KEY")
+
+# Local DuckDB database with the openalex schema, consulted before the OpenAlex api
+LOCAL_OPENALEX_DB = APP_ROOT / "openalex_data.duckdb"
 
 # Caching settings
 CACHE_ENABLED = True
 CACHE_TTL_DAYS = 30  # Time-to-live for cached data in days
+CACHE_MAX_SIZE_MB = 500  # Least recently used entries are evicted above this size
+# Validators (ETag / Last-Modified) of responses are kept with their body for much
+# longer, so expired records can be revalidated with a conditional request (304)
+ETAG_CACHE_DIR = CACHE_DIR / "etags"
+ETAG_CACHE_TTL_DAYS = 365
+# The resumption token of the last Pure change feed sync
+PURE_SYNC_FILE = CACHE_DIR / "pure_sync.json"
+
+# Concurrency settings for async retrieval
+MAX_CONCURRENT_REQUESTS = 20  # across all connectors
+MAX_CONCURRENT_REQUESTS_PER_CONNECTOR = 5
 
 # Publication types mapping
 # Maps various publication type values from different sources to our standard types
@@ -9,7 +9,8 @@ def _():
     import marimo as mo
     import httpx
     import polars as pl
-    return httpx, mo, pl
+    from retrieve.transport import get_async_client
+    return get_async_client, httpx, mo, pl
 
 
 @app.cell(hide_code=True)
@@ -51,29 +52,29 @@ def _(httpx, pl):
 async def _(
     autocomplete_input,
     entity_dropdown,
+    get_async_client,
     get_from_autocomplete,
-    httpx,
     mo,
 ):
-    async with httpx.AsyncClient() as client:
-        new_count, result = await get_from_autocomplete(
-            autocomplete_input.value, client, entity_dropdown.value
+    client = get_async_client()
+    new_count, result = await get_from_autocomplete(
+        autocomplete_input.value, client, entity_dropdown.value
+    )
+    if new_count > 0:
+        autocomple_result_table = mo.ui.table(result, pagination=False, selection="multi")
+        search_results = mo.vstack(
+            [
+                mo.md(
+                    f"## `{new_count}` results found for query: `{autocomplete_input.value}` with entity type `{entity_dropdown.value}`"
+                ),
+                mo.md(f"### first `{min(new_count, 10)}` shown below."),
+                autocomple_result_table,
+            ]
+        )
+    else:
+        search_results = mo.md(
+            f"## No results found for query: `{autocomplete_input.value or '---'} ` with entity type `{entity_dropdown.value or '---'} ` "
         )
-        if new_count > 0:
-            autocomple_result_table = mo.ui.table(result, pagination=False, selection="multi")
-            search_results = mo.vstack(
-                [
-                    mo.md(
-                        f"## `{new_count}` results found for query: `{autocomplete_input.value}` with entity type `{entity_dropdown.value}`"
-                    ),
-                    mo.md(f"### first `{min(new_count, 10)}` shown below."),
-                    autocomple_result_table,
-                ]
-            )
-        else:
-            search_results = mo.md(
-                f"## No results found for query: `{autocomplete_input.value or '---'} ` with entity type `{entity_dropdown.value or '---'} ` "
-            )
     return autocomple_result_table, client, new_count, result, search_results
 
 
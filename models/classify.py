@@ -0,0 +1,176 @@
+"""
+Detection of the identifier type of arbitrary input, e.g. a pasted list of mixed ids.
+
+Every input is matched once against a single combined pattern, which has an optional
+lookahead per identifier type (see CLASSIFIER_PATTERNS): all types whose pattern fits
+the input are captured in the same pass. The candidates are then normalized with the
+validator of their type (so ISBN and ORCID checksums are verified), and ranked by
+confidence: an explicit prefix (doi:, https://orcid.org/, pmid:, ...) makes a candidate
+certain, otherwise the confidence is that of the type, since e.g. a bare number is much
+less likely to be a PMID than a string of the form 10.xxxx/yyy is to be a DOI.
+
+usage:
+    classify("https://orcid.org/0000-0002-1825-0097")
+    # -> [(Identifier.ORCID, "https://orcid.org/0000-0002-1825-0097", 1.0)]
+    retriever.add_id(detect_ids(split_identifiers(pasted_text)))
+"""
+
+import re
+from collections.abc import Iterable
+
+import polars as pl
+
+from models.enums import Identifier
+from models.validate import get_validator
+
+# identifier type -> (prefix pattern, id pattern, confidence of a match without prefix)
+CLASSIFIER_PATTERNS: dict[Identifier, tuple[str | None, str, float]] = {
+    Identifier.DOI: (
+        r"(?:https?://)?(?:dx\.)?doi\.org/|doi:",
+        r"10\.\d{4,9}/\S+",
+        0.95,
+    ),
+    Identifier.OPENAIRE_ID: (None, r"[\w-]{12}::[0-9a-f]{32}", 0.95),
+    Identifier.ORCID: (
+        r"(?:https?://)?orcid\.org/|orcid:",
+        r"\d{4}-?\d{4}-?\d{4}-?\d{3}[\dx]",
+        0.9,
+    ),
+    Identifier.ISBN: (
+        r"isbn(?:-?1[03])?:",
+        r"(?:97[89][- ]?)?(?:\d[- ]?){9}[\dx]",
+        0.85,
+    ),
+    Identifier.ARXIV: (
+        r"(?:https?://)?arxiv\.org/abs/|arxiv:",
+        r"\d{4}\.\d{4,5}(?:v\d+)?",
+        0.8,
+    ),
+    Identifier.PURE_ID: (
+        r"pure(?:[-_]?id)?:",
+        r"[0-9a-f]{8}-[0-9a-f]{4}-[1-5][0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}",
+        0.6,
+    ),
+    Identifier.PMID: (
+        r"(?:https?://)?pubmed\.ncbi\.nlm\.nih\.gov/|pmid:|pubmed(?: ?id)?:",
+        r"\d{1,8}",
+        0.4,
+    ),
+}
+
+
+def group_name(id_type: Identifier) -> str:
+    """
+    The name of the group that captures an identifier type in CLASSIFIER_REGEX
+    """
+    return id_type.name.lower()
+
+
+def combined_pattern() -> str:
+    """
+    Combine CLASSIFIER_PATTERNS into a single pattern: an optional lookahead per
+    identifier type, each capturing the prefix and the id if the whole input matches
+    """
+    lookaheads = []
+    for id_type, (prefix, id_pattern, _) in CLASSIFIER_PATTERNS.items():
+        name = group_name(id_type)
+        prefix_group = f"(?P<{name}_prefix>{prefix})?\\s*" if prefix else ""
+        lookaheads.append(f"(?:(?={prefix_group}(?P<{name}>{id_pattern})/?$))?")
+    return "^" + "".join(lookaheads)
+
+
+CLASSIFIER_REGEX = re.compile(combined_pattern(), re.IGNORECASE)
+
+
+def classify(input: str) -> list[tuple[Identifier, str, float]]:
+    """
+    Detect the identifier type(s) of an input.
+
+    Args:
+        input (str): the identifier, of any supported type and in any format the
+            validators accept
+    Returns:
+        list: a (type, normalized identifier, confidence) tuple for every type the input
+            is a valid identifier of, most confident first. Empty if the input isn't a
+            (supported) identifier.
+    """
+    if not input or not (input := str(input).strip()):
+        return []
+    match = CLASSIFIER_REGEX.match(input)
+    candidates = []
+    for id_type, (_, _, type_confidence) in CLASSIFIER_PATTERNS.items():
+        name = group_name(id_type)
+        if (id_value := match.group(name)) is None:
+            continue
+        try:
+            id_value = get_validator(id_type.value)(id_value)
+        except ValueError:
+            continue
+        prefixed = match.groupdict().get(f"{name}_prefix")
+        candidates.append((id_type, id_value, 1.0 if prefixed else type_confidence))
+    return sorted(candidates, key=lambda candidate: candidate[2], reverse=True)
+
+
+def classify_many(inputs: pl.Series | Iterable[str]) -> pl.DataFrame:
+    """
+    Detect the identifier type of every input in a column, e.g. a pasted list.
+
+    Every distinct input is classified once.
+
+    Args:
+        inputs: the identifiers, of any supported type
+    Returns:
+        pl.DataFrame: a row for every input, in the same order, with columns
+            - input: the input as given
+            - id_type: the value of the most likely Identifier, None if not detected
+            - value: the normalized identifier, None if not detected
+            - confidence: the confidence of the detection, 0.0 if not detected
+    """
+    inputs = pl.Series("input", inputs, dtype=pl.String)
+    detected = {
+        input: candidates[0] if (candidates := classify(input)) else (None, None, 0.0)
+        for input in inputs.unique().drop_nulls()
+    }
+    rows = [detected.get(input, (None, None, 0.0)) for input in inputs]
+    return pl.DataFrame(
+        {
+            "input": inputs,
+            "id_type": [id_type.value if id_type else None for id_type, _, _ in rows],
+            "value": [value for _, value, _ in rows],
+            "confidence": [confidence for _, _, confidence in rows],
+        },
+        schema={
+            "input": pl.String,
+            "id_type": pl.String,
+            "value": pl.String,
+            "confidence": pl.Float64,
+        },
+    )
+
+
+def detect_ids(
+    inputs: pl.Series | Iterable[str], min_confidence: float = 0.5
+) -> list[tuple[Identifier, str]]:
+    """
+    Detect the identifiers in a list of mixed inputs, for Retriever.add_id.
+
+    Args:
+        inputs: the identifiers, of any supported type
+        min_confidence: inputs that are detected with a lower confidence are skipped,
+            e.g. bare numbers (which may or may not be PMIDs)
+    Returns:
+        list: the (type, normalized identifier) tuples of the detected identifiers
+    """
+    detected = classify_many(inputs).filter(pl.col("confidence") >= min_confidence)
+    return [
+        (Identifier(id_type), value)
+        for id_type, value in detected.select("id_type", "value").iter_rows()
+    ]
+
+
+def split_identifiers(text: str) -> list[str]:
+    """
+    Split pasted text into separate inputs: one per line, or per cell if it was copied
+    from a spreadsheet
+    """
+    return [part.strip() for part in re.split(r"[\r\n\t]+", text) if part.strip()]
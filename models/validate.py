@@ -5,10 +5,17 @@ use function get_validator to retrieve the function from a str representation of
 or use the specific function directly.
 """
 
+import functools
 import re
 import uuid
 from collections.abc import Callable
 
+import polars as pl
+
+# The validators cache their results for this many inputs each, so revalidating the same
+# input (e.g. on every rerun of the app) is a dict lookup. Invalid inputs are not cached.
+VALIDATION_CACHE_SIZE = 16_384
+
 # Regular expressions for various identifier formats
 
 DOI_REGEX = re.compile(r"^10\.\d{4,9}/[-._;()/:A-Z0-9]+$", re.IGNORECASE)
@@ -28,6 +35,63 @@ UUID_REGEX = re.compile(
     re.IGNORECASE,
 )
 MD5_REGEX = re.compile(r"^[0-9a-f]{32}$")
+US_PATENT_REGEX = re.compile(r"^(US)?[,\d]{1,10}$", re.IGNORECASE)
+EP_PATENT_REGEX = re.compile(r"^EP\d{6,8}(?:\.\d)?$", re.IGNORECASE)
+WO_PATENT_REGEX = re.compile(r"^WO\d{2,4}/\d{6}$", re.IGNORECASE)
+JP_PATENT_REGEX = re.compile(r"^JP\d{4}-\d{6}$", re.IGNORECASE)
+
+# Prefixes that are removed from the identifiers before validation
+DOI_PREFIXES: dict[str, str] = {
+    "https://doi.org/": "",
+    "http://dx.doi.org/": "",
+    "https://dx.doi.org/": "",
+    "doi:": "",
+    "doi.org/": "",
+}
+
+ISBN_PREFIXES: dict[str, str] = {
+    "isbn:": "",
+    "isbn-10:": "",
+    "isbn-13:": "",
+    "isbn10:": "",
+    "isbn13:": "",
+}
+
+SCOPUS_PREFIXES: dict[str, str] = {
+    "scopus:": "",
+    "scopusid:": "",
+    "scopus-id:": "",
+    "scopus_id:": "",
+}
+
+PMID_PREFIXES: dict[str, str] = {
+    "pmid:": "",
+    "pubmed:": "",
+    "pubmed id:": "",
+    "pubmedid:": "",
+}
+
+ARXIV_PREFIXES: dict[str, str] = {
+    "arxiv:": "",
+    "arXiv:": "",
+    "https://arxiv.org/abs/": "",
+    "http://arxiv.org/abs/": "",
+    "arxiv.org/abs/": "",
+}
+
+PURE_PREFIXES: dict[str, str] = {
+    "pure:": "",
+    "pureid:": "",
+    "pure-id:": "",
+    "pure_id:": "",
+}
+
+ORCID_PREFIXES = (
+    "https://orcid.org/",
+    "http://orcid.org/",
+    "orcid.org/",
+    "orcid:",
+)
 
 
 def is_valid_input(input_value: any) -> bool:
@@ -83,6 +147,7 @@ def clean_prefix(input_str: str, prefixes: dict[str, str]) -> str:
     return input_str
 
 
+@functools.lru_cache(maxsize=VALIDATION_CACHE_SIZE)
 def validate_doi(doi: str) -> str:
     """
     Validate a DOI (Digital Object Identifier) string.
@@ -101,15 +166,7 @@ def validate_doi(doi: str) -> str:
     except ValueError as e:
         raise ValueError(f"Invalid DOI: {e}") from None
 
-    prefixes = {
-        "https://doi.org/": "",
-        "http://dx.doi.org/": "",
-        "https://dx.doi.org/": "",
-        "doi:": "",
-        "doi.org/": "",
-    }
-
-    stripped_doi = clean_prefix(doi, prefixes)
+    stripped_doi = clean_prefix(doi, DOI_PREFIXES)
 
     # Special case handling
     if stripped_doi.startswith("/"):
@@ -134,6 +191,7 @@ def validate_doi(doi: str) -> str:
     return stripped_doi
 
 
+@functools.lru_cache(maxsize=VALIDATION_CACHE_SIZE)
 def validate_isbn(input: str) -> str:
     """
     Validate and normalize ISBN-10 or ISBN-13 format.
@@ -150,15 +208,7 @@ def validate_isbn(input: str) -> str:
     except ValueError as e:
         raise ValueError(f"Invalid ISBN: {e}") from None
 
-    prefixes = {
-        "isbn:": "",
-        "isbn-10:": "",
-        "isbn-13:": "",
-        "isbn10:": "",
-        "isbn13:": "",
-    }
-
-    clean_isbn = clean_prefix(isbn, prefixes)
+    clean_isbn = clean_prefix(isbn, ISBN_PREFIXES)
     clean_isbn = re.sub(r"[- ]", "", clean_isbn)
 
     ISBN10_LEN = 10
@@ -199,6 +249,7 @@ def validate_isbn(input: str) -> str:
     raise ValueError(f"Invalid ISBN length ({len(clean_isbn)} digits): {input}")
 
 
+@functools.lru_cache(maxsize=VALIDATION_CACHE_SIZE)
 def validate_scopus_id(input: str) -> str:
     """
     Validate Scopus ID format.
@@ -217,14 +268,7 @@ def validate_scopus_id(input: str) -> str:
     except ValueError as e:
         raise ValueError(f"Invalid Scopus ID: {e}") from None
 
-    prefixes = {
-        "scopus:": "",
-        "scopusid:": "",
-        "scopus-id:": "",
-        "scopus_id:": "",
-    }
-
-    clean_id = clean_prefix(scopus_id, prefixes)
+    clean_id = clean_prefix(scopus_id, SCOPUS_PREFIXES)
 
     if not SCOPUS_REGEX.match(clean_id):
         raise ValueError(
@@ -234,6 +278,7 @@ def validate_scopus_id(input: str) -> str:
     return clean_id
 
 
+@functools.lru_cache(maxsize=VALIDATION_CACHE_SIZE)
 def validate_openaire_id(input: str) -> str:
     """
     Validate OpenAIRE ID format.
@@ -278,6 +323,7 @@ def validate_openaire_id(input: str) -> str:
     return f"{source_prefix}::{md5_hash.lower()}"
 
 
+@functools.lru_cache(maxsize=VALIDATION_CACHE_SIZE)
 def validate_pmid(input: str) -> str:
     """
     Validate PubMed ID (PMID) format.
@@ -295,14 +341,7 @@ def validate_pmid(input: str) -> str:
     except ValueError as e:
         raise ValueError(f"Invalid PMID: {e}") from None
 
-    prefixes = {
-        "pmid:": "",
-        "pubmed:": "",
-        "pubmed id:": "",
-        "pubmedid:": "",
-    }
-
-    clean_pmid = clean_prefix(pmid, prefixes)
+    clean_pmid = clean_prefix(pmid, PMID_PREFIXES)
 
     if not PMID_REGEX.match(clean_pmid):
         raise ValueError(f"Invalid PMID format. Expected 1-8 digits: {input}")
@@ -314,6 +353,7 @@ def validate_pmid(input: str) -> str:
     return clean_pmid
 
 
+@functools.lru_cache(maxsize=VALIDATION_CACHE_SIZE)
 def validate_arxiv_id(input: str) -> str:
     """
     Validate and normalize arXiv ID format.
@@ -330,15 +370,7 @@ def validate_arxiv_id(input: str) -> str:
     except ValueError as e:
         raise ValueError(f"Invalid arXiv ID: {e}") from None
 
-    prefixes = {
-        "arxiv:": "",
-        "arXiv:": "",
-        "https://arxiv.org/abs/": "",
-        "http://arxiv.org/abs/": "",
-        "arxiv.org/abs/": "",
-    }
-
-    clean_id = clean_prefix(arxiv_id, prefixes)
+    clean_id = clean_prefix(arxiv_id, ARXIV_PREFIXES)
 
     # Check for old format (before April 2007): YYMM.numbervV
     old_match = ARXIV_OLD_REGEX.match(clean_id)
@@ -378,6 +410,7 @@ def validate_arxiv_id(input: str) -> str:
     raise ValueError(f"Invalid arXiv ID format: {input}")
 
 
+@functools.lru_cache(maxsize=VALIDATION_CACHE_SIZE)
 def validate_pure_id(input: str) -> str:
     """
     Validate Pure ID format (either an integer or UUID).
@@ -394,14 +427,7 @@ def validate_pure_id(input: str) -> str:
     except ValueError as e:
         raise ValueError(f"Invalid Pure ID: {e}") from None
 
-    prefixes = {
-        "pure:": "",
-        "pureid:": "",
-        "pure-id:": "",
-        "pure_id:": "",
-    }
-
-    clean_id = clean_prefix(pure_id, prefixes)
+    clean_id = clean_prefix(pure_id, PURE_PREFIXES)
 
     if clean_id.isdigit():
         return clean_id
@@ -416,6 +442,7 @@ def validate_pure_id(input: str) -> str:
     raise ValueError(f"Invalid Pure ID format. Expected integer or UUID: {input}")
 
 
+@functools.lru_cache(maxsize=VALIDATION_CACHE_SIZE)
 def validate_patent_number(input: str) -> str:
     """
     Validate and normalize patent number format.
@@ -435,14 +462,9 @@ def validate_patent_number(input: str) -> str:
     # Patent numbers can have various formats depending on the country and type
     # This is a simplified validation focusing on common patent number formats
 
-    us_pattern = re.compile(r"^(US)?[,\d]{1,10}$", re.IGNORECASE)
-    ep_pattern = re.compile(r"^EP\d{6,8}(?:\.\d)?$", re.IGNORECASE)
-    wo_pattern = re.compile(r"^WO\d{2,4}/\d{6}$", re.IGNORECASE)
-    jp_pattern = re.compile(r"^JP\d{4}-\d{6}$", re.IGNORECASE)
-
     clean_patent = re.sub(r"\s", "", patent_num)
 
-    if us_pattern.match(clean_patent):
+    if US_PATENT_REGEX.match(clean_patent):
         clean_patent = re.sub(r",", "", clean_patent)
         if not clean_patent.upper().startswith("US"):
             clean_patent = f"US{clean_patent}"
@@ -450,9 +472,9 @@ def validate_patent_number(input: str) -> str:
 
     if (
         (
-            ep_pattern.match(clean_patent)
-            or wo_pattern.match(clean_patent)
-            or jp_pattern.match(clean_patent)
+            EP_PATENT_REGEX.match(clean_patent)
+            or WO_PATENT_REGEX.match(clean_patent)
+            or JP_PATENT_REGEX.match(clean_patent)
         )
         or re.search(r"\d", clean_patent)
         and len(clean_patent) >= 4
@@ -461,6 +483,7 @@ def validate_patent_number(input: str) -> str:
     raise ValueError(f"Unrecognized patent number format: {input}")
 
 
+@functools.lru_cache(maxsize=VALIDATION_CACHE_SIZE)
 def validate_orcid(input: str) -> str:
     """
     Validate and normalize ORCID identifier format.
@@ -480,15 +503,8 @@ def validate_orcid(input: str) -> str:
     except ValueError as e:
         raise ValueError(f"Invalid ORCID: {e}") from None
 
-    url_prefixes = [
-        "https://orcid.org/",
-        "http://orcid.org/",
-        "orcid.org/",
-        "orcid:",
-    ]
-
     extracted_id = orcid
-    for prefix in url_prefixes:
+    for prefix in ORCID_PREFIXES:
         if orcid.lower().startswith(prefix):
             extracted_id = orcid[len(prefix) :]
             break
@@ -508,18 +524,18 @@ def validate_orcid(input: str) -> str:
     total = 0
     for digit in digits[:-1]:
         total = (total + int(digit)) * 2
-    last_digit = 10 if digits[-1] == "X" else int(digits[-1])
 
     checksum = (12 - (total % 11)) % 11
     if checksum == 10:
         checksum = "X"
 
-    if str(checksum) != str(last_digit):
+    if str(checksum) != digits[-1]:
         raise ValueError(f"Invalid ORCID checksum: {input}") from None
 
     return f"https://orcid.org/{extracted_id}"
 
 
+@functools.lru_cache(maxsize=VALIDATION_CACHE_SIZE)
 def validate_email(input: str) -> str:
     """
     Validate email format.
@@ -549,6 +565,7 @@ def validate_email(input: str) -> str:
     return email
 
 
+@functools.lru_cache(maxsize=VALIDATION_CACHE_SIZE)
 def validate_url(input: str) -> str:
     """
     Validate URL format.
@@ -581,21 +598,16 @@ def get_validator(identifier_str: str) -> None | Callable[[str], str]:
     Get the validation function for a specific identifier type.
 
     Args:
-        identifier_str (str): a str representation of the identifier to validate.
+        identifier_str (str): a str representation of the identifier to validate, one of
+            the aliases in VALIDATOR_ALIASES (case-insensitive).
 
     Returns:
-        function: The validation function for the specified identifier type.
+        function: The validation function for the specified identifier type, None if
+            there is no validator for it.
     """
     if not is_valid_input(identifier_str):
         return None
-
-    identifier_str = identifier_str.lower()
-    if "_id" in identifier_str:
-        identifier_str = identifier_str.replace("_id", "")
-    for k, v in VALIDATION_MAPPING.items():
-        if identifier_str in k:
-            return v
-    return None
+    return VALIDATOR_ALIASES.get(identifier_str.strip().lower())
 
 
 VALIDATION_MAPPING: dict[str, Callable] = {
@@ -611,3 +623,583 @@ VALIDATION_MAPPING: dict[str, Callable] = {
     "email": validate_email,
     "url": validate_url,
 }
+
+
+def validator_aliases(mapping: dict[str, Callable]) -> dict[str, Callable]:
+    """
+    Get the names the validators of a mapping can be retrieved by: the key itself, and
+    its spellings without the _id suffix and with another (or without a) separator,
+    e.g. scopus_id, scopus, scopusid, scopus-id and scopus id.
+    """
+    aliases: dict[str, Callable] = {}
+    for key, validator in mapping.items():
+        for alias in (
+            key,
+            key.removesuffix("_id"),
+            key.replace("_", ""),
+            key.replace("_", "-"),
+            key.replace("_", " "),
+        ):
+            aliases.setdefault(alias, validator)
+    return aliases
+
+
+# alias -> validation function, matched exactly by get_validator
+VALIDATOR_ALIASES: dict[str, Callable] = validator_aliases(VALIDATION_MAPPING)
+
+
+# Vectorized validation of whole columns, with Polars expressions.
+# Every *_frame function below mirrors the validate_* function of the same identifier: it
+# takes a LazyFrame with a String "input" column, and returns it with the normalized
+# "value" and the "error" message of every row (None if the row is valid, the message of
+# the first failing check otherwise). Intermediate results are added as columns, so every
+# step is computed once per row.
+
+
+def first_match(
+    cases: list[tuple[pl.Expr, pl.Expr]], otherwise: pl.Expr | None = None
+) -> pl.Expr:
+    """
+    Combine (condition, value) cases into a single expression: the value of the first
+    case whose condition is true, `otherwise` if none are
+    """
+    (condition, value), *rest = cases
+    expr = pl.when(condition).then(value)
+    for condition, value in rest:
+        expr = expr.when(condition).then(value)
+    return expr.otherwise(otherwise)
+
+
+def input_checks(name: str) -> list[tuple[pl.Expr, pl.Expr]]:
+    """
+    The checks of validate_input, as (condition, error message) pairs
+    """
+    input = pl.col("input")
+    return [
+        (input.is_null(), pl.lit(f"Invalid {name}: Input is None")),
+        (input.str.strip_chars() == "", pl.lit(f"Invalid {name}: Input is empty")),
+    ]
+
+
+def with_result(
+    frame: pl.LazyFrame, value: pl.Expr, checks: list[tuple[pl.Expr, pl.Expr]]
+) -> pl.LazyFrame:
+    """
+    Add the error of the first failing check, and the value of the rows without errors
+    """
+    return frame.with_columns(error=first_match(checks)).select(
+        "input",
+        value=pl.when(pl.col("error").is_null()).then(value),
+        error=pl.col("error"),
+    )
+
+
+def clean_prefix_expr(input: pl.Expr, prefixes: dict[str, str]) -> pl.Expr:
+    """
+    Vectorized clean_prefix: lowercase and strip the input, and replace the first of
+    the prefixes it starts with
+    """
+    input = input.str.to_lowercase().str.strip_chars()
+    return first_match(
+        [
+            (
+                input.str.starts_with(prefix),
+                input.str.replace_all(
+                    prefix, replacement, literal=True
+                ).str.strip_chars(),
+            )
+            for prefix, replacement in prefixes.items()
+        ],
+        input,
+    )
+
+
+def digit(input: pl.Expr, position: int) -> pl.Expr:
+    """
+    The digit at a position of the input as an integer, None if it is not a digit
+    """
+    return input.str.slice(position, 1).cast(pl.Int64, strict=False)
+
+
+def doi_frame(frame: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Vectorized validate_doi
+    """
+    doi, cleaned = pl.col("doi"), pl.col("cleaned")
+    stripped_doi = pl.col("stripped_doi")
+    frame = (
+        frame.with_columns(doi=pl.col("input").str.strip_chars())
+        .with_columns(cleaned=clean_prefix_expr(doi, DOI_PREFIXES))
+        .with_columns(
+            stripped_doi=first_match(
+                [
+                    (
+                        cleaned.str.starts_with("/"),
+                        cleaned.str.replace_all("/", "", literal=True),
+                    ),
+                    (
+                        cleaned.str.starts_with("0."),
+                        cleaned.str.replace_all("0.", "10.", literal=True),
+                    ),
+                    (
+                        ~cleaned.str.starts_with("10"),
+                        pl.lit("10.")
+                        + doi.str.split("10.").list.last().str.strip_chars(),
+                    ),
+                ],
+                cleaned,
+            )
+        )
+    )
+    return with_result(
+        frame,
+        stripped_doi,
+        [
+            *input_checks("DOI"),
+            (
+                stripped_doi == "",
+                pl.format("Input not recognized as a DOI: {}", doi),
+            ),
+            (
+                ~stripped_doi.str.contains(f"(?i){DOI_REGEX.pattern}"),
+                pl.format(
+                    "Cannot parse input to DOI. Input: {} - Parsed: {}",
+                    doi,
+                    stripped_doi,
+                ),
+            ),
+        ],
+    )
+
+
+def isbn_frame(frame: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Vectorized validate_isbn, including the ISBN-10 and ISBN-13 checksums
+    """
+    input, clean_isbn, length = pl.col("input"), pl.col("clean_isbn"), pl.col("length")
+    frame = frame.with_columns(
+        clean_isbn=clean_prefix_expr(input, ISBN_PREFIXES).str.replace_all(r"[- ]", "")
+    ).with_columns(length=clean_isbn.str.len_chars())
+    is_isbn10 = length == 10  # noqa: PLR2004
+    is_isbn13 = length == 13  # noqa: PLR2004
+
+    isbn10_check_digit = (
+        pl.when(clean_isbn.str.slice(9, 1).str.to_uppercase() == "X")
+        .then(10)
+        .otherwise(digit(clean_isbn, 9))
+    )
+    isbn10_checksum = pl.sum_horizontal(
+        [digit(clean_isbn, i) * (10 - i) for i in range(9)]
+    )
+    isbn13_checksum = pl.sum_horizontal(
+        [digit(clean_isbn, i) * (3 if i % 2 else 1) for i in range(12)]
+    )
+    value = (
+        pl.when(is_isbn10)
+        .then(
+            pl.concat_str(
+                [
+                    clean_isbn.str.slice(0, 1),
+                    clean_isbn.str.slice(1, 3),
+                    clean_isbn.str.slice(4, 5),
+                    clean_isbn.str.slice(9, 1),
+                ],
+                separator="-",
+            )
+        )
+        .otherwise(
+            pl.concat_str(
+                [
+                    clean_isbn.str.slice(0, 3),
+                    clean_isbn.str.slice(3, 1),
+                    clean_isbn.str.slice(4, 5),
+                    clean_isbn.str.slice(9, 3),
+                    clean_isbn.str.slice(12, 1),
+                ],
+                separator="-",
+            )
+        )
+    )
+    return with_result(
+        frame,
+        value,
+        [
+            *input_checks("ISBN"),
+            (
+                is_isbn10 & ~clean_isbn.str.contains(ISBN10_REGEX.pattern),
+                pl.format("Invalid ISBN-10 format: {}", input),
+            ),
+            (
+                is_isbn10 & ((isbn10_checksum + isbn10_check_digit) % 11 != 0),
+                pl.format("Invalid ISBN-10 checksum: {}", input),
+            ),
+            (
+                is_isbn13 & ~clean_isbn.str.contains(r"^\d{13}$"),
+                pl.format("Invalid ISBN-13 format: {}", input),
+            ),
+            (
+                is_isbn13 & ((10 - isbn13_checksum % 10) % 10 != digit(clean_isbn, 12)),
+                pl.format("Invalid ISBN-13 checksum: {}", input),
+            ),
+            (
+                ~is_isbn10 & ~is_isbn13,
+                pl.format("Invalid ISBN length ({} digits): {}", length, input),
+            ),
+        ],
+    )
+
+
+def scopus_id_frame(frame: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Vectorized validate_scopus_id
+    """
+    input, clean_id = pl.col("input"), pl.col("clean_id")
+    frame = frame.with_columns(clean_id=clean_prefix_expr(input, SCOPUS_PREFIXES))
+    return with_result(
+        frame,
+        clean_id,
+        [
+            *input_checks("Scopus ID"),
+            (
+                ~clean_id.str.contains(SCOPUS_REGEX.pattern),
+                pl.format(
+                    "Invalid Scopus ID format. Expected 5-12 digits but got: {}", input
+                ),
+            ),
+        ],
+    )
+
+
+def openaire_id_frame(frame: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Vectorized validate_openaire_id
+    """
+    input, parts = pl.col("input"), pl.col("parts")
+    source_prefix, md5_hash = pl.col("source_prefix"), pl.col("md5_hash")
+    frame = frame.with_columns(
+        parts=input.str.strip_chars().str.split("::")
+    ).with_columns(
+        source_prefix=parts.list.first(),
+        md5_hash=parts.list.last().str.to_lowercase(),
+    )
+    return with_result(
+        frame,
+        pl.concat_str([source_prefix, md5_hash], separator="::"),
+        [
+            *input_checks("OpenAIRE ID"),
+            (
+                parts.list.len() != 2,  # noqa: PLR2004
+                pl.format(
+                    "Invalid OpenAIRE ID format. Expected 'sourcePrefix::md5hash' but "
+                    "got: {}",
+                    input,
+                ),
+            ),
+            (
+                source_prefix.str.len_chars() != 12,  # noqa: PLR2004
+                pl.format(
+                    "Invalid source prefix length. Expected 12 characters but got {}: {}",
+                    source_prefix.str.len_chars(),
+                    input,
+                ),
+            ),
+            (
+                ~md5_hash.str.contains(MD5_REGEX.pattern),
+                pl.format("Invalid MD5 hash in OpenAIRE ID: {}", input),
+            ),
+        ],
+    )
+
+
+def pmid_frame(frame: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Vectorized validate_pmid
+    """
+    input, clean_pmid = pl.col("input"), pl.col("clean_pmid")
+    frame = frame.with_columns(clean_pmid=clean_prefix_expr(input, PMID_PREFIXES))
+    return with_result(
+        frame,
+        clean_pmid,
+        [
+            *input_checks("PMID"),
+            (
+                ~clean_pmid.str.contains(PMID_REGEX.pattern),
+                pl.format("Invalid PMID format. Expected 1-8 digits: {}", input),
+            ),
+            (
+                clean_pmid.cast(pl.Int64, strict=False) < 1,
+                pl.format("PMID out of range (1-99999999): {}", input),
+            ),
+        ],
+    )
+
+
+def arxiv_id_frame(frame: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Vectorized validate_arxiv_id
+    """
+    input, clean_id = pl.col("input"), pl.col("clean_id")
+    year, month, number = pl.col("year"), pl.col("month"), pl.col("number")
+    is_old = pl.col("is_old")
+    frame = frame.with_columns(
+        clean_id=clean_prefix_expr(input, ARXIV_PREFIXES)
+    ).with_columns(
+        is_old=clean_id.str.contains(ARXIV_OLD_REGEX.pattern),
+        year=clean_id.str.extract(ARXIV_NEW_REGEX.pattern, 1),
+        month=clean_id.str.extract(ARXIV_NEW_REGEX.pattern, 2),
+        number=clean_id.str.extract(ARXIV_NEW_REGEX.pattern, 3),
+    )
+    return with_result(
+        frame,
+        pl.lit("arXiv:") + clean_id,
+        [
+            *input_checks("arXiv ID"),
+            (
+                ~is_old & year.is_null(),
+                pl.format("Invalid arXiv ID format: {}", input),
+            ),
+            (
+                ~is_old & ~year.cast(pl.Int64).is_between(7, 99),
+                pl.format("Invalid arXiv ID year: {}", input),
+            ),
+            (
+                ~is_old & ~month.cast(pl.Int64).is_between(1, 12),
+                pl.format("Invalid arXiv ID month: {}", input),
+            ),
+            (
+                # numbers of 4 digits are already matched by the old format
+                ~is_old & ((year + month).cast(pl.Int64) < 1501),  # noqa: PLR2004
+                pl.format(
+                    "Invalid arXiv ID number format. Expected 4 digits for IDs before "
+                    "1501: {}",
+                    input,
+                ),
+            ),
+            (
+                ~is_old & (number.str.len_chars() != 5),  # noqa: PLR2004
+                pl.format(
+                    "Invalid arXiv ID number format. Expected 5 digits for IDs from "
+                    "1501 onwards: {}",
+                    input,
+                ),
+            ),
+        ],
+    )
+
+
+def pure_id_frame(frame: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Vectorized validate_pure_id
+    """
+    input, clean_id = pl.col("input"), pl.col("clean_id")
+    frame = frame.with_columns(clean_id=clean_prefix_expr(input, PURE_PREFIXES))
+    return with_result(
+        frame,
+        clean_id,
+        [
+            *input_checks("Pure ID"),
+            (
+                ~clean_id.str.contains(r"^\d+$")
+                & ~clean_id.str.contains(f"(?i){UUID_REGEX.pattern}"),
+                pl.format(
+                    "Invalid Pure ID format. Expected integer or UUID: {}", input
+                ),
+            ),
+        ],
+    )
+
+
+def patent_number_frame(frame: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Vectorized validate_patent_number
+    """
+    input, clean_patent = pl.col("input"), pl.col("clean_patent")
+    is_us, us_patent = pl.col("is_us"), pl.col("us_patent")
+    frame = frame.with_columns(
+        clean_patent=input.str.strip_chars().str.replace_all(r"\s", "")
+    ).with_columns(
+        is_us=clean_patent.str.contains(f"(?i){US_PATENT_REGEX.pattern}"),
+        us_patent=clean_patent.str.replace_all(
+            ",", "", literal=True
+        ).str.to_uppercase(),
+    )
+    value = first_match(
+        [
+            (is_us & ~us_patent.str.starts_with("US"), pl.lit("US") + us_patent),
+            (is_us, us_patent),
+        ],
+        clean_patent.str.to_uppercase(),
+    )
+    is_other = (
+        clean_patent.str.contains(f"(?i){EP_PATENT_REGEX.pattern}")
+        | clean_patent.str.contains(f"(?i){WO_PATENT_REGEX.pattern}")
+        | clean_patent.str.contains(f"(?i){JP_PATENT_REGEX.pattern}")
+        | (
+            clean_patent.str.contains(r"\d") & (clean_patent.str.len_chars() >= 4)  # noqa: PLR2004
+        )
+    )
+    return with_result(
+        frame,
+        value,
+        [
+            *input_checks("patent number"),
+            (
+                ~is_us & ~is_other,
+                pl.format("Unrecognized patent number format: {}", input),
+            ),
+        ],
+    )
+
+
+def orcid_frame(frame: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Vectorized validate_orcid, including the ISO/IEC 7064:2003 MOD 11-2 checksum
+    """
+    input, orcid = pl.col("input"), pl.col("orcid")
+    extracted_id, digits = pl.col("extracted_id"), pl.col("digits")
+    frame = (
+        frame.with_columns(orcid=input.str.strip_chars())
+        .with_columns(
+            extracted_id=first_match(
+                [
+                    (
+                        orcid.str.to_lowercase().str.starts_with(prefix),
+                        orcid.str.slice(len(prefix)),
+                    )
+                    for prefix in ORCID_PREFIXES
+                ],
+                orcid,
+            ).str.replace_all(r"[ /\\]", "")
+        )
+        .with_columns(
+            extracted_id=pl.when(
+                (extracted_id.str.len_chars() == 16)  # noqa: PLR2004
+                & ~extracted_id.str.contains("-", literal=True)
+            )
+            .then(
+                pl.concat_str(
+                    [extracted_id.str.slice(i, 4) for i in range(0, 16, 4)],
+                    separator="-",
+                )
+            )
+            .otherwise(extracted_id)
+        )
+        .with_columns(digits=extracted_id.str.replace_all("-", "", literal=True))
+    )
+    # the sum of (total + digit) * 2 over the first 15 digits
+    total = pl.sum_horizontal([digit(digits, i) * 2 ** (15 - i) for i in range(15)])
+    checksum = (12 - total % 11) % 11
+    check_digit = (
+        pl.when(checksum == 10)  # noqa: PLR2004
+        .then(pl.lit("X"))
+        .otherwise(checksum.cast(pl.String))
+    )
+    return with_result(
+        frame,
+        pl.lit("https://orcid.org/") + extracted_id,
+        [
+            *input_checks("ORCID"),
+            (
+                ~extracted_id.str.contains(ORCID_REGEX.pattern),
+                pl.format(
+                    "Invalid ORCID format. Expected 4 groups of 4 digits/characters: {}",
+                    input,
+                ),
+            ),
+            (
+                check_digit != digits.str.slice(15, 1),
+                pl.format("Invalid ORCID checksum: {}", input),
+            ),
+        ],
+    )
+
+
+def email_frame(frame: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Vectorized validate_email (the regex already requires a TLD of 2+ characters)
+    """
+    input, email = pl.col("input"), pl.col("email")
+    frame = frame.with_columns(email=input.str.strip_chars().str.to_lowercase())
+    return with_result(
+        frame,
+        email,
+        [
+            *input_checks("email"),
+            (
+                ~email.str.contains(EMAIL_REGEX.pattern),
+                pl.format("Invalid email format: {}", input),
+            ),
+        ],
+    )
+
+
+def url_frame(frame: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Vectorized validate_url
+    """
+    input, url = pl.col("input"), pl.col("url")
+    frame = frame.with_columns(url=input.str.strip_chars()).with_columns(
+        url=pl.when(url.str.contains("^https?://"))
+        .then(url)
+        .otherwise(pl.lit("https://") + url)
+    )
+    return with_result(
+        frame,
+        url,
+        [
+            *input_checks("URL"),
+            (
+                ~url.str.contains(URL_REGEX.pattern),
+                pl.format("Invalid URL format: {}", input),
+            ),
+        ],
+    )
+
+
+# validate_* function -> its vectorized variant
+VECTORIZED_VALIDATION_MAPPING: dict[
+    Callable, Callable[[pl.LazyFrame], pl.LazyFrame]
+] = {
+    validate_doi: doi_frame,
+    validate_isbn: isbn_frame,
+    validate_scopus_id: scopus_id_frame,
+    validate_openaire_id: openaire_id_frame,
+    validate_pmid: pmid_frame,
+    validate_arxiv_id: arxiv_id_frame,
+    validate_pure_id: pure_id_frame,
+    validate_patent_number: patent_number_frame,
+    validate_orcid: orcid_frame,
+    validate_email: email_frame,
+    validate_url: url_frame,
+}
+
+
+def validate_many(identifier_str: str, series: pl.Series) -> pl.DataFrame:
+    """
+    Validate and normalize a whole column of identifiers at once.
+
+    Every row is validated as by the validate_* function of the identifier type, but
+    with vectorized Polars expressions: invalid rows don't raise, their error message is
+    returned instead.
+
+    Args:
+        identifier_str (str): a str representation of the identifier type, as for
+            get_validator
+        series (pl.Series): the identifiers to validate
+    Returns:
+        pl.DataFrame: a row for every identifier, in the same order, with columns
+            - input: the identifier as given
+            - value: the normalized identifier, None if it is invalid
+            - error: the error message, None if it is valid
+    Raises:
+        ValueError: If there is no validator for the identifier type
+    """
+    validator = get_validator(identifier_str)
+    if validator is None:
+        raise ValueError(f"No validator for identifier type: {identifier_str}")
+    frame = pl.LazyFrame({"input": series}).with_columns(
+        pl.col("input").cast(pl.String, strict=False)
+    )
+    result = VECTORIZED_VALIDATION_MAPPING[validator](frame).collect()
+    # return the input as given, not as its String cast
+    return result.with_columns(input=series)
@@ -0,0 +1,137 @@
+"""
+Reconstruction of abstracts from OpenAlex abstract inverted indexes.
+
+OpenAlex does not return abstracts as text, but as an inverted index that maps every
+word to the positions it occurs at: {"Hello": [0], "world": [1, 3], "again": [2]}.
+
+invert_abstract() rebuilds a single abstract by placing every word at its positions in a
+preallocated list, without sorting. invert_abstracts() does the same for a whole page of
+results at once, using Polars expressions when the page was loaded as a struct column.
+
+Malformed indexes (not a dict, positions that are not lists of non-negative integers)
+never raise: invalid entries are skipped, and an index without any valid entries results
+in None.
+"""
+
+import json
+from typing import Any
+
+import polars as pl
+from loguru import logger
+
+# indexes that claim more positions than this are treated as malformed, to avoid
+# allocating huge lists for a single bogus position
+MAX_ABSTRACT_WORDS = 100_000
+
+
+def invert_abstract(inv_index: dict[str, list[int]] | str | None) -> str | None:
+    """
+    Rebuild an abstract from its inverted index.
+
+    Args:
+        inv_index: the abstract_inverted_index of a work, as a dict or as a json string
+    Returns:
+        the abstract, or None if there is no (valid) index
+    """
+    if isinstance(inv_index, str):
+        try:
+            inv_index = json.loads(inv_index)
+        except ValueError:
+            logger.debug("Invalid abstract inverted index: {}", inv_index[:100])
+            return None
+    if not inv_index or not isinstance(inv_index, dict):
+        return None
+
+    try:
+        length = max(map(max, inv_index.values())) + 1
+        if min(map(min, inv_index.values())) < 0:
+            raise ValueError("negative position")  # noqa: TRY301
+        if length > MAX_ABSTRACT_WORDS:
+            raise ValueError("too many positions")  # noqa: TRY301
+        words: list[str | None] = [None] * length
+        for word, positions in inv_index.items():
+            for position in positions:
+                words[position] = word
+    except (TypeError, ValueError, IndexError):
+        # empty, non-list or non-integer positions: skip the invalid entries
+        words = place_valid_words(inv_index)
+    return " ".join(filter(None, words)) or None
+
+
+def place_valid_words(inv_index: dict) -> list[str | None]:
+    """
+    Slow path of invert_abstract() for malformed indexes: place only the words with
+    valid positions.
+    """
+    valid: dict[str, list[int]] = {}
+    for word, positions in inv_index.items():
+        if isinstance(positions, list):
+            valid[word] = [
+                p
+                for p in positions
+                if isinstance(p, int) and 0 <= p < MAX_ABSTRACT_WORDS
+            ]
+    length = max((max(p) + 1 for p in valid.values() if p), default=0)
+    words: list[str | None] = [None] * length
+    for word, positions in valid.items():
+        for position in positions:
+            words[position] = word
+    return words
+
+
+def invert_abstracts(inv_indexes: pl.Series | list[Any]) -> pl.Series:
+    """
+    Rebuild the abstracts for a page of works.
+
+    If the indexes are a struct column (which is what pl.from_dicts makes of them, with a
+    field for every word in the page), the abstracts are rebuilt with Polars expressions:
+    the struct is unpivoted to (row, word, positions), exploded to one row per position
+    and joined back together per row. Other inputs (dicts, json strings) are rebuilt one
+    by one with invert_abstract().
+
+    Args:
+        inv_indexes: the abstract_inverted_index of every work in the page
+    Returns:
+        a String Series with the abstract of every work (None if it has no index), in the
+        same order as the input
+    """
+    if not isinstance(inv_indexes, pl.Series):
+        return pl.Series(
+            "abstract", [invert_abstract(i) for i in inv_indexes], dtype=pl.String
+        )
+    if not isinstance(inv_indexes.dtype, pl.Struct) or not inv_indexes.dtype.fields:
+        if inv_indexes.dtype == pl.Null:
+            return pl.Series("abstract", [None] * len(inv_indexes), dtype=pl.String)
+        return inv_indexes.map_elements(
+            invert_abstract, return_dtype=pl.String, skip_nulls=True
+        ).alias("abstract")
+
+    words = inv_indexes.struct.unnest()
+    # only lists of integers are valid positions: anything else becomes null
+    if malformed := [
+        name for name, dtype in words.schema.items() if dtype != pl.List(pl.Int64)
+    ]:
+        words = words.with_columns(
+            pl.col(malformed).cast(pl.List(pl.Int64), strict=False)
+        )
+    abstracts = (
+        words.with_row_index("row")
+        .unpivot(index="row", variable_name="word", value_name="position")
+        .lazy()
+        .filter(pl.col("position").is_not_null())
+        .explode("position")
+        .filter(pl.col("position").is_between(0, MAX_ABSTRACT_WORDS - 1))
+        .sort("row", "position", maintain_order=True)
+        # the last word wins if the index has duplicate positions
+        .unique(subset=["row", "position"], keep="last", maintain_order=True)
+        .group_by("row", maintain_order=True)
+        .agg(pl.col("word").str.join(" ").alias("abstract"))
+    )
+    return (
+        pl.LazyFrame(
+            {"row": pl.int_range(len(inv_indexes), eager=True, dtype=pl.UInt32)}
+        )
+        .join(abstracts, on="row", how="left", maintain_order="left")
+        .collect()
+        .get_column("abstract")
+    )
@@ -0,0 +1,220 @@
+"""
+Identifier index: maps every external identifier of an OpenAlex entity to its OpenAlex id.
+
+The index is the openalex.identifiers table, with a row per (id_type, id_value,
+entity_type) and the id of the entity (work, author, concept, ...) it belongs to.
+entity_type is the name of the entity's table (works, authors, ...), id_type an
+Identifier enum value and id_value the output of normalize_identifier(). The entity type
+is part of the key because some ids are shared across entity types: a MAG id can be the
+id of a work and of an author. The table is filled from the *_ids tables by the
+OpenAlexIngestor in testing.py and by the snapshot flattener, and has
+(id_type, id_value, entity_type) as its primary key, so resolve_identifier() is a single
+index probe.
+
+Only the identifier types OpenAlex records in the ids of its entities are indexed (see
+IDENTIFIER_COLUMNS). Those of UNINDEXED_IDENTIFIERS (ISBNs, arXiv ids, Pure ids, OpenAIRE
+ids and patent numbers) are not in any OpenAlex record, so they can't be resolved.
+
+usage:
+    resolve_identifier(conn, "https://doi.org/10.1063/1.366536", Identifier.DOI)
+    # -> "https://openalex.org/W1991197510"
+    resolve_identifier(conn, "2208157607", Identifier.MAG, "authors")
+"""
+
+from typing import Any
+
+import duckdb
+import polars as pl
+
+from models.enums import Identifier
+from models.validate import VECTORIZED_VALIDATION_MAPPING, get_validator
+
+# the identifier columns of the OpenAlex *_ids tables
+IDENTIFIER_COLUMNS: dict[str, Identifier] = {
+    "doi": Identifier.DOI,
+    "pmid": Identifier.PMID,
+    "mag": Identifier.MAG,
+    "orcid": Identifier.ORCID,
+    "scopus": Identifier.SCOPUS,
+    "wikidata": Identifier.WIKIDATA,
+}
+
+# the columns of the identifier index
+INDEX_COLUMNS = ["entity_id", "entity_type", "id_type", "id_value"]
+
+# identifier types that are in none of the *_ids tables, and so not in the index
+UNINDEXED_IDENTIFIERS = frozenset(
+    {
+        Identifier.ISBN,
+        Identifier.ARXIV,
+        Identifier.PURE_ID,
+        Identifier.OPENAIRE_ID,
+        Identifier.PATENT_NUMBER,
+    }
+)
+
+# identifiers that OpenAlex stores as urls, with the id as the last path segment
+URL_IDENTIFIERS = {Identifier.PMID, Identifier.PUBMED, Identifier.WIKIDATA}
+
+
+def normalize_identifier(value: Any, id_type: Identifier) -> str | None:
+    """
+    Normalize an identifier to the form used in the identifier index: the output of
+    the validator for its type (if there is one), lowercased.
+
+    Args:
+        value: the identifier, e.g. a DOI as "10.1/a" or "https://doi.org/10.1/A"
+        id_type: the type of the identifier
+    Returns:
+        the normalized identifier, or None if it is empty or invalid
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    if id_type == Identifier.PUBMED:
+        id_type = Identifier.PMID
+    if id_type in URL_IDENTIFIERS and "/" in value:
+        value = value.rstrip("/").rsplit("/", 1)[-1]
+    elif id_type == Identifier.SCOPUS and "authorID=" in value:
+        # OpenAlex stores scopus author ids as a scopus.com url
+        value = value.split("authorID=", 1)[1].split("&", 1)[0]
+    if not value:
+        return None
+    if validator := get_validator(id_type.value):
+        try:
+            value = validator(value)
+        except ValueError:
+            return None
+    return value.lower()
+
+
+def index_type(id_type: Identifier) -> str:
+    """
+    The id_type under which identifiers of a type are stored in the index
+    (PubMed ids are stored as PMIDs)
+    """
+    return Identifier.PMID.value if id_type == Identifier.PUBMED else id_type.value
+
+
+def identifier_rows(
+    entity_id: str, ids: dict[str, Any], entity_type: str
+) -> list[dict[str, str]]:
+    """
+    Get the identifier index rows for the ids of a single entity.
+
+    Args:
+        entity_id: the OpenAlex id of the entity
+        ids: the ids of the entity, as in the `ids` field of an OpenAlex record
+        entity_type: the table of the entity, e.g. works
+    Returns:
+        a row (entity_id, entity_type, id_type, id_value) for every valid identifier
+    """
+    rows = []
+    for column, id_type in IDENTIFIER_COLUMNS.items():
+        if id_value := normalize_identifier(ids.get(column), id_type):
+            rows.append(
+                {
+                    "entity_id": entity_id,
+                    "entity_type": entity_type,
+                    "id_type": id_type.value,
+                    "id_value": id_value,
+                }
+            )
+    return rows
+
+
+def normalize_expr(column: str, id_type: Identifier) -> pl.Expr:
+    """
+    Vectorized normalize_identifier, up to the validator: strip the identifier and take
+    it out of the url OpenAlex stores it in, None if it is empty
+    """
+    value = pl.col(column).cast(pl.String).str.strip_chars()
+    if id_type in URL_IDENTIFIERS:
+        value = (
+            pl.when(value.str.contains("/", literal=True))
+            .then(value.str.extract(r"([^/]*)/*$", 1))
+            .otherwise(value)
+        )
+    elif id_type == Identifier.SCOPUS:
+        value = (
+            pl.when(value.str.contains("authorID=", literal=True))
+            .then(value.str.extract(r"authorID=([^&]*)", 1))
+            .otherwise(value)
+        )
+    return pl.when(value != "").then(value)
+
+
+def identifier_frame(ids: pl.LazyFrame, entity_type: str) -> pl.LazyFrame:
+    """
+    Get the identifier index rows for a *_ids table, normalized as by
+    normalize_identifier() but with the vectorized validators of models.validate.
+
+    Args:
+        ids: the *_ids table, with the OpenAlex id of the entity as its first column
+        entity_type: the table of the entities, e.g. works
+    Returns:
+        a (entity_id, entity_type, id_type, id_value) frame with a row for every valid
+        identifier
+    """
+    schema = ids.collect_schema()
+    entity_id = schema.names()[0]
+    frames = []
+    for column, id_type in IDENTIFIER_COLUMNS.items():
+        if column not in schema:
+            continue
+        values = ids.select(
+            pl.col(entity_id).alias("entity_id"),
+            pl.lit(entity_type).alias("entity_type"),
+            pl.lit(id_type.value).alias("id_type"),
+            normalize_expr(column, id_type).alias("input"),
+        )
+        if validator := get_validator(id_type.value):
+            # the *_frame functions only return input, value and error, in input order
+            validated = VECTORIZED_VALIDATION_MAPPING[validator](values.select("input"))
+            values = pl.concat(
+                [values.drop("input"), validated.select(id_value="value")],
+                how="horizontal",
+            )
+        else:
+            values = values.rename({"input": "id_value"})
+        frames.append(values.with_columns(pl.col("id_value").str.to_lowercase()))
+    if not frames:
+        return pl.LazyFrame(schema=dict.fromkeys(INDEX_COLUMNS, pl.String))
+    return pl.concat(frames).filter(pl.col("id_value").is_not_null())
+
+
+def resolve_identifier(
+    conn: duckdb.DuckDBPyConnection,
+    value: str,
+    id_type: Identifier,
+    entity_type: str | None = None,
+) -> str | None:
+    """
+    Resolve an identifier to the OpenAlex id of its entity using the identifier index.
+
+    Args:
+        conn: a connection to a database with the openalex schema
+        value: the identifier, in any form normalize_identifier() accepts
+        id_type: the type of the identifier
+        entity_type: the table of the entity to resolve to, e.g. works. Needed for ids
+            that belong to entities of several types (MAG ids), optional otherwise.
+    Returns:
+        the OpenAlex id, or None if the identifier is invalid, not in the index, or
+        (without entity_type) belongs to entities of several types
+    Raises:
+        ValueError: if identifiers of the type are not indexed (UNINDEXED_IDENTIFIERS)
+    """
+    if id_type in UNINDEXED_IDENTIFIERS:
+        raise ValueError(f"{id_type.value} identifiers are not in the identifier index")
+    id_value = normalize_identifier(value, id_type)
+    if id_value is None:
+        return None
+    query = (
+        "SELECT entity_id FROM openalex.identifiers WHERE id_type = ? AND id_value = ?"
+    )
+    params = [index_type(id_type), id_value]
+    if entity_type is not None:
+        query += " AND entity_type = ?"
+        params.append(entity_type)
+    rows = conn.execute(query + " LIMIT 2", params).fetchall()
+    return rows[0][0] if len(rows) == 1 else None
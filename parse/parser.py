@@ -5,17 +5,19 @@ This module provides classes and functions to parse and normalize metadata from
 different sources into a consistent format.
 """
 
-from typing import Any, Protocol
+from typing import TYPE_CHECKING, Any, Protocol
 
-from models.schema import (
-    PublicationMetadata,
-)
+if TYPE_CHECKING:
+    # not defined yet in models.schema
+    from models.schema import (
+        PublicationMetadata,
+    )
 
 
 class Parser(Protocol):
     """Protocol for metadata parsers."""
 
-    def parse(self, raw_data: dict[str, Any]) -> PublicationMetadata | None:
+    def parse(self, raw_data: dict[str, Any]) -> "PublicationMetadata | None":
         """
         Parse raw data into standardized publication metadata.
 
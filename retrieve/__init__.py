@@ -2,6 +2,7 @@
 This module provides functionality to retrieve data from various APIs and sources.
 """
 
+from .cache import ResponseCache
 from .retriever import Retriever
 
-__all__ = ["Retriever"]
+__all__ = ["ResponseCache", "Retriever"]
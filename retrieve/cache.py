@@ -0,0 +1,220 @@
+"""
+persistent on-disk cache for retrieved records
+
+Records are stored as json files under CACHE_DIR, keyed by (source, id type, normalized id):
+
+    CACHE_DIR/<source>/<id type>/<sha1 of normalized id>.json
+
+Entries older than CACHE_TTL_DAYS are treated as misses and removed. When the total size
+of the cache exceeds the configured maximum, the least recently used entries are evicted.
+
+usage:
+    cache = ResponseCache()
+    record = cache.get("OpenAlex", Identifier.DOI, "10.1234/abcd")
+    if record is None:
+        record = ...  # retrieve from the source
+        cache.put("OpenAlex", Identifier.DOI, "10.1234/abcd", record)
+"""
+
+import hashlib
+import threading
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import srsly
+from loguru import logger
+
+from data.constants import CACHE_DIR, CACHE_MAX_SIZE_MB, CACHE_TTL_DAYS
+from models.enums import Identifier
+from models.validate import get_validator
+
+
+def normalize_id(id_value: str, id_type: Identifier) -> str:
+    """
+    Normalize an id using the validator for its type, so different spellings
+    of the same id (e.g. `doi:10.x` and `https://doi.org/10.x`) share a cache key.
+
+    Args:
+        id_value: the id to normalize
+        id_type: the type of the id
+    Returns:
+        str: the normalized id, or the stripped & lowercased input if it cannot be validated
+    """
+    validator = get_validator(id_type.value)
+    if validator:
+        try:
+            return validator(id_value)
+        except ValueError:
+            pass
+    return id_value.strip().lower()
+
+
+class ResponseCache:
+    """
+    On-disk cache for records retrieved by the connectors.
+
+    Attributes:
+        cache_dir: the directory the cache files are stored in
+        ttl: the max age of a cache entry before it expires
+        max_size: the max total size of the cache in bytes
+        hits: the number of lookups served from the cache
+        misses: the number of lookups not found in the cache (including expired entries)
+        evictions: the number of entries removed to keep the cache under max_size
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = CACHE_DIR,
+        ttl_days: float = CACHE_TTL_DAYS,
+        max_size_mb: float = CACHE_MAX_SIZE_MB,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.ttl = timedelta(days=ttl_days)
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._size: int | None = None
+
+    def path(self, source: str, id_type: Identifier, id_value: str) -> Path:
+        """
+        Get the path of the cache file for a (source, id type, id) combination
+        """
+        key = hashlib.sha1(
+            normalize_id(id_value, id_type).encode("utf-8"), usedforsecurity=False
+        ).hexdigest()
+        return self.cache_dir / source.lower() / id_type.value / f"{key}.json"
+
+    def get(self, source: str, id_type: Identifier, id_value: str) -> dict | None:
+        """
+        Get a cached record.
+
+        Args:
+            source: the name of the source the record was retrieved from
+            id_type: the type of the id
+            id_value: the id used to retrieve the record
+        Returns:
+            the cached record, or None if there is no (unexpired) entry
+        """
+        path = self.path(source, id_type, id_value)
+        try:
+            entry = srsly.read_json(path)
+            stored_at = datetime.fromisoformat(entry["stored_at"])
+        except (OSError, ValueError, KeyError):
+            self._count(hit=False)
+            return None
+
+        if datetime.now(UTC) - stored_at > self.ttl:
+            self._remove(path)
+            self._count(hit=False)
+            return None
+
+        # mark as recently used for LRU eviction
+        path.touch()
+        self._count(hit=True)
+        return entry["data"]
+
+    def put(self, source: str, id_type: Identifier, id_value: str, data: dict) -> None:
+        """
+        Store a record in the cache, evicting old entries if the cache grows too large.
+
+        Args:
+            source: the name of the source the record was retrieved from
+            id_type: the type of the id
+            id_value: the id used to retrieve the record
+            data: the retrieved record
+        """
+        path = self.path(source, id_type, id_value)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "source": source,
+            "id_type": id_type.value,
+            "id": normalize_id(id_value, id_type),
+            "stored_at": datetime.now(UTC).isoformat(),
+            "data": data,
+        }
+        old_size = path.stat().st_size if path.exists() else 0
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            srsly.write_json(tmp_path, entry, indent=0)
+            tmp_path.replace(path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(
+                "Could not cache {} {} for {}: {}", id_type, id_value, source, e
+            )
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            self._size = self.size() + path.stat().st_size - old_size
+        if self._size > self.max_size:
+            self.evict()
+
+    def delete(self, source: str, id_type: Identifier, id_value: str) -> None:
+        """
+        Remove a record from the cache, e.g. because it was deleted at the source
+        """
+        self._remove(self.path(source, id_type, id_value))
+
+    def size(self) -> int:
+        """
+        Get the total size of all cache entries in bytes
+        """
+        if self._size is None:
+            self._size = sum(p.stat().st_size for p in self.cache_dir.rglob("*.json"))
+        return self._size
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache is below 90% of max_size
+        """
+        target = int(self.max_size * 0.9)
+        entries = sorted(
+            (stat.st_mtime, stat.st_size, p)
+            for p in self.cache_dir.rglob("*.json")
+            if (stat := p.stat())
+        )
+        with self._lock:
+            self._size = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if self._size <= target:
+                    break
+                path.unlink(missing_ok=True)
+                self._size -= size
+                self.evictions += 1
+        logger.debug("Cache eviction done, size is now {} bytes", self._size)
+
+    def clear(self) -> None:
+        """
+        Remove all entries from the cache
+        """
+        for path in self.cache_dir.rglob("*.json"):
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._size = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get the hit/miss/eviction counters and the current size of the cache
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size_bytes": self.size(),
+        }
+
+    def _count(self, *, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _remove(self, path: Path) -> None:
+        size = path.stat().st_size if path.exists() else 0
+        path.unlink(missing_ok=True)
+        with self._lock:
+            if self._size is not None:
+                self._size -= size
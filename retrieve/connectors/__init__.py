@@ -4,22 +4,21 @@ Connectors for different data sources.
 This module provides connectors to retrieve data from various APIs and sources.
 """
 
-from .base import (
-    Connector,
-    CrossrefConnector,
-    DataCiteConnector,
-    OpenAIREConnector,
-    OpenAlexConnector,
-    ORCIDConnector,
-    PubMedConnector,
-    PureConnector,
-)
+from .base import Connector, OpenAlexConnector
+from .crossref import CrossrefConnector
+from .datacite import DataCiteConnector
+from .local import LocalOpenAlexConnector
+from .openaire import OpenAIREConnector
+from .orcid import ORCIDConnector
+from .pubmed import PubMedConnector
+from .pure import PureConnector
 
 __all__ = [
     "BaseConnector",
     "Connector",
     "CrossrefConnector",
     "DataCiteConnector",
+    "LocalOpenAlexConnector",
     "OpenAIREConnector",
     "OpenAlexConnector",
     "ORCIDConnector",
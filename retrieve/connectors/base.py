@@ -2,13 +2,20 @@
 base classes / enums / ... for all connectors
 """
 
-import contextlib
+import itertools
+from collections import defaultdict
+from collections.abc import Iterator
 from typing import Protocol
 
+import httpx
 import pyalex
-from pyalex import Works
+from loguru import logger
 
+from data.constants import MAX_RETRIES, RETRY_BACKOFF_FACTOR, RETRY_STATUS_CODES
 from models.enums import Identifier
+from parse.abstract import invert_abstract
+
+from ..transport import get_client
 
 
 class Connector(Protocol):
@@ -33,6 +40,16 @@ class Connector(Protocol):
         """
         ...
 
+    async def aget(
+        self, client: httpx.AsyncClient, ids: dict[str, Identifier] | None = None
+    ) -> dict[str, dict]:
+        """
+        Async variant of get: retrieve data for the given ids (or all ids stored
+        via add_id) using the shared client.
+        returns a dict with the used id as key and the retrieved data dict as value
+        """
+        ...
+
     def setup(self) -> None:
         """
         Setup the connector (e.g. set up API keys, etc.) if needed
@@ -43,8 +60,19 @@ class Connector(Protocol):
 class OpenAlexConnector(Connector):
     """
     Connector for OpenAlex API
+
+    Ids are looked up in batches of up to BATCH_SIZE values per request, using
+    OpenAlex's OR-filter syntax (e.g. `doi:10.1/a|10.1/b`). The results are
+    mapped back to the input ids by their normalized DOI / PMID.
     """
 
+    API_URL = "https://api.openalex.org/works"
+    BATCH_SIZE = 50
+    FILTER_KEYS: dict[Identifier, str] = {
+        Identifier.DOI: "doi",
+        Identifier.PMID: "pmid",
+    }
+
     def __init__(self) -> None:
         self.ids: dict[str, Identifier] = {}
 
@@ -55,7 +83,7 @@ class OpenAlexConnector(Connector):
         :param id: the id to add
         :param id_type: the type of id to add (see Identifier enum)
         """
-        if id_type == Identifier.DOI:
+        if id_type in self.FILTER_KEYS:
             self.ids[id] = id_type
 
     def setup(self) -> None:
@@ -63,9 +91,74 @@ class OpenAlexConnector(Connector):
         Setup openalex
         """
         pyalex.config.email = "mail@example.com"
-        pyalex.config.max_retries = 0
-        pyalex.config.retry_backoff_factor = 0.1
-        pyalex.config.retry_http_codes = [429, 500, 503]
+        pyalex.config.max_retries = MAX_RETRIES
+        pyalex.config.retry_backoff_factor = RETRY_BACKOFF_FACTOR
+        pyalex.config.retry_http_codes = RETRY_STATUS_CODES
+
+    @staticmethod
+    def normalize(id_value: str, id_type: Identifier) -> str:
+        """
+        Normalize a DOI or PMID (either user input or a value from an OpenAlex record)
+        so input ids and retrieved records can be matched
+        """
+        id_value = id_value.strip().lower()
+        if id_type == Identifier.DOI:
+            return (
+                "10." + id_value.split("10.", 1)[-1] if "10." in id_value else id_value
+            )
+        return id_value.rstrip("/").rsplit("/", 1)[-1].removeprefix("pmid:")
+
+    def batches(
+        self, ids: dict[str, Identifier]
+    ) -> Iterator[tuple[Identifier, dict[str, str]]]:
+        """
+        Split ids into batches of at most BATCH_SIZE ids of a single id type
+
+        Yields:
+            tuples of (id type, {normalized id: input id})
+        """
+        grouped: dict[Identifier, list[str]] = defaultdict(list)
+        for id_value, id_type in ids.items():
+            if id_type in self.FILTER_KEYS:
+                grouped[id_type].append(id_value)
+        for id_type, id_values in grouped.items():
+            for batch in itertools.batched(id_values, self.BATCH_SIZE, strict=False):
+                yield id_type, {self.normalize(v, id_type): v for v in batch}
+
+    def match_results(
+        self, results: list[dict], id_type: Identifier, batch: dict[str, str]
+    ) -> dict[str, dict]:
+        """
+        Map the records returned for a batch back to the input ids of that batch
+        """
+        matched: dict[str, dict] = {}
+        for record in results:
+            if id_type == Identifier.DOI:
+                record_id = record.get("doi")
+            else:
+                record_id = (record.get("ids") or {}).get("pmid")
+            if not record_id:
+                continue
+            input_id = batch.get(self.normalize(record_id, id_type))
+            if input_id is None or input_id in matched:
+                continue
+            record["abstract"] = invert_abstract(
+                record.pop("abstract_inverted_index", None)
+            )
+            matched[input_id] = record
+        return matched
+
+    def params(self, id_type: Identifier, batch: dict[str, str]) -> dict[str, str]:
+        """
+        Build the query parameters to retrieve a batch of ids
+        """
+        params = {
+            "filter": f"{self.FILTER_KEYS[id_type]}:{'|'.join(batch)}",
+            "per-page": str(self.BATCH_SIZE),
+        }
+        if pyalex.config.email:
+            params["mailto"] = pyalex.config.email
+        return params
 
     def get(
         self, id: str | None = None, id_type: Identifier | None = None
@@ -84,144 +177,52 @@ class OpenAlexConnector(Connector):
             return {}
 
         self.data = {}
-        for id_value, id_type in retrieval_ids.items():  # noqa: PLR1704
-            if id_type == Identifier.DOI:
-                try:
-                    self.data[id_value] = list(Works().filter(doi=id_value).get())[0]
-                    with contextlib.suppress(KeyError):
-                        del self.data[id_value]["abstract_inverted_index"]
-
-                except Exception as e:
-                    print("Error retrieving data for DOI:", id_value)
-                    print(e)
-                    continue
-
-            if id_type == Identifier.PMID:
-                try:
-                    self.data[id_value] = Works().filter(pmid=id_value).get()
-                except Exception:
-                    continue
+        client = get_client()
+        for batch_type, batch in self.batches(retrieval_ids):
+            try:
+                response = client.get(
+                    self.API_URL, params=self.params(batch_type, batch)
+                )
+                response.raise_for_status()
+                results: list[dict] = response.json().get("results", [])
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning(
+                    "Error retrieving OpenAlex {} batch {}: {}",
+                    batch_type.value,
+                    list(batch),
+                    e,
+                )
+                continue
+            self.data.update(self.match_results(results, batch_type, batch))
         return self.data
 
-    def __str__(self) -> str:
-        return "OpenAlex"
-
-
-class OpenAIREConnector(Connector):
-    """
-    Connector for OpenAIRE API
-    """
-
-    def __init__(self) -> None:
-        self.ids: dict[str, Identifier] = {}
-        self.data: dict[str, dict] = {}
-
-    def add_id(self, id: str, id_type: Identifier) -> None:
-        """
-        Add an id to the connector to retrieve data from
-
-        :param id: the id to add
-        :param id_type: the type of id to add (see Identifier enum)
-        """
-        if id_type == Identifier.DOI:
-            self.ids[id] = id_type
-
-
-class CrossrefConnector(Connector):
-    """
-    Connector for Crossref API
-    """
-
-    def __init__(self) -> None:
-        self.ids: dict[str, Identifier] = {}
-        self.data: dict[str, dict] = {}
-
-    def add_id(self, id: str, id_type: Identifier) -> None:
-        """
-        Add an id to the connector to retrieve data from
-
-        :param id: the id to add
-        :param id_type: the type of id to add (see Identifier enum)
-        """
-        if id_type == Identifier.DOI:
-            self.ids[id] = id_type
-
-
-class DataCiteConnector(Connector):
-    """
-    Connector for DataCite API
-    """
-
-    def __init__(self) -> None:
-        self.ids: dict[str, Identifier] = {}
-        self.data: dict[str, dict] = {}
-
-    def add_id(self, id: str, id_type: Identifier) -> None:
-        """
-        Add an id to the connector to retrieve data from
-
-        :param id: the id to add
-        :param id_type: the type of id to add (see Identifier enum)
-        """
-        if id_type == Identifier.DOI:
-            self.ids[id] = id_type
-
-
-class PureConnector(Connector):
-    """
-    Connector for Pure API
-    """
-
-    def __init__(self) -> None:
-        self.ids: dict[str, Identifier] = {}
-        self.data: dict[str, dict] = {}
-
-    def add_id(self, id: str, id_type: Identifier) -> None:
-        """
-        Add an id to the connector to retrieve data from
-
-        :param id: the id to add
-        :param id_type: the type of id to add (see Identifier enum)
-        """
-        if id_type == Identifier.DOI:
-            self.ids[id] = id_type
-
-
-class PubMedConnector(Connector):
-    """
-    Connector for PubMed API
-    """
-
-    def __init__(self) -> None:
-        self.ids: dict[str, Identifier] = {}
-        self.data: dict[str, dict] = {}
-
-    def add_id(self, id: str, id_type: Identifier) -> None:
-        """
-        Add an id to the connector to retrieve data from
-
-        :param id: the id to add
-        :param id_type: the type of id to add (see Identifier enum)
+    async def aget(
+        self, client: httpx.AsyncClient, ids: dict[str, Identifier] | None = None
+    ) -> dict[str, dict]:
         """
-        if id_type == Identifier.PMID:
-            self.ids[id] = id_type
-
-
-class ORCIDConnector(Protocol):
-    """
-    Connector for ORCID API
-    """
-
-    def __init__(self) -> None:
-        self.ids: dict[str, Identifier] = {}
-        self.data: dict[str, dict] = {}
-
-    def add_id(self, id: str, id_type: Identifier) -> None:
+        Async retrieval of the given ids (or all ids stored via add_id) using the
+        OpenAlex REST API directly, so requests can share one httpx.AsyncClient.
+        returns a dict with the used id as key and the retrieved data dict as value
         """
-        Add an id to the connector to retrieve data from
+        retrieval_ids = ids if ids is not None else self.ids
+        data: dict[str, dict] = {}
+        for batch_type, batch in self.batches(retrieval_ids):
+            try:
+                response = await client.get(
+                    self.API_URL, params=self.params(batch_type, batch)
+                )
+                response.raise_for_status()
+                results: list[dict] = response.json().get("results", [])
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning(
+                    "Error retrieving OpenAlex {} batch {}: {}",
+                    batch_type.value,
+                    list(batch),
+                    e,
+                )
+                continue
+            data.update(self.match_results(results, batch_type, batch))
+        return data
 
-        :param id: the id to add
-        :param id_type: the type of id to add (see Identifier enum)
-        """
-        if id_type == Identifier.ORCID:
-            self.ids[id] = id_type
+    def __str__(self) -> str:
+        return "OpenAlex"
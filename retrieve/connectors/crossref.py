@@ -0,0 +1,270 @@
+"""
+connector for the Crossref REST API (https://api.crossref.org)
+
+Queued DOIs are resolved in batches of BATCH_SIZE per request, with Crossref's
+multi-filter: repeating a filter ORs its values (`filter=doi:10.1/a,doi:10.1/b`). DOIs
+that contain a comma can't be part of such a filter, and are retrieved one by one from
+/works/{doi}. With `select`, only the given fields of each record are returned, which
+makes the responses a lot smaller.
+
+Whole prefixes, ISSNs or other filters are harvested with cursor deep paging
+(harvest() / aharvest()), at up to MAX_ROWS records per request: the async variant
+already requests the next page while the current page is being processed.
+
+All requests go through the shared clients from retrieve.transport. If CONTACT_EMAIL
+is set it is sent as `mailto`, which puts the requests in Crossref's polite pool.
+
+usage:
+    connector = CrossrefConnector(select=["DOI", "title", "author"])
+    connector.add_id("10.1063/1.366536", Identifier.DOI)
+    records = connector.get()
+    for page in connector.harvest({"prefix": "10.1063"}):
+        ...
+"""
+
+import asyncio
+import itertools
+from collections.abc import AsyncIterator, Iterator
+from urllib.parse import quote
+
+import httpx
+from loguru import logger
+
+from data.constants import CONTACT_EMAIL
+from models.enums import Identifier
+
+from ..transport import get_async_client, get_client
+from .base import Connector
+
+
+class CrossrefConnector(Connector):
+    """
+    Connector for the Crossref REST API
+
+    Attributes:
+        select: the fields to return for every record, None for the full records
+    """
+
+    API_URL = "https://api.crossref.org/works"
+    BATCH_SIZE = 50
+    # the max number of rows Crossref returns per request
+    MAX_ROWS = 1000
+
+    def __init__(self, select: list[str] | None = None) -> None:
+        self.ids: dict[str, Identifier] = {}
+        self.data: dict[str, dict] = {}
+        self.select = select
+
+    def add_id(self, id: str, id_type: Identifier) -> None:
+        """
+        Add an id to the connector to retrieve data from
+
+        :param id: the id to add
+        :param id_type: the type of id to add (see Identifier enum)
+        """
+        if id_type == Identifier.DOI:
+            self.ids[id] = id_type
+
+    def setup(self) -> None:
+        """
+        Crossref needs no setup, see CONTACT_EMAIL for the polite pool
+        """
+
+    @staticmethod
+    def normalize(doi: str) -> str:
+        """
+        Normalize a DOI (either user input or the DOI of a Crossref record), so input ids
+        and retrieved records can be matched
+        """
+        doi = doi.strip().lower()
+        return "10." + doi.split("10.", 1)[-1] if "10." in doi else doi
+
+    def batches(self, ids: dict[str, Identifier]) -> Iterator[dict[str, str]]:
+        """
+        Split the DOIs into batches for the doi multi-filter: DOIs with a comma are
+        yielded as batches of their own
+
+        Yields:
+            {normalized DOI: input DOI} dicts
+        """
+        dois = [doi for doi, id_type in ids.items() if id_type == Identifier.DOI]
+        for doi in dois:
+            if "," in doi:
+                yield {self.normalize(doi): doi}
+        for batch in itertools.batched(
+            (doi for doi in dois if "," not in doi), self.BATCH_SIZE, strict=False
+        ):
+            yield {self.normalize(doi): doi for doi in batch}
+
+    def params(self, **params: str | int) -> dict[str, str]:
+        """
+        Add the field projection and the contact email to the query parameters
+        """
+        if self.select:
+            # the DOI is needed to match the records to the input ids
+            params["select"] = ",".join(dict.fromkeys(["DOI", *self.select]))
+        if CONTACT_EMAIL:
+            params["mailto"] = CONTACT_EMAIL
+        return {k: str(v) for k, v in params.items()}
+
+    def request(self, batch: dict[str, str]) -> tuple[str, dict[str, str]]:
+        """
+        Build the url and query parameters to retrieve a batch of DOIs
+        """
+        if len(batch) == 1 and "," in (doi := next(iter(batch))):
+            return f"{self.API_URL}/{quote(doi, safe='/')}", self.params()
+        return self.API_URL, self.params(
+            filter=",".join(f"doi:{doi}" for doi in batch), rows=len(batch)
+        )
+
+    def match_results(self, message: dict, batch: dict[str, str]) -> dict[str, dict]:
+        """
+        Map the records of a response back to the input DOIs of the batch
+        """
+        items = message.get("items", [message] if "DOI" in message else [])
+        matched: dict[str, dict] = {}
+        for record in items:
+            input_id = batch.get(self.normalize(record.get("DOI", "")))
+            if input_id is not None and input_id not in matched:
+                matched[input_id] = record
+        return matched
+
+    @staticmethod
+    def message(response: httpx.Response) -> dict:
+        if response.status_code == httpx.codes.NOT_FOUND:
+            return {}
+        response.raise_for_status()
+        return response.json().get("message", {})
+
+    def get(
+        self, id: str | None = None, id_type: Identifier | None = None
+    ) -> dict[str, dict]:
+        """
+        Perform the retrieval of data for each id stored via add_id
+        returns a dict with the used id as key and the retrieved data dict as value
+        """
+        retrieval_ids = {id: id_type} if id and id_type else self.ids
+        self.data = {}
+        client = get_client()
+        for batch in self.batches(retrieval_ids):
+            url, params = self.request(batch)
+            try:
+                message = self.message(client.get(url, params=params))
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning("Error retrieving Crossref batch {}: {}", list(batch), e)
+                continue
+            self.data.update(self.match_results(message, batch))
+        return self.data
+
+    async def aget(
+        self, client: httpx.AsyncClient, ids: dict[str, Identifier] | None = None
+    ) -> dict[str, dict]:
+        """
+        Async retrieval of the given ids (or all ids stored via add_id), with the
+        batches requested concurrently on the shared client.
+        returns a dict with the used id as key and the retrieved data dict as value
+        """
+        retrieval_ids = ids if ids is not None else self.ids
+
+        async def fetch(batch: dict[str, str]) -> dict[str, dict]:
+            url, params = self.request(batch)
+            try:
+                message = self.message(await client.get(url, params=params))
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning("Error retrieving Crossref batch {}: {}", list(batch), e)
+                return {}
+            return self.match_results(message, batch)
+
+        data: dict[str, dict] = {}
+        for matched in await asyncio.gather(
+            *(fetch(batch) for batch in self.batches(retrieval_ids))
+        ):
+            data.update(matched)
+        return data
+
+    def harvest_params(
+        self, filters: dict[str, str], cursor: str, rows: int
+    ) -> dict[str, str]:
+        """
+        Build the query parameters for a page of a deep paging harvest
+        """
+        return self.params(
+            filter=",".join(f"{k}:{v}" for k, v in filters.items()),
+            rows=rows,
+            cursor=cursor,
+        )
+
+    def harvest(
+        self, filters: dict[str, str], rows: int = MAX_ROWS
+    ) -> Iterator[list[dict]]:
+        """
+        Harvest all records that match the filters with cursor deep paging.
+
+        Args:
+            filters: the Crossref filters, e.g. {"prefix": "10.1063"} or
+                {"issn": "0021-8979", "from-pub-date": "2020"}
+            rows: the number of records per page, at most MAX_ROWS
+        Yields:
+            the records of each page
+        """
+        client = get_client()
+        rows = min(rows, self.MAX_ROWS)
+        cursor = "*"
+        while True:
+            response = client.get(
+                self.API_URL, params=self.harvest_params(filters, cursor, rows)
+            )
+            message = self.message(response)
+            if not (items := message.get("items")):
+                return
+            yield items
+            # a short page is the last one
+            if len(items) < rows:
+                return
+            cursor = message["next-cursor"]
+
+    async def aharvest(
+        self,
+        filters: dict[str, str],
+        rows: int = MAX_ROWS,
+        client: httpx.AsyncClient | None = None,
+    ) -> AsyncIterator[list[dict]]:
+        """
+        Async variant of harvest: the next page is requested as soon as the cursor for
+        it is known, so it is retrieved while the current page is being processed.
+
+        Args:
+            filters: the Crossref filters, e.g. {"prefix": "10.1063"}
+            rows: the number of records per page, at most MAX_ROWS
+            client: the client to use, the shared async client if None
+        Yields:
+            the records of each page
+        """
+        client = client or get_async_client()
+        rows = min(rows, self.MAX_ROWS)
+        page = asyncio.create_task(
+            client.get(self.API_URL, params=self.harvest_params(filters, "*", rows))
+        )
+        try:
+            while True:
+                message = self.message(await page)
+                if not (items := message.get("items")):
+                    return
+                # a short page is the last one
+                if len(items) < rows:
+                    yield items
+                    return
+                page = asyncio.create_task(
+                    client.get(
+                        self.API_URL,
+                        params=self.harvest_params(
+                            filters, message["next-cursor"], rows
+                        ),
+                    )
+                )
+                yield items
+        finally:
+            page.cancel()
+
+    def __str__(self) -> str:
+        return "Crossref"
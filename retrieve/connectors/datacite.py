@@ -0,0 +1,309 @@
+"""
+connector for the DataCite GraphQL API (https://api.datacite.org/graphql)
+
+Many queued DOIs are packed into a single GraphQL request with an aliased `work` query per
+DOI (d0: work(id: $d0) {...}, d1: ...). The response is decoded incrementally while it
+streams in (see GraphQLResponseDecoder): the record of every alias is decoded as soon as
+it is complete and mapped back to its input DOI, so a large response is never held in
+memory as a whole.
+
+The number of DOIs per request adapts to the observed response time: it grows while
+requests take less than half of TARGET_RESPONSE_TIME and shrinks when they take longer.
+A request that fails is retried as two smaller ones.
+
+usage:
+    connector = DataCiteConnector()
+    connector.add_id("10.5281/zenodo.1234", Identifier.DOI)
+    records = connector.get()
+"""
+
+import json
+import re
+import time
+from collections import deque
+from typing import Any
+
+import httpx
+from loguru import logger
+
+from models.enums import Identifier
+
+from ..transport import get_client
+from .base import Connector
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class GraphQLResponseDecoder:
+    """
+    Incremental decoder for GraphQL responses.
+
+    Feed it the text of a response as it arrives: it returns the members of the "data"
+    object (the results of the aliased queries) as soon as each of them is complete. Other
+    members of the response (e.g. "errors") are decoded as a whole.
+
+    Attributes:
+        errors: the errors of the response
+        members: the number of members of the data object decoded so far
+        done: whether the whole response has been decoded
+    """
+
+    def __init__(self) -> None:
+        self.errors: list[dict] = []
+        self.members = 0
+        self.done = False
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        # 0: before the response object, 1: in the response, 2: in its data object
+        self._level = 0
+        self._expect = "{"
+        self._key: str | None = None
+
+    def feed(self, text: str) -> list[tuple[str, Any]]:  # noqa: PLR0912
+        """
+        Decode the next part of the response
+
+        Returns:
+            the (alias, result) members of the data object completed by this part
+        """
+        self._buffer += text
+        members: list[tuple[str, Any]] = []
+        while not self.done:
+            self._position = WHITESPACE.match(self._buffer, self._position).end()
+            if self._position >= len(self._buffer):
+                break
+            char = self._buffer[self._position]
+            if self._expect == "{":
+                if char != "{":
+                    raise ValueError(f"Expected a json object, got {char!r}")
+                self._position += 1
+                self._level += 1
+                self._expect = "key"
+            elif self._expect in ("key", ",") and char == "}":
+                # the end of the current object
+                self._position += 1
+                self._level -= 1
+                self._expect = ","
+                self.done = self._level == 0
+            elif self._expect == ",":
+                if char != ",":
+                    raise ValueError(f"Expected ',' or '}}', got {char!r}")
+                self._position += 1
+                self._expect = "key"
+            elif self._expect == ":":
+                if char != ":":
+                    raise ValueError(f"Expected ':', got {char!r}")
+                self._position += 1
+                self._expect = "value"
+            elif self._expect == "value" and (
+                self._level == 1 and self._key == "data" and char == "{"
+            ):
+                self._position += 1
+                self._level = 2
+                self._expect = "key"
+            else:
+                # a key or a value: wait for more text if it is not complete yet
+                try:
+                    decoded, self._position = self._decoder.raw_decode(
+                        self._buffer, self._position
+                    )
+                except json.JSONDecodeError:
+                    break
+                if self._expect == "key":
+                    self._key = decoded
+                    self._expect = ":"
+                    continue
+                if self._level == 2:  # noqa: PLR2004
+                    members.append((self._key, decoded))
+                    self.members += 1
+                elif self._key == "errors":
+                    self.errors = decoded or []
+                self._expect = ","
+        # drop the decoded text
+        self._buffer = self._buffer[self._position :]
+        self._position = 0
+        return members
+
+    def close(self) -> None:
+        """
+        Check that the whole response was decoded
+        """
+        if not self.done:
+            raise ValueError("Incomplete GraphQL response")
+
+
+class DataCiteConnector(Connector):
+    """
+    Connector for the DataCite GraphQL API
+
+    Attributes:
+        batch_size: the current number of DOIs per request, adapted to the response times
+    """
+
+    API_URL = "https://api.datacite.org/graphql"
+    # the number of ids the retriever hands to aget at once, and the max batch size
+    BATCH_SIZE = 100
+    MIN_BATCH_SIZE = 1
+    INITIAL_BATCH_SIZE = 25
+    TARGET_RESPONSE_TIME = 2.0  # seconds
+    FIELDS = """
+        id
+        doi
+        url
+        publicationYear
+        titles { title }
+        creators { name givenName familyName }
+        descriptions { description }
+        subjects { subject }
+        types { resourceTypeGeneral resourceType }
+    """
+
+    def __init__(self) -> None:
+        self.ids: dict[str, Identifier] = {}
+        self.data: dict[str, dict] = {}
+        self.batch_size = self.INITIAL_BATCH_SIZE
+
+    def add_id(self, id: str, id_type: Identifier) -> None:
+        """
+        Add an id to the connector to retrieve data from
+
+        :param id: the id to add
+        :param id_type: the type of id to add (see Identifier enum)
+        """
+        if id_type == Identifier.DOI:
+            self.ids[id] = id_type
+
+    def setup(self) -> None:
+        """
+        The public GraphQL API needs no setup
+        """
+
+    def payload(self, dois: list[str]) -> dict:
+        """
+        Build the aliased GraphQL query for a batch of DOIs: alias d<i> is dois[i]
+        """
+        variables = {f"d{i}": doi for i, doi in enumerate(dois)}
+        query = (
+            f"fragment fields on Work {{ {' '.join(self.FIELDS.split())} }}\n"
+            f"query ({', '.join(f'${alias}: ID!' for alias in variables)}) {{ "
+            + " ".join(
+                f"{alias}: work(id: ${alias}) {{ ...fields }}" for alias in variables
+            )
+            + " }"
+        )
+        return {"query": query, "variables": variables}
+
+    def adapt(self, elapsed: float) -> None:
+        """
+        Adapt the batch size to the response time of the last request
+        """
+        if elapsed > self.TARGET_RESPONSE_TIME:
+            self.batch_size = max(self.MIN_BATCH_SIZE, self.batch_size // 2)
+        elif elapsed < self.TARGET_RESPONSE_TIME / 2:
+            self.batch_size = min(self.BATCH_SIZE, self.batch_size * 2)
+
+    def failed(self, batch: list[str], queue: deque[str], error: Exception) -> None:
+        """
+        Handle a failed request: retry its DOIs in smaller batches, or give up on a
+        single DOI
+        """
+        if len(batch) > 1:
+            self.batch_size = max(self.MIN_BATCH_SIZE, len(batch) // 2)
+            queue.extendleft(reversed(batch))
+        else:
+            logger.warning("Error retrieving DataCite DOI {}: {}", batch[0], error)
+
+    @staticmethod
+    def check(decoder: GraphQLResponseDecoder, batch: list[str]) -> None:
+        """
+        Check a decoded response: errors without any results (e.g. an error that nulled
+        the whole data object) fail the batch, other errors (such as DOIs that were not
+        found) are logged
+        """
+        decoder.close()
+        if not decoder.errors:
+            return
+        messages = "; ".join(
+            str(error.get("message", error)) for error in decoder.errors
+        )
+        if not decoder.members:
+            raise ValueError(f"GraphQL errors: {messages}")
+        logger.debug("DataCite errors for batch {}: {}", batch, messages)
+
+    @staticmethod
+    def records(members: list[tuple[str, Any]], batch: list[str]) -> dict[str, dict]:
+        """
+        Map the decoded (alias, record) members back to the input DOIs of the batch
+        """
+        return {
+            batch[int(alias.removeprefix("d"))]: record
+            for alias, record in members
+            if record is not None
+        }
+
+    def get(
+        self, id: str | None = None, id_type: Identifier | None = None
+    ) -> dict[str, dict]:
+        """
+        Perform the retrieval of data for each id stored via add_id
+        returns a dict with the used id as key and the retrieved data dict as value
+        """
+        retrieval_ids = {id: id_type} if id and id_type else self.ids
+        queue = deque(
+            doi for doi, doi_type in retrieval_ids.items() if doi_type == Identifier.DOI
+        )
+        self.data = {}
+        client = get_client()
+        while queue:
+            batch = [queue.popleft() for _ in range(min(self.batch_size, len(queue)))]
+            decoder = GraphQLResponseDecoder()
+            start = time.monotonic()
+            try:
+                with client.stream(
+                    "POST", self.API_URL, json=self.payload(batch)
+                ) as response:
+                    response.raise_for_status()
+                    for text in response.iter_text():
+                        self.data.update(self.records(decoder.feed(text), batch))
+                self.check(decoder, batch)
+            except (httpx.HTTPError, ValueError) as e:
+                self.failed(batch, queue, e)
+                continue
+            self.adapt(time.monotonic() - start)
+        return self.data
+
+    async def aget(
+        self, client: httpx.AsyncClient, ids: dict[str, Identifier] | None = None
+    ) -> dict[str, dict]:
+        """
+        Async retrieval of the given ids (or all ids stored via add_id) using the shared
+        client. The batches are sent one after another, so every batch size is based on
+        the response time of the previous request.
+        returns a dict with the used id as key and the retrieved data dict as value
+        """
+        retrieval_ids = ids if ids is not None else self.ids
+        queue = deque(
+            doi for doi, doi_type in retrieval_ids.items() if doi_type == Identifier.DOI
+        )
+        data: dict[str, dict] = {}
+        while queue:
+            batch = [queue.popleft() for _ in range(min(self.batch_size, len(queue)))]
+            decoder = GraphQLResponseDecoder()
+            start = time.monotonic()
+            try:
+                async with client.stream(
+                    "POST", self.API_URL, json=self.payload(batch)
+                ) as response:
+                    response.raise_for_status()
+                    async for text in response.aiter_text():
+                        data.update(self.records(decoder.feed(text), batch))
+                self.check(decoder, batch)
+            except (httpx.HTTPError, ValueError) as e:
+                self.failed(batch, queue, e)
+                continue
+            self.adapt(time.monotonic() - start)
+        return data
+
+    def __str__(self) -> str:
+        return "DataCite"
@@ -0,0 +1,340 @@
+"""
+local-first OpenAlex connector, backed by a DuckDB database with the openalex schema
+
+The database is the one filled by testing.py (harvest / sync) or by the snapshot
+flattener (see .github/openalex_data_load). DOIs and PMIDs are resolved through
+openalex.works_ids, and the work is rebuilt from openalex.works and its child tables in
+the shape of an OpenAlex api record. Only the ids that are not in the database are
+retrieved from the api.
+
+The database is opened read-only for each batch of lookups only, so it can be written to
+(by harvest / sync or the ingestor) in between. The records that were found are kept in an
+in-process LRU cache of LOCAL_LOOKUP_CACHE_SIZE ids, which is cleared whenever the database
+file changes. Misses are not cached: ids ingested later are found on the next lookup.
+
+usage:
+    connector = LocalOpenAlexConnector()
+    connector.add_id("10.1063/1.366536", Identifier.DOI)
+    records = connector.get()  # served from the database if possible
+"""
+
+import asyncio
+import copy
+import itertools
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import duckdb
+import httpx
+from loguru import logger
+
+from data.constants import LOCAL_OPENALEX_DB
+from models.enums import Identifier
+from parse.abstract import invert_abstract
+
+from .base import OpenAlexConnector
+
+LOCAL_LOOKUP_CACHE_SIZE = 10_000
+
+
+def db_version(db_path: Path) -> tuple[int, ...] | None:
+    """
+    The modification times of the database and its write-ahead log, to detect changes
+
+    Returns:
+        None if the database does not exist
+    """
+    try:
+        version = (db_path.stat().st_mtime_ns,)
+    except OSError:
+        return None
+    wal = db_path.with_name(db_path.name + ".wal")
+    return version + ((wal.stat().st_mtime_ns,) if wal.exists() else ())
+
+
+@contextmanager
+def local_connection(
+    db_path: Path,
+) -> Iterator[tuple[duckdb.DuckDBPyConnection, frozenset[str]] | None]:
+    """
+    Open the database read-only, for the duration of the with block.
+
+    Yields:
+        the connection and the names of the non-empty tables in the openalex schema, or
+        None if the database does not exist, can't be opened (e.g. because another
+        process is writing to it) or has no works
+    """
+    if not db_path.exists():
+        yield None
+        return
+    try:
+        conn = duckdb.connect(str(db_path), read_only=True)
+    except duckdb.Error as e:
+        logger.warning("Skipping local OpenAlex lookups, can't open {}: {}", db_path, e)
+        yield None
+        return
+    try:
+        tables = frozenset(
+            row[0]
+            for row in conn.execute(
+                "SELECT table_name FROM duckdb_tables() "
+                "WHERE schema_name = 'openalex' AND estimated_size > 0"
+            ).fetchall()
+        )
+        yield (conn, tables) if {"works", "works_ids"} <= tables else None
+    finally:
+        conn.close()
+
+
+def fetch_dicts(
+    cursor: duckdb.DuckDBPyConnection, query: str, params: dict
+) -> list[dict]:
+    """
+    Run a query and return the rows as dicts
+    """
+    rows = cursor.execute(query, params).fetchall()
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row, strict=True)) for row in rows]
+
+
+def location(row: dict) -> dict:
+    """
+    Rebuild a location from a row of one of the works_*locations tables
+    """
+    return {
+        "source": {"id": row["source_id"]} if row["source_id"] else None,
+        **{k: v for k, v in row.items() if k not in ("work_id", "source_id")},
+    }
+
+
+def authorships(rows: list[dict]) -> list[dict]:
+    """
+    Rebuild the authorships of a work from its works_authorships rows, which have a row
+    per (authorship, institution)
+    """
+    return [
+        {
+            "author_position": author_position,
+            "author": {"id": author_id},
+            "institutions": [
+                {"id": row["institution_id"]}
+                for row in group
+                if row["institution_id"] is not None
+            ],
+            "raw_affiliation_string": raw_affiliation_string,
+        }
+        for (author_position, author_id, raw_affiliation_string), group in (
+            itertools.groupby(
+                rows,
+                key=lambda row: (
+                    row["author_position"],
+                    row["author_id"],
+                    row["raw_affiliation_string"],
+                ),
+            )
+        )
+    ]
+
+
+def without_work_id(row: dict) -> dict:
+    return {k: v for k, v in row.items() if k != "work_id"}
+
+
+# child table -> (field of the api record, function that rebuilds the field from rows)
+CHILD_TABLES = {
+    "works_ids": ("ids", lambda rows: without_work_id(rows[0])),
+    "works_open_access": ("open_access", lambda rows: without_work_id(rows[0])),
+    "works_biblio": ("biblio", lambda rows: without_work_id(rows[0])),
+    "works_primary_locations": ("primary_location", lambda rows: location(rows[0])),
+    "works_best_oa_locations": ("best_oa_location", lambda rows: location(rows[0])),
+    "works_locations": ("locations", lambda rows: [location(r) for r in rows]),
+    "works_authorships": ("authorships", authorships),
+    "works_concepts": (
+        "concepts",
+        lambda rows: [{"id": r["concept_id"], "score": r["score"]} for r in rows],
+    ),
+    "works_topics": (
+        "topics",
+        lambda rows: [{"id": r["topic_id"], "score": r["score"]} for r in rows],
+    ),
+    "works_mesh": ("mesh", lambda rows: [without_work_id(r) for r in rows]),
+    "works_referenced_works": (
+        "referenced_works",
+        lambda rows: [r["referenced_work_id"] for r in rows],
+    ),
+    "works_related_works": (
+        "related_works",
+        lambda rows: [r["related_work_id"] for r in rows],
+    ),
+}
+
+
+class LocalOpenAlexConnector(OpenAlexConnector):
+    """
+    OpenAlex connector that looks up works in the local database first, and only
+    retrieves the missing ids from the api.
+
+    The source name is the same as that of the OpenAlexConnector ("OpenAlex"), so the
+    records are interchangeable.
+    """
+
+    DB_PATH = LOCAL_OPENALEX_DB
+    # (id type, normalized id) -> record, for the database version in _lookups_version
+    _lookups: OrderedDict[tuple[Identifier, str], dict] = OrderedDict()
+    _lookups_version: tuple[int, ...] | None = None
+    _lookups_lock = threading.Lock()
+    # the column in works_ids and the prefix of the values stored in it
+    WORKS_IDS_COLUMNS: dict[Identifier, tuple[str, str]] = {
+        Identifier.DOI: ("doi", "https://doi.org/"),
+        Identifier.PMID: ("pmid", "https://pubmed.ncbi.nlm.nih.gov/"),
+    }
+
+    def lookup(self, ids: dict[str, Identifier]) -> dict[str, dict]:
+        """
+        Look up ids in the local database
+
+        Returns:
+            the records of the ids that were found, by input id
+        """
+        if not ids or (version := db_version(self.DB_PATH)) is None:
+            return {}
+
+        found: dict[str, dict] = {}
+        # stored id -> input id, per works_ids column
+        stored: dict[str, dict[str, str]] = {}
+        keys: dict[str, tuple[Identifier, str]] = {}
+        with self._lookups_lock:
+            if version != LocalOpenAlexConnector._lookups_version:
+                # the database changed, the cached records may be outdated
+                self._lookups.clear()
+                LocalOpenAlexConnector._lookups_version = version
+            for id_value, id_type in ids.items():
+                if id_type not in self.WORKS_IDS_COLUMNS:
+                    continue
+                keys[id_value] = key = (id_type, self.normalize(id_value, id_type))
+                if key in self._lookups:
+                    self._lookups.move_to_end(key)
+                    found[id_value] = copy.deepcopy(self._lookups[key])
+                    continue
+                column, prefix = self.WORKS_IDS_COLUMNS[id_type]
+                stored.setdefault(column, {})[prefix + key[1]] = id_value
+        if not stored:
+            return found
+
+        with local_connection(self.DB_PATH) as local:
+            if local is None:
+                return found
+            conn, tables = local
+            work_ids: dict[str, str] = {}
+            for column, values in stored.items():
+                rows = conn.execute(
+                    f"SELECT {column}, work_id FROM openalex.works_ids "  # noqa: S608
+                    f"WHERE {column} = ANY($values)",
+                    {"values": list(values)},
+                ).fetchall()
+                work_ids |= {values[value]: work_id for value, work_id in rows}
+            records = self.rebuild(conn, tables, work_ids) if work_ids else {}
+
+        with self._lookups_lock:
+            if version == LocalOpenAlexConnector._lookups_version:
+                for id_value, record in records.items():
+                    self._lookups[keys[id_value]] = record
+                while len(self._lookups) > LOCAL_LOOKUP_CACHE_SIZE:
+                    self._lookups.popitem(last=False)
+        return found | {
+            id_value: copy.deepcopy(record) for id_value, record in records.items()
+        }
+
+    @staticmethod
+    def rebuild(
+        cursor: duckdb.DuckDBPyConnection,
+        tables: frozenset[str],
+        work_ids: dict[str, str],
+    ) -> dict[str, dict]:
+        """
+        Rebuild the api records of works from openalex.works and its child tables
+
+        Args:
+            cursor: the cursor to query with
+            tables: the tables in the openalex schema
+            work_ids: the OpenAlex ids of the works, by input id
+        Returns:
+            the records by input id
+        """
+        params = {"ids": list(set(work_ids.values()))}
+        works = {
+            row["id"]: row
+            for row in fetch_dicts(
+                cursor, "SELECT * FROM openalex.works WHERE id = ANY($ids)", params
+            )
+        }
+        for work in works.values():
+            for key, value in work.items():
+                if isinstance(value, datetime):
+                    work[key] = value.isoformat()
+            if "abstract_inverted_index" in work:
+                abstract = work.pop("abstract_inverted_index")
+                # older databases store the rebuilt abstract in this column
+                if abstract and abstract.lstrip().startswith("{"):
+                    abstract = invert_abstract(abstract)
+                work["abstract"] = abstract
+
+        for table, (field, build) in CHILD_TABLES.items():
+            if table not in tables:
+                continue
+            rows = fetch_dicts(
+                cursor,
+                f"SELECT * FROM openalex.{table} "  # noqa: S608
+                "WHERE work_id = ANY($ids) ORDER BY rowid",
+                params,
+            )
+            for work_id, group in itertools.groupby(
+                sorted(rows, key=lambda row: row["work_id"]),
+                key=lambda row: row["work_id"],
+            ):
+                if work_id in works:
+                    works[work_id][field] = build(list(group))
+
+        return {
+            input_id: works[work_id]
+            for input_id, work_id in work_ids.items()
+            if work_id in works
+        }
+
+    def get(
+        self, id: str | None = None, id_type: Identifier | None = None
+    ) -> dict[str, dict]:
+        """
+        Perform the retrieval of data for each id stored via add_id, from the local
+        database if possible and from the api otherwise
+        returns a dict with the used id as key and the retrieved data dict as value
+        """
+        retrieval_ids = {id: id_type} if id and id_type else self.ids
+        data = self.lookup(retrieval_ids)
+        if missing := {k: v for k, v in retrieval_ids.items() if k not in data}:
+            ids, self.ids = self.ids, missing
+            try:
+                data |= super().get()
+            finally:
+                self.ids = ids
+        self.data = data
+        return data
+
+    async def aget(
+        self, client: httpx.AsyncClient, ids: dict[str, Identifier] | None = None
+    ) -> dict[str, dict]:
+        """
+        Async variant of get: ids that are not in the local database are retrieved from
+        the api using the shared client.
+        returns a dict with the used id as key and the retrieved data dict as value
+        """
+        retrieval_ids = ids if ids is not None else self.ids
+        # the database queries block, so they run in a worker thread
+        data = await asyncio.to_thread(self.lookup, retrieval_ids)
+        if missing := {k: v for k, v in retrieval_ids.items() if k not in data}:
+            data |= await super().aget(client, missing)
+        return data
@@ -0,0 +1,271 @@
+"""
+connector for the OpenAIRE Graph API (https://api.openaire.eu/graph/v1)
+
+Research products are looked up in batches of BATCH_SIZE ids per query: DOIs and PMIDs
+with the `pid` filter, OpenAIRE ids with the `id` filter, the values of a batch ORed
+together (pid="10.1/a" OR "10.1/b"). The results of a query are streamed page by page with
+cursor paging, at PAGE_SIZE results per request, and are matched back to the input ids by
+their pids (or OpenAIRE id).
+
+get() serves what it can from the on-disk cache shared with the Retriever (same source
+and keys), and stores what it retrieves. aget() is used by the Retriever, which already
+does the caching around it.
+
+usage:
+    connector = OpenAIREConnector()
+    connector.add_id("10.5281/zenodo.7668094", Identifier.DOI)
+    records = connector.get()
+    # stream all research products that match a set of filters
+    for page in connector.iter_pages({"relOrganizationId": "..."}):
+        ...
+"""
+
+import asyncio
+import itertools
+from collections.abc import AsyncIterator, Iterator
+
+import httpx
+from loguru import logger
+
+from data.constants import CACHE_ENABLED
+from models.enums import Identifier
+
+from ..cache import ResponseCache, normalize_id
+from ..transport import get_async_client, get_client
+from .base import Connector
+
+
+class OpenAIREConnector(Connector):
+    """
+    Connector for the OpenAIRE Graph API (research products)
+
+    Attributes:
+        cache: the on-disk cache get() serves records from, None to disable caching
+    """
+
+    API_URL = "https://api.openaire.eu/graph/v1/researchProducts"
+    BATCH_SIZE = 50
+    # the max number of results the Graph API returns per page
+    PAGE_SIZE = 100
+    # the Graph API filter used to look up each identifier type
+    FILTERS = {
+        Identifier.DOI: "pid",
+        Identifier.PMID: "pid",
+        Identifier.OPENAIRE_ID: "id",
+    }
+
+    def __init__(
+        self, cache: ResponseCache | None = None, *, use_cache: bool = CACHE_ENABLED
+    ) -> None:
+        self.ids: dict[str, Identifier] = {}
+        self.data: dict[str, dict] = {}
+        self.cache: ResponseCache | None = None
+        if use_cache:
+            self.cache = cache if cache is not None else ResponseCache()
+
+    def add_id(self, id: str, id_type: Identifier) -> None:
+        """
+        Add an id to the connector to retrieve data from
+
+        :param id: the id to add
+        :param id_type: the type of id to add (see Identifier enum)
+        """
+        if id_type in self.FILTERS:
+            self.ids[id] = id_type
+
+    def setup(self) -> None:
+        """
+        The public Graph API needs no setup
+        """
+
+    def batches(
+        self, ids: dict[str, Identifier]
+    ) -> Iterator[tuple[Identifier, dict[str, str]]]:
+        """
+        Split the ids into batches of a single identifier type
+
+        Yields:
+            the identifier type and a {normalized id: input id} dict per batch
+        """
+        by_type = sorted(
+            (id_type.value, id_value)
+            for id_value, id_type in ids.items()
+            if id_type in self.FILTERS
+        )
+        for type_value, group in itertools.groupby(by_type, key=lambda id: id[0]):
+            id_type = Identifier(type_value)
+            for batch in itertools.batched(group, self.BATCH_SIZE, strict=False):
+                yield (
+                    id_type,
+                    {
+                        normalize_id(id_value, id_type): id_value
+                        for _, id_value in batch
+                    },
+                )
+
+    def filters(self, id_type: Identifier, batch: dict[str, str]) -> dict[str, str]:
+        """
+        Build the filter that looks up a batch of ids
+        """
+        return {self.FILTERS[id_type]: " OR ".join(f'"{id}"' for id in batch)}
+
+    def params(self, filters: dict[str, str], cursor: str) -> dict[str, str]:
+        return filters | {"pageSize": str(self.PAGE_SIZE), "cursor": cursor}
+
+    def page(self, response: httpx.Response) -> tuple[list[dict], str | None]:
+        """
+        Get the results of a page and the cursor of the next page (None if it was the
+        last page)
+        """
+        response.raise_for_status()
+        body = response.json()
+        results = body.get("results") or []
+        # a short page is the last one
+        if len(results) < self.PAGE_SIZE:
+            return results, None
+        return results, (body.get("header") or {}).get("nextCursor")
+
+    def iter_pages(
+        self, filters: dict[str, str], client: httpx.Client | None = None
+    ) -> Iterator[list[dict]]:
+        """
+        Stream all research products that match the filters, page by page.
+
+        Args:
+            filters: the Graph API filters, e.g. {"pid": "10.1/a"} or
+                {"relOrganizationId": "openorgs____::..."}
+            client: the client to use, the shared sync client if None
+        Yields:
+            the research products of each page
+        """
+        client = client or get_client()
+        cursor: str | None = "*"
+        while cursor:
+            results, cursor = self.page(
+                client.get(self.API_URL, params=self.params(filters, cursor))
+            )
+            if results:
+                yield results
+
+    async def aiter_pages(
+        self, filters: dict[str, str], client: httpx.AsyncClient | None = None
+    ) -> AsyncIterator[list[dict]]:
+        """
+        Async variant of iter_pages: the next page is requested as soon as its cursor is
+        known, so it is retrieved while the current page is being processed.
+
+        Args:
+            filters: the Graph API filters
+            client: the client to use, the shared async client if None
+        Yields:
+            the research products of each page
+        """
+        client = client or get_async_client()
+        page = asyncio.create_task(
+            client.get(self.API_URL, params=self.params(filters, "*"))
+        )
+        try:
+            while True:
+                results, cursor = self.page(await page)
+                if cursor:
+                    page = asyncio.create_task(
+                        client.get(self.API_URL, params=self.params(filters, cursor))
+                    )
+                if results:
+                    yield results
+                if not cursor:
+                    return
+        finally:
+            page.cancel()
+
+    @staticmethod
+    def match_results(
+        records: list[dict], id_type: Identifier, batch: dict[str, str]
+    ) -> dict[str, dict]:
+        """
+        Map research products back to the input ids of a batch, by their pids of the
+        batch's identifier type (or their OpenAIRE id)
+        """
+        matched: dict[str, dict] = {}
+        for record in records:
+            if id_type == Identifier.OPENAIRE_ID:
+                keys = [record.get("id")]
+            else:
+                keys = [
+                    pid.get("value")
+                    for pid in record.get("pids") or []
+                    if pid.get("scheme") == id_type.value
+                ]
+            for key in keys:
+                if not key:
+                    continue
+                input_id = batch.get(normalize_id(key, id_type))
+                if input_id is not None and input_id not in matched:
+                    matched[input_id] = record
+        return matched
+
+    def get(
+        self, id: str | None = None, id_type: Identifier | None = None
+    ) -> dict[str, dict]:
+        """
+        Perform the retrieval of data for each id stored via add_id, serving what is
+        cached from the on-disk cache
+        returns a dict with the used id as key and the retrieved data dict as value
+        """
+        retrieval_ids = {id: id_type} if id and id_type else self.ids
+        self.data = {}
+        missing: dict[str, Identifier] = {}
+        for id_value, value_type in retrieval_ids.items():
+            if self.cache is not None and (
+                record := self.cache.get(str(self), value_type, id_value)
+            ):
+                self.data[id_value] = record
+            else:
+                missing[id_value] = value_type
+        client = get_client()
+        for batch_type, batch in self.batches(missing):
+            try:
+                for page in self.iter_pages(self.filters(batch_type, batch), client):
+                    matched = self.match_results(page, batch_type, batch)
+                    self.data.update(matched)
+                    if self.cache is not None:
+                        for id_value, record in matched.items():
+                            self.cache.put(str(self), batch_type, id_value, record)
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning(
+                    "Error retrieving OpenAIRE batch {}: {}", list(batch.values()), e
+                )
+        return self.data
+
+    async def aget(
+        self, client: httpx.AsyncClient, ids: dict[str, Identifier] | None = None
+    ) -> dict[str, dict]:
+        """
+        Async retrieval of the given ids (or all ids stored via add_id), with the
+        batches requested concurrently on the shared client.
+        returns a dict with the used id as key and the retrieved data dict as value
+        """
+        retrieval_ids = ids if ids is not None else self.ids
+
+        async def fetch(id_type: Identifier, batch: dict[str, str]) -> dict[str, dict]:
+            matched: dict[str, dict] = {}
+            try:
+                async for page in self.aiter_pages(
+                    self.filters(id_type, batch), client
+                ):
+                    matched.update(self.match_results(page, id_type, batch))
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning(
+                    "Error retrieving OpenAIRE batch {}: {}", list(batch.values()), e
+                )
+            return matched
+
+        data: dict[str, dict] = {}
+        for matched in await asyncio.gather(
+            *(fetch(id_type, batch) for id_type, batch in self.batches(retrieval_ids))
+        ):
+            data.update(matched)
+        return data
+
+    def __str__(self) -> str:
+        return "OpenAIRE"
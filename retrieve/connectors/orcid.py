@@ -0,0 +1,282 @@
+"""
+connector for the ORCID public API (https://pub.orcid.org/v3.0)
+
+For every queued ORCID the person record (/person) and the works summary (/works) are
+retrieved, both as conditional requests: the ETag / Last-Modified of each response is
+stored with its body in an on-disk validator cache (see ETAG_CACHE_DIR), so a profile that
+did not change since it was last retrieved costs a 304 without a body.
+
+The ORCIDs of a batch are retrieved concurrently, over the shared async client in aget()
+and over the shared sync client from a thread pool in get().
+
+usage:
+    connector = ORCIDConnector()
+    connector.add_id("https://orcid.org/0000-0002-1825-0097", Identifier.ORCID)
+    records = connector.get()
+    # full works, page by page
+    async for works in connector.aiter_works(client, orcid, put_codes): ...
+"""
+
+import asyncio
+import itertools
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from loguru import logger
+
+from data.constants import (
+    ETAG_CACHE_DIR,
+    ETAG_CACHE_TTL_DAYS,
+    MAX_CONCURRENT_REQUESTS_PER_CONNECTOR,
+)
+from models.enums import Identifier
+
+from ..cache import ResponseCache
+from ..transport import get_client
+from .base import Connector
+
+
+class ORCIDConnector(Connector):
+    """
+    Connector for the ORCID public API
+
+    The record of an ORCID is a dict with its person record and the summary of its works
+    (one summary per group of versions of the same work, as preferred by ORCID):
+    {"orcid": ..., "person": {...}, "works": [{...}, ...]}
+    """
+
+    API_URL = "https://pub.orcid.org/v3.0"
+    ENDPOINTS = ("person", "works")
+    BATCH_SIZE = 10
+    # the max number of put-codes the bulk works endpoint accepts per request
+    WORKS_PAGE_SIZE = 100
+    HEADERS = {"Accept": "application/json"}
+
+    def __init__(self, etags: ResponseCache | None = None) -> None:
+        self.ids: dict[str, Identifier] = {}
+        self.data: dict[str, dict] = {}
+        self.etags = (
+            etags
+            if etags is not None
+            else ResponseCache(ETAG_CACHE_DIR, ttl_days=ETAG_CACHE_TTL_DAYS)
+        )
+
+    def add_id(self, id: str, id_type: Identifier) -> None:
+        """
+        Add an id to the connector to retrieve data from
+
+        :param id: the id to add
+        :param id_type: the type of id to add (see Identifier enum)
+        """
+        if id_type == Identifier.ORCID:
+            self.ids[id] = id_type
+
+    def setup(self) -> None:
+        """
+        The public API needs no setup
+        """
+
+    @staticmethod
+    def bare_orcid(orcid: str) -> str:
+        """
+        Get the bare ORCID (0000-0002-1825-0097) from an ORCID in any form
+        """
+        return orcid.strip().rstrip("/").rsplit("/", 1)[-1].upper()
+
+    def url(self, orcid: str, endpoint: str) -> str:
+        return f"{self.API_URL}/{self.bare_orcid(orcid)}/{endpoint}"
+
+    def cached(self, orcid: str, endpoint: str) -> dict | None:
+        """
+        Get the stored validators and body of the last response for an ORCID endpoint
+        """
+        return self.etags.get(f"orcid-{endpoint}", Identifier.ORCID, orcid)
+
+    def headers(self, cached: dict | None) -> dict[str, str]:
+        """
+        Build the request headers, conditional if there is a stored response
+        """
+        headers = dict(self.HEADERS)
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        return headers
+
+    @staticmethod
+    def body(
+        response: httpx.Response, cached: dict | None
+    ) -> tuple[dict | None, dict | None]:
+        """
+        Get the body of a response, or the stored body if it was not modified
+
+        Returns:
+            the body (None if the ORCID does not exist) and the validator cache entry to
+            store (None if there is nothing new to store)
+        """
+        if response.status_code == httpx.codes.NOT_MODIFIED and cached:
+            return cached["data"], None
+        if response.status_code == httpx.codes.NOT_FOUND:
+            return None, None
+        response.raise_for_status()
+        data = response.json()
+        validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        if not any(validators.values()):
+            return data, None
+        return data, validators | {"data": data}
+
+    def store(self, orcid: str, endpoint: str, entry: dict | None) -> None:
+        if entry is not None:
+            self.etags.put(f"orcid-{endpoint}", Identifier.ORCID, orcid, entry)
+
+    @staticmethod
+    def record(orcid: str, person: dict | None, works: dict | None) -> dict | None:
+        """
+        Combine the person record and the works summary of an ORCID
+        """
+        if person is None and works is None:
+            return None
+        return {
+            "orcid": ORCIDConnector.bare_orcid(orcid),
+            "person": person,
+            "works": [
+                group["work-summary"][0]
+                for group in (works or {}).get("group") or []
+                if group.get("work-summary")
+            ],
+        }
+
+    def fetch(self, client: httpx.Client, orcid: str) -> dict | None:
+        """
+        Retrieve the record of a single ORCID with the sync client
+        """
+        bodies = []
+        for endpoint in self.ENDPOINTS:
+            cached = self.cached(orcid, endpoint)
+            response = client.get(
+                self.url(orcid, endpoint), headers=self.headers(cached)
+            )
+            data, entry = self.body(response, cached)
+            self.store(orcid, endpoint, entry)
+            bodies.append(data)
+        return self.record(orcid, *bodies)
+
+    async def afetch_endpoint(
+        self, client: httpx.AsyncClient, orcid: str, endpoint: str
+    ) -> dict | None:
+        """
+        Retrieve a single endpoint of an ORCID with the async client
+        """
+        cached = await asyncio.to_thread(self.cached, orcid, endpoint)
+        response = await client.get(
+            self.url(orcid, endpoint), headers=self.headers(cached)
+        )
+        data, entry = self.body(response, cached)
+        await asyncio.to_thread(self.store, orcid, endpoint, entry)
+        return data
+
+    async def afetch(self, client: httpx.AsyncClient, orcid: str) -> dict | None:
+        """
+        Retrieve the record of a single ORCID with the async client, with the endpoints
+        requested concurrently
+        """
+        bodies = await asyncio.gather(
+            *(
+                self.afetch_endpoint(client, orcid, endpoint)
+                for endpoint in self.ENDPOINTS
+            )
+        )
+        return self.record(orcid, *bodies)
+
+    def get(
+        self, id: str | None = None, id_type: Identifier | None = None
+    ) -> dict[str, dict]:
+        """
+        Perform the retrieval of data for each id stored via add_id
+        returns a dict with the used id as key and the retrieved data dict as value
+        """
+        retrieval_ids = list({id: id_type} if id and id_type else self.ids)
+        client = get_client()
+
+        def fetch(orcid: str) -> dict | None:
+            try:
+                return self.fetch(client, orcid)
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning("Error retrieving ORCID {}: {}", orcid, e)
+                return None
+
+        with ThreadPoolExecutor(
+            max_workers=MAX_CONCURRENT_REQUESTS_PER_CONNECTOR
+        ) as executor:
+            records = executor.map(fetch, retrieval_ids)
+            self.data = {
+                orcid: record
+                for orcid, record in zip(retrieval_ids, records, strict=True)
+                if record is not None
+            }
+        return self.data
+
+    async def aget(
+        self, client: httpx.AsyncClient, ids: dict[str, Identifier] | None = None
+    ) -> dict[str, dict]:
+        """
+        Async retrieval of the given ids (or all ids stored via add_id), with all
+        requests running concurrently on the shared client.
+        returns a dict with the used id as key and the retrieved data dict as value
+        """
+        retrieval_ids = [
+            orcid
+            for orcid, id_type in (ids if ids is not None else self.ids).items()
+            if id_type == Identifier.ORCID
+        ]
+        records = await asyncio.gather(
+            *(self.afetch(client, orcid) for orcid in retrieval_ids),
+            return_exceptions=True,
+        )
+        data: dict[str, dict] = {}
+        for orcid, record in zip(retrieval_ids, records, strict=True):
+            if isinstance(record, (httpx.HTTPError, ValueError)):
+                logger.warning("Error retrieving ORCID {}: {}", orcid, record)
+            elif isinstance(record, BaseException):
+                raise record
+            elif record is not None:
+                data[orcid] = record
+        return data
+
+    async def aiter_works(
+        self, client: httpx.AsyncClient, orcid: str, put_codes: list[int] | None = None
+    ) -> AsyncIterator[list[dict]]:
+        """
+        Stream the full works of an ORCID, a page of WORKS_PAGE_SIZE works per request.
+
+        Args:
+            client: the client to use
+            orcid: the ORCID
+            put_codes: the put-codes of the works to retrieve. If None, those of the
+                works summary (see get) are used.
+        Yields:
+            the works of each page (works ORCID can't return are left out)
+        """
+        if put_codes is None:
+            works = await self.afetch_endpoint(client, orcid, "works")
+            summaries = self.record(orcid, None, works) or {}
+            put_codes = [summary["put-code"] for summary in summaries.get("works", [])]
+        for page in itertools.batched(put_codes, self.WORKS_PAGE_SIZE, strict=False):
+            response = await client.get(
+                self.url(orcid, f"works/{','.join(map(str, page))}"),
+                headers=self.HEADERS,
+            )
+            response.raise_for_status()
+            yield [
+                item["work"]
+                for item in response.json().get("bulk", [])
+                if "work" in item
+            ]
+
+    def __str__(self) -> str:
+        return "ORCID"
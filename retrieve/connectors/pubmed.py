@@ -0,0 +1,323 @@
+"""
+connector for the NCBI E-utilities (https://eutils.ncbi.nlm.nih.gov/entrez/eutils)
+
+The queued PMIDs are uploaded to the Entrez history server with a single epost request,
+after which the records are retrieved from efetch in pages of EFETCH_PAGE_SIZE, referring
+to the uploaded list by its WebEnv / query_key. 10,000 PMIDs thus cost 1 + 50 requests.
+
+The efetch XML is parsed while it streams in, and every article is cleared as soon as its
+record has been extracted, so memory stays flat no matter how large the pages are.
+
+NCBI allows 3 requests per second (10 with an api key, see NCBI_API_KEY): this is
+enforced by the rate limiter of the shared transport (see RATE_LIMITS).
+
+usage:
+    connector = PubMedConnector()
+    connector.add_id("31452104", Identifier.PMID)
+    records = connector.get()
+"""
+
+import asyncio
+import xml.etree.ElementTree as ET
+from collections.abc import Iterable
+
+import httpx
+from loguru import logger
+
+from data.constants import CONTACT_EMAIL, NCBI_API_KEY
+from models.enums import Identifier
+from models.validate import validate_pmid
+
+from ..transport import get_client
+from .base import Connector
+
+# the elements of an efetch response that hold a single record
+ARTICLE_TAGS = {"PubmedArticle", "PubmedBookArticle"}
+
+
+def text(element: ET.Element | None) -> str | None:
+    """
+    The text of an element including that of its children (e.g. <i> in titles)
+    """
+    if element is None:
+        return None
+    return "".join(element.itertext()).strip() or None
+
+
+def article_id(article: ET.Element, id_type: str) -> str | None:
+    """
+    An id of the article itself, e.g. its DOI (the ids of the cited references are in
+    ArticleIdLists further down, in its ReferenceList)
+    """
+    return text(
+        article.find(f"PubmedData/ArticleIdList/ArticleId[@IdType='{id_type}']")
+    ) or text(
+        article.find(f"PubmedBookData/ArticleIdList/ArticleId[@IdType='{id_type}']")
+    )
+
+
+def article_record(article: ET.Element) -> dict:
+    """
+    Extract the record of a PubmedArticle (or PubmedBookArticle) element
+    """
+    abstract = [
+        f"{part.get('Label')}: {text(part)}" if part.get("Label") else text(part)
+        for part in article.iterfind(".//Abstract/AbstractText")
+        if text(part)
+    ]
+    pub_date = article.find(".//JournalIssue/PubDate")
+    return {
+        "pmid": text(article.find(".//PMID")),
+        "title": text(article.find(".//ArticleTitle"))
+        or text(article.find(".//BookTitle")),
+        "abstract": "\n".join(abstract) or None,
+        "journal": text(article.find(".//Journal/Title")),
+        "issn": text(article.find(".//Journal/ISSN")),
+        "volume": text(article.find(".//JournalIssue/Volume")),
+        "issue": text(article.find(".//JournalIssue/Issue")),
+        "pages": text(article.find(".//Pagination/MedlinePgn")),
+        "year": (
+            text(pub_date.find("Year")) or text(pub_date.find("MedlineDate"))
+            if pub_date is not None
+            else None
+        ),
+        "doi": article_id(article, "doi"),
+        "pmcid": article_id(article, "pmc"),
+        "authors": [
+            {
+                "last_name": text(author.find("LastName")),
+                "fore_name": text(author.find("ForeName")),
+                "collective_name": text(author.find("CollectiveName")),
+                "orcid": text(author.find("Identifier[@Source='ORCID']")),
+                "affiliations": [
+                    text(affiliation)
+                    for affiliation in author.iterfind("AffiliationInfo/Affiliation")
+                ],
+            }
+            for author in article.iterfind(".//AuthorList/Author")
+        ],
+        "publication_types": [
+            text(publication_type)
+            for publication_type in article.iterfind(".//PublicationType")
+        ],
+        "mesh_terms": [
+            text(descriptor)
+            for descriptor in article.iterfind(".//MeshHeading/DescriptorName")
+        ],
+        "keywords": [text(keyword) for keyword in article.iterfind(".//Keyword")],
+    }
+
+
+class ArticleStreamParser:
+    """
+    Incremental parser for efetch responses: feed it the bytes of a response as they
+    arrive, and it returns the records of the articles completed so far.
+    """
+
+    def __init__(self) -> None:
+        self._parser = ET.XMLPullParser(events=("end",))
+
+    def feed(self, data: bytes) -> list[dict]:
+        self._parser.feed(data)
+        return self._records()
+
+    def close(self) -> list[dict]:
+        self._parser.close()
+        return self._records()
+
+    def _records(self) -> list[dict]:
+        records = []
+        for _, element in self._parser.read_events():
+            if element.tag in ARTICLE_TAGS:
+                records.append(article_record(element))
+                # drop the parsed article, so only the current one is kept in memory
+                element.clear()
+        return records
+
+
+class PubMedConnector(Connector):
+    """
+    Connector for PubMed, via the NCBI E-utilities and the Entrez history server
+    """
+
+    API_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+    # the number of PMIDs uploaded with a single epost request
+    BATCH_SIZE = 10_000
+    # the number of records per efetch request
+    EFETCH_PAGE_SIZE = 200
+
+    def __init__(self) -> None:
+        self.ids: dict[str, Identifier] = {}
+        self.data: dict[str, dict] = {}
+
+    def add_id(self, id: str, id_type: Identifier) -> None:
+        """
+        Add an id to the connector to retrieve data from
+
+        :param id: the id to add
+        :param id_type: the type of id to add (see Identifier enum)
+        """
+        if id_type == Identifier.PMID:
+            self.ids[id] = id_type
+
+    def setup(self) -> None:
+        """
+        The E-utilities need no setup, see NCBI_API_KEY for a higher rate limit
+        """
+
+    @staticmethod
+    def pmids(ids: dict[str, Identifier]) -> dict[str, str]:
+        """
+        Get the bare PMIDs to retrieve
+
+        Returns:
+            {bare PMID: input PMID}, invalid PMIDs are left out
+        """
+        pmids = {}
+        for pmid, id_type in ids.items():
+            if id_type != Identifier.PMID:
+                continue
+            try:
+                pmids[validate_pmid(pmid)] = pmid
+            except ValueError:
+                logger.warning("Skipping invalid PMID {}", pmid)
+        return pmids
+
+    @staticmethod
+    def params(**params: str | int) -> dict[str, str]:
+        """
+        Add the tool name, contact email and api key to the query parameters
+        """
+        params = {"db": "pubmed", "tool": "meewi"} | params
+        if CONTACT_EMAIL:
+            params["email"] = CONTACT_EMAIL
+        if NCBI_API_KEY:
+            params["api_key"] = NCBI_API_KEY
+        return {k: str(v) for k, v in params.items()}
+
+    def epost_params(self, pmids: Iterable[str]) -> dict[str, str]:
+        return self.params(id=",".join(pmids))
+
+    @staticmethod
+    def history(response: httpx.Response) -> tuple[str, str]:
+        """
+        Get the WebEnv and query_key of an epost response
+        """
+        response.raise_for_status()
+        result = ET.fromstring(response.content)
+        web_env, query_key = result.findtext("WebEnv"), result.findtext("QueryKey")
+        if not web_env or not query_key:
+            raise ValueError(f"epost failed: {text(result.find('ERROR'))}")
+        return web_env, query_key
+
+    def efetch_params(
+        self, web_env: str, query_key: str, retstart: int
+    ) -> dict[str, str]:
+        return self.params(
+            WebEnv=web_env,
+            query_key=query_key,
+            retstart=retstart,
+            retmax=self.EFETCH_PAGE_SIZE,
+            retmode="xml",
+        )
+
+    @staticmethod
+    def match_results(records: list[dict], pmids: dict[str, str]) -> dict[str, dict]:
+        """
+        Map parsed records back to the input PMIDs
+        """
+        return {
+            pmids[record["pmid"]]: record
+            for record in records
+            if record["pmid"] in pmids
+        }
+
+    def get(
+        self, id: str | None = None, id_type: Identifier | None = None
+    ) -> dict[str, dict]:
+        """
+        Perform the retrieval of data for each id stored via add_id
+        returns a dict with the used id as key and the retrieved data dict as value
+        """
+        pmids = self.pmids({id: id_type} if id and id_type else self.ids)
+        self.data = {}
+        if not pmids:
+            return self.data
+        client = get_client()
+        try:
+            web_env, query_key = self.history(
+                client.post(f"{self.API_URL}/epost.fcgi", data=self.epost_params(pmids))
+            )
+        except (httpx.HTTPError, ValueError, ET.ParseError) as e:
+            logger.warning("Error posting PMIDs to the Entrez history server: {}", e)
+            return self.data
+        for retstart in range(0, len(pmids), self.EFETCH_PAGE_SIZE):
+            parser = ArticleStreamParser()
+            try:
+                with client.stream(
+                    "POST",
+                    f"{self.API_URL}/efetch.fcgi",
+                    data=self.efetch_params(web_env, query_key, retstart),
+                ) as response:
+                    response.raise_for_status()
+                    for chunk in response.iter_bytes():
+                        self.data.update(self.match_results(parser.feed(chunk), pmids))
+                self.data.update(self.match_results(parser.close(), pmids))
+            except (httpx.HTTPError, ET.ParseError) as e:
+                logger.warning(
+                    "Error retrieving PubMed records from {}: {}", retstart, e
+                )
+        return self.data
+
+    async def aget(
+        self, client: httpx.AsyncClient, ids: dict[str, Identifier] | None = None
+    ) -> dict[str, dict]:
+        """
+        Async retrieval of the given ids (or all ids stored via add_id): the pages are
+        requested concurrently, paced by the rate limiter of the shared client.
+        returns a dict with the used id as key and the retrieved data dict as value
+        """
+        pmids = self.pmids(ids if ids is not None else self.ids)
+        if not pmids:
+            return {}
+        try:
+            web_env, query_key = self.history(
+                await client.post(
+                    f"{self.API_URL}/epost.fcgi", data=self.epost_params(pmids)
+                )
+            )
+        except (httpx.HTTPError, ValueError, ET.ParseError) as e:
+            logger.warning("Error posting PMIDs to the Entrez history server: {}", e)
+            return {}
+
+        async def fetch(retstart: int) -> dict[str, dict]:
+            parser = ArticleStreamParser()
+            matched: dict[str, dict] = {}
+            try:
+                async with client.stream(
+                    "POST",
+                    f"{self.API_URL}/efetch.fcgi",
+                    data=self.efetch_params(web_env, query_key, retstart),
+                ) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes():
+                        matched.update(self.match_results(parser.feed(chunk), pmids))
+                matched.update(self.match_results(parser.close(), pmids))
+            except (httpx.HTTPError, ET.ParseError) as e:
+                logger.warning(
+                    "Error retrieving PubMed records from {}: {}", retstart, e
+                )
+            return matched
+
+        data: dict[str, dict] = {}
+        for page in await asyncio.gather(
+            *(
+                fetch(retstart)
+                for retstart in range(0, len(pmids), self.EFETCH_PAGE_SIZE)
+            )
+        ):
+            data.update(page)
+        return data
+
+    def __str__(self) -> str:
+        return "PubMed"
@@ -0,0 +1,445 @@
+"""
+connector for the research outputs of a Pure instance, via its web service api
+(see PURE_API_URL and PURE_API_KEY)
+
+Single ids are looked up directly: Pure uuids with /research-outputs/{uuid}, numeric Pure
+ids and DOIs with /research-outputs/search. The search is full-text, so its results are
+paged through until a record with the id is found (or the results run out).
+
+For bulk use, aharvest() pages through all research outputs in pages of PAGE_SIZE, with
+the next PREFETCH_PAGES pages requested concurrently while a page is being processed.
+sync() keeps the on-disk cache (shared with the Retriever, under every uuid, Pure id and
+DOI of a record) up to date with Pure: the first run harvests everything, later runs
+only follow the change feed (/changes/{token}) from the resumption token stored by the
+previous run (see PURE_SYNC_FILE), and refetch the research outputs that changed.
+
+retrieve/pure_standin.py is a stand-in for the Pure api for local runs and tests.
+
+usage:
+    connector = PureConnector()
+    connector.add_id("c9d0c9c4-7b35-4f0e-a6b4-2a1e3f6f5d10", Identifier.PURE_ID)
+    records = connector.get()
+    counts = await connector.sync()
+"""
+
+import asyncio
+import itertools
+from collections import deque
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, date, datetime
+from pathlib import Path
+
+import httpx
+import srsly
+from loguru import logger
+
+from data.constants import (
+    CACHE_ENABLED,
+    MAX_CONCURRENT_REQUESTS_PER_CONNECTOR,
+    PURE_API_KEY,
+    PURE_API_URL,
+    PURE_SYNC_FILE,
+)
+from models.enums import Identifier
+
+from ..cache import ResponseCache, normalize_id
+from ..transport import get_async_client, get_client
+from .base import Connector
+
+
+class PureConnector(Connector):
+    """
+    Connector for the research outputs of a Pure instance
+
+    Attributes:
+        api_url: the url of the Pure web service api, the connector is disabled if None
+        api_key: the Pure api key
+        cache: the on-disk cache get() serves records from and sync() keeps up to date
+        sync_file: the file the resumption token of the change feed is stored in
+    """
+
+    BATCH_SIZE = 25
+    # the number of research outputs per page when harvesting
+    PAGE_SIZE = 1000
+    # the number of pages requested ahead while harvesting
+    PREFETCH_PAGES = 4
+    # the number of search results per page when looking up a DOI or numeric Pure id
+    SEARCH_SIZE = 100
+
+    def __init__(
+        self,
+        api_url: str | None = PURE_API_URL,
+        api_key: str | None = PURE_API_KEY,
+        cache: ResponseCache | None = None,
+        *,
+        use_cache: bool = CACHE_ENABLED,
+        sync_file: Path = PURE_SYNC_FILE,
+    ) -> None:
+        self.ids: dict[str, Identifier] = {}
+        self.data: dict[str, dict] = {}
+        self.api_url = api_url.rstrip("/") if api_url else None
+        self.api_key = api_key
+        self.cache: ResponseCache | None = None
+        if use_cache:
+            self.cache = cache if cache is not None else ResponseCache()
+        self.sync_file = Path(sync_file)
+
+    def add_id(self, id: str, id_type: Identifier) -> None:
+        """
+        Add an id to the connector to retrieve data from
+
+        :param id: the id to add
+        :param id_type: the type of id to add (see Identifier enum)
+        """
+        if id_type in (Identifier.DOI, Identifier.PURE_ID):
+            self.ids[id] = id_type
+
+    def setup(self) -> None:
+        """
+        Check that the Pure api is configured
+        """
+        if not self.api_url:
+            logger.warning("PURE_API_URL is not set, the Pure connector is disabled")
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {"Accept": "application/json"}
+        if self.api_key:
+            headers["api-key"] = self.api_key
+        return headers
+
+    def url(self, path: str) -> str:
+        return f"{self.api_url}/{path}"
+
+    @staticmethod
+    def record_ids(record: dict) -> list[tuple[Identifier, str]]:
+        """
+        Get all ids of a research output: its uuid, Pure id and DOIs
+        """
+        ids = []
+        if uuid := record.get("uuid"):
+            ids.append((Identifier.PURE_ID, uuid))
+        if (pure_id := record.get("pureId")) is not None:
+            ids.append((Identifier.PURE_ID, str(pure_id)))
+        ids.extend(
+            (Identifier.DOI, version["doi"])
+            for version in record.get("electronicVersions") or []
+            if version.get("doi")
+        )
+        return ids
+
+    def matches(self, record: dict, id_value: str, id_type: Identifier) -> bool:
+        target = normalize_id(id_value, id_type)
+        return any(
+            record_type == id_type and normalize_id(record_id, record_type) == target
+            for record_type, record_id in self.record_ids(record)
+        )
+
+    def request(
+        self, id_value: str, id_type: Identifier, offset: int = 0
+    ) -> tuple[str, str, dict | None]:
+        """
+        Build the request that looks up an id: uuids directly, Pure ids and DOIs by search
+
+        Args:
+            offset: the offset of the page of search results to request
+        Returns:
+            the method, url and json body of the request
+        """
+        normalized = normalize_id(id_value, id_type)
+        if id_type == Identifier.PURE_ID and not normalized.isdigit():
+            return "GET", self.url(f"research-outputs/{normalized}"), None
+        return (
+            "POST",
+            self.url("research-outputs/search"),
+            {"searchString": normalized, "size": self.SEARCH_SIZE, "offset": offset},
+        )
+
+    def result(
+        self, response: httpx.Response, id_value: str, id_type: Identifier, offset: int
+    ) -> tuple[dict | None, int | None]:
+        """
+        Get the research output with the given id from a lookup response
+
+        Returns:
+            the research output (None if it is not in the response), and the offset of
+            the next page of search results to look in (None if there is none)
+        """
+        if response.status_code == httpx.codes.NOT_FOUND:
+            return None, None
+        response.raise_for_status()
+        body = response.json()
+        if "items" not in body:
+            return (body if self.matches(body, id_value, id_type) else None), None
+        items = body["items"] or []
+        if record := next(
+            (item for item in items if self.matches(item, id_value, id_type)), None
+        ):
+            return record, None
+        offset += len(items)
+        return None, offset if items and offset < body.get("count", 0) else None
+
+    def fetch(
+        self, client: httpx.Client, id_value: str, id_type: Identifier
+    ) -> dict | None:
+        record, offset = None, 0
+        while offset is not None:
+            method, url, body = self.request(id_value, id_type, offset)
+            response = client.request(method, url, json=body, headers=self.headers)
+            record, offset = self.result(response, id_value, id_type, offset)
+        return record
+
+    async def afetch(
+        self, client: httpx.AsyncClient, id_value: str, id_type: Identifier
+    ) -> dict | None:
+        record, offset = None, 0
+        while offset is not None:
+            method, url, body = self.request(id_value, id_type, offset)
+            response = await client.request(
+                method, url, json=body, headers=self.headers
+            )
+            record, offset = self.result(response, id_value, id_type, offset)
+        return record
+
+    def store(self, records: list[dict]) -> None:
+        """
+        Store research outputs in the cache, under each of their ids
+        """
+        if self.cache is None:
+            return
+        for record in records:
+            for id_type, id_value in self.record_ids(record):
+                self.cache.put(str(self), id_type, id_value, record)
+
+    def forget(self, uuid: str) -> None:
+        """
+        Remove a research output that was deleted in Pure from the cache
+        """
+        if self.cache is None:
+            return
+        record = self.cache.get(str(self), Identifier.PURE_ID, uuid)
+        ids = self.record_ids(record) if record else [(Identifier.PURE_ID, uuid)]
+        for id_type, id_value in ids:
+            self.cache.delete(str(self), id_type, id_value)
+
+    def get(
+        self, id: str | None = None, id_type: Identifier | None = None
+    ) -> dict[str, dict]:
+        """
+        Perform the retrieval of data for each id stored via add_id, serving what is
+        cached from the on-disk cache
+        returns a dict with the used id as key and the retrieved data dict as value
+        """
+        retrieval_ids = {id: id_type} if id and id_type else self.ids
+        self.data = {}
+        if not self.api_url:
+            return self.data
+        missing = []
+        for id_value, value_type in retrieval_ids.items():
+            if self.cache is not None and (
+                record := self.cache.get(str(self), value_type, id_value)
+            ):
+                self.data[id_value] = record
+            else:
+                missing.append((id_value, value_type))
+        client = get_client()
+
+        def fetch(id_tuple: tuple[str, Identifier]) -> dict | None:
+            try:
+                return self.fetch(client, *id_tuple)
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning("Error retrieving Pure {}: {}", id_tuple[0], e)
+                return None
+
+        with ThreadPoolExecutor(
+            max_workers=MAX_CONCURRENT_REQUESTS_PER_CONNECTOR
+        ) as executor:
+            for (id_value, _), record in zip(
+                missing, executor.map(fetch, missing), strict=True
+            ):
+                if record is not None:
+                    self.data[id_value] = record
+                    self.store([record])
+        return self.data
+
+    async def aget(
+        self, client: httpx.AsyncClient, ids: dict[str, Identifier] | None = None
+    ) -> dict[str, dict]:
+        """
+        Async retrieval of the given ids (or all ids stored via add_id), with all
+        requests running concurrently on the shared client.
+        returns a dict with the used id as key and the retrieved data dict as value
+        """
+        if not self.api_url:
+            return {}
+        retrieval_ids = [
+            (id_value, id_type)
+            for id_value, id_type in (ids if ids is not None else self.ids).items()
+            if id_type in (Identifier.DOI, Identifier.PURE_ID)
+        ]
+        records = await asyncio.gather(
+            *(self.afetch(client, *id_tuple) for id_tuple in retrieval_ids),
+            return_exceptions=True,
+        )
+        data: dict[str, dict] = {}
+        for (id_value, _), record in zip(retrieval_ids, records, strict=True):
+            if isinstance(record, (httpx.HTTPError, ValueError)):
+                logger.warning("Error retrieving Pure {}: {}", id_value, record)
+            elif isinstance(record, BaseException):
+                raise record
+            elif record is not None:
+                data[id_value] = record
+        return data
+
+    async def aharvest(
+        self, client: httpx.AsyncClient | None = None
+    ) -> AsyncIterator[list[dict]]:
+        """
+        Harvest all research outputs, PAGE_SIZE per request: the next PREFETCH_PAGES
+        pages are requested while the current page is being processed.
+
+        Args:
+            client: the client to use, the shared async client if None
+        Yields:
+            the research outputs of each page
+        """
+        client = client or get_async_client()
+
+        async def fetch(offset: int) -> dict:
+            response = await client.get(
+                self.url("research-outputs"),
+                params={"size": self.PAGE_SIZE, "offset": offset},
+                headers=self.headers,
+            )
+            response.raise_for_status()
+            return response.json()
+
+        first = await fetch(0)
+        offsets = iter(range(self.PAGE_SIZE, first.get("count", 0), self.PAGE_SIZE))
+        pending = deque(
+            asyncio.create_task(fetch(offset))
+            for offset in itertools.islice(offsets, self.PREFETCH_PAGES)
+        )
+        try:
+            if items := first.get("items"):
+                yield items
+            while pending:
+                body = await pending.popleft()
+                if (offset := next(offsets, None)) is not None:
+                    pending.append(asyncio.create_task(fetch(offset)))
+                if items := body.get("items"):
+                    yield items
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def changes(
+        self, client: httpx.AsyncClient, token: str
+    ) -> tuple[set[str], set[str], str]:
+        """
+        Follow the change feed from a resumption token (or a date, yyyy-mm-dd)
+
+        Returns:
+            the uuids of the research outputs that were created or updated, those that
+            were deleted, and the resumption token for the next sync
+        """
+        changed: set[str] = set()
+        deleted: set[str] = set()
+        while True:
+            response = await client.get(
+                self.url(f"changes/{token}"), headers=self.headers
+            )
+            response.raise_for_status()
+            body = response.json()
+            for item in body.get("items") or []:
+                if item.get("familySystemName") != "ResearchOutput" or not (
+                    uuid := item.get("uuid")
+                ):
+                    continue
+                # the last change of a research output wins
+                if item.get("changeType") == "DELETE":
+                    deleted.add(uuid)
+                    changed.discard(uuid)
+                else:
+                    changed.add(uuid)
+                    deleted.discard(uuid)
+            token = body.get("resumptionToken") or token
+            if not body.get("moreChanges"):
+                return changed, deleted, token
+
+    def load_token(self) -> str | None:
+        try:
+            return srsly.read_json(self.sync_file).get("token")
+        except (OSError, ValueError):
+            return None
+
+    def save_token(self, token: str) -> None:
+        self.sync_file.parent.mkdir(parents=True, exist_ok=True)
+        srsly.write_json(
+            self.sync_file,
+            {"token": token, "synced_at": datetime.now(UTC).isoformat()},
+        )
+
+    async def sync(self, client: httpx.AsyncClient | None = None) -> dict[str, int]:
+        """
+        Bring the cache up to date with Pure: harvest all research outputs on the first
+        run, afterwards only refetch (or remove) those that changed since the last sync.
+
+        Args:
+            client: the client to use, the shared async client if None
+        Returns:
+            the number of research outputs harvested, updated and deleted, and the
+            number of changed ones that could not be retrieved (the resumption token
+            is only stored if there are none)
+        """
+        counts = {"harvested": 0, "updated": 0, "deleted": 0, "failed": 0}
+        if not self.api_url:
+            logger.warning("PURE_API_URL is not set, nothing to sync")
+            return counts
+        client = client or get_async_client()
+        token = self.load_token()
+        if token is None:
+            # skip to the end of the change feed first: everything changed before is
+            # in the harvest, changes made during the harvest are in the next sync
+            _, _, token = await self.changes(client, date.today().isoformat())
+            async for page in self.aharvest(client):
+                await asyncio.to_thread(self.store, page)
+                counts["harvested"] += len(page)
+        else:
+            changed, deleted, token = await self.changes(client, token)
+            uuids = list(changed)
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS_PER_CONNECTOR)
+
+            async def fetch(uuid: str) -> dict | None:
+                async with semaphore:
+                    return await self.afetch(client, uuid, Identifier.PURE_ID)
+
+            records = await asyncio.gather(
+                *(fetch(uuid) for uuid in uuids), return_exceptions=True
+            )
+            updated = []
+            for uuid, record in zip(uuids, records, strict=True):
+                if isinstance(record, (httpx.HTTPError, ValueError)):
+                    logger.warning("Error retrieving Pure {}: {}", uuid, record)
+                    counts["failed"] += 1
+                elif isinstance(record, BaseException):
+                    raise record
+                elif record is not None:
+                    updated.append(record)
+            await asyncio.to_thread(self.store, updated)
+            for uuid in deleted:
+                await asyncio.to_thread(self.forget, uuid)
+            counts["updated"], counts["deleted"] = len(updated), len(deleted)
+        if counts["failed"]:
+            # keep the previous token, so the next sync retries the failed changes
+            logger.warning(
+                "{} changed Pure research outputs could not be retrieved",
+                counts["failed"],
+            )
+        else:
+            self.save_token(token)
+        return counts
+
+    def __str__(self) -> str:
+        return "Pure"
@@ -0,0 +1,80 @@
+"""
+registry of in-flight requests, used to coalesce concurrent retrievals of the same id
+
+When a retriever is about to request an id from a source, it claims the id here. If the id
+is already being retrieved (by another task, thread, or marimo session in this process),
+the retriever waits for that request instead of sending its own.
+
+Futures are concurrent.futures.Future objects, so they can be shared across threads and
+event loops: use asyncio.wrap_future() to await them from async code.
+
+usage:
+    owned, shared = IN_FLIGHT.claim("OpenAlex", Identifier.DOI, ids)
+    try:
+        results = ...  # retrieve the ids in `owned`
+    finally:
+        IN_FLIGHT.resolve("OpenAlex", Identifier.DOI, owned, results)
+    # then wait for the futures in `shared`
+"""
+
+import threading
+from concurrent.futures import Future
+
+from models.enums import Identifier
+
+
+class InFlightRequests:
+    """
+    Thread-safe registry of futures for the (source, id type, id) combinations that are
+    currently being retrieved.
+    """
+
+    def __init__(self) -> None:
+        self._futures: dict[tuple[str, Identifier, str], Future] = {}
+        self._lock = threading.Lock()
+
+    def claim(
+        self, source: str, id_type: Identifier, id_values: list[str]
+    ) -> tuple[dict[str, Future], dict[str, Future]]:
+        """
+        Claim ids for retrieval.
+
+        Args:
+            source: the name of the source to retrieve the ids from
+            id_type: the type of the ids
+            id_values: the (canonical) ids to retrieve
+        Returns:
+            a tuple of:
+                - the futures for the ids the caller has to retrieve and resolve
+                - the futures for the ids that are already being retrieved elsewhere
+        """
+        owned: dict[str, Future] = {}
+        shared: dict[str, Future] = {}
+        with self._lock:
+            for id_value in id_values:
+                key = (source, id_type, id_value)
+                if key in self._futures:
+                    shared[id_value] = self._futures[key]
+                else:
+                    owned[id_value] = self._futures[key] = Future()
+        return owned, shared
+
+    def resolve(
+        self,
+        source: str,
+        id_type: Identifier,
+        owned: dict[str, Future],
+        results: dict[str, dict],
+    ) -> None:
+        """
+        Resolve the futures of claimed ids with the retrieved records (None if not found)
+        and remove them from the registry.
+        """
+        with self._lock:
+            for id_value in owned:
+                self._futures.pop((source, id_type, id_value), None)
+        for id_value, future in owned.items():
+            future.set_result(results.get(id_value))
+
+
+IN_FLIGHT = InFlightRequests()
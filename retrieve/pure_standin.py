@@ -0,0 +1,242 @@
+"""
+stand-in for the Pure web service api, for local runs and tests of the PureConnector
+
+Serves an in-memory set of research outputs in the JSON shape of the Pure api:
+    GET  /ws/api/research-outputs?size=&offset=   a page of research outputs
+    GET  /ws/api/research-outputs/{uuid}          a single research output
+    POST /ws/api/research-outputs/search          {"searchString": ..., "size": ...}
+    GET  /ws/api/changes/{date or token}          the change feed
+
+Research outputs changed with add() / update() / delete() show up in the change feed.
+The stand-in can be used in-process as an httpx transport, or served over http.
+
+usage:
+    stand_in = PureStandIn.with_sample_records(5_000)
+    client = httpx.AsyncClient(transport=stand_in.transport())
+    connector = PureConnector(api_url=PureStandIn.API_URL)
+    counts = await connector.sync(client)
+
+    # over http, e.g. for the app (with PURE_API_URL=http://127.0.0.1:8765/ws/api):
+    python -m retrieve.pure_standin --port 8765 --records 5000
+"""
+
+import argparse
+import json
+import random
+import threading
+import uuid
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from loguru import logger
+
+
+class PureStandIn:
+    """
+    In-memory stand-in for the research outputs and change feed of the Pure api
+
+    Attributes:
+        records: the research outputs by uuid
+        changes: the change log, oldest first
+        api_key: the api key requests must send, None to accept any request
+    """
+
+    API_URL = "http://pure.standin/ws/api"
+    CHANGES_PAGE_SIZE = 100
+
+    def __init__(self, records: list[dict] | None = None, api_key: str | None = None):
+        self.records: dict[str, dict] = {}
+        self.changes: list[dict] = []
+        self.api_key = api_key
+        self._lock = threading.Lock()
+        for record in records or []:
+            self.add(record)
+
+    @classmethod
+    def with_sample_records(cls, n: int, seed: int = 0, **kwargs) -> "PureStandIn":
+        """
+        Create a stand-in with n generated research outputs
+        """
+        rng = random.Random(seed)
+        return cls([sample_record(i, rng) for i in range(n)], **kwargs)
+
+    def log_change(self, record_uuid: str, change_type: str) -> None:
+        self.changes.append(
+            {
+                "uuid": record_uuid,
+                "changeType": change_type,
+                "familySystemName": "ResearchOutput",
+                "version": len(self.changes) + 1,
+                "date": date.today().isoformat(),
+            }
+        )
+
+    def add(self, record: dict) -> None:
+        with self._lock:
+            self.records[record["uuid"]] = record
+            self.log_change(record["uuid"], "CREATE")
+
+    def update(self, record_uuid: str, **fields) -> None:
+        with self._lock:
+            self.records[record_uuid] = self.records[record_uuid] | fields
+            self.log_change(record_uuid, "UPDATE")
+
+    def delete(self, record_uuid: str) -> None:
+        with self._lock:
+            del self.records[record_uuid]
+            self.log_change(record_uuid, "DELETE")
+
+    def list_results(self, items: list[dict], offset: int, size: int) -> dict:
+        return {
+            "count": len(items),
+            "pageInformation": {"offset": offset, "size": size},
+            "items": items[offset : offset + size],
+        }
+
+    def search(self, body: dict) -> dict:
+        term = str(body.get("searchString", "")).lower()
+        size, offset = int(body.get("size", 10)), int(body.get("offset", 0))
+        items = [
+            record
+            for record in self.records.values()
+            if term in json.dumps(record).lower()
+        ]
+        return self.list_results(items, offset, size)
+
+    def change_feed(self, token: str) -> dict:
+        """
+        A page of the change feed from a date (yyyy-mm-dd) or a resumption token
+        """
+        if token.isdigit():
+            start = int(token)
+        else:
+            start = next(
+                (i for i, change in enumerate(self.changes) if change["date"] >= token),
+                len(self.changes),
+            )
+        end = min(start + self.CHANGES_PAGE_SIZE, len(self.changes))
+        return {
+            "count": end - start,
+            "resumptionToken": str(end),
+            "moreChanges": end < len(self.changes),
+            "items": [
+                {k: v for k, v in change.items() if k != "date"}
+                for change in self.changes[start:end]
+            ],
+        }
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """
+        Handle a request to the stand-in api
+        """
+        if self.api_key and request.headers.get("api-key") != self.api_key:
+            return httpx.Response(401, json={"code": 401, "title": "Unauthorized"})
+        path = request.url.path.split("/ws/api/", 1)[-1].strip("/").split("/")
+        with self._lock:
+            match request.method, path:
+                case "GET", ["research-outputs"]:
+                    params = request.url.params
+                    body = self.list_results(
+                        list(self.records.values()),
+                        int(params.get("offset", 0)),
+                        int(params.get("size", 10)),
+                    )
+                case "GET", ["research-outputs", record_uuid]:
+                    body = self.records.get(record_uuid)
+                case "POST", ["research-outputs", "search"]:
+                    body = self.search(json.loads(request.content or b"{}"))
+                case "GET", ["changes", token]:
+                    body = self.change_feed(token)
+                case _:
+                    body = None
+        if body is None:
+            return httpx.Response(404, json={"code": 404, "title": "Not found"})
+        return httpx.Response(200, json=body)
+
+    def transport(self) -> httpx.MockTransport:
+        """
+        An httpx transport (sync and async) that routes requests to the stand-in
+        """
+        return httpx.MockTransport(self.handle)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8765) -> None:
+        """
+        Serve the stand-in api over http, until interrupted
+        """
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                self.respond()
+
+            def do_POST(self) -> None:
+                self.respond()
+
+            def respond(self) -> None:
+                content = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                response = stand_in.handle(
+                    httpx.Request(
+                        self.command,
+                        f"http://{host}:{port}{self.path}",
+                        headers=dict(self.headers),
+                        content=content,
+                    )
+                )
+                self.send_response(response.status_code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(response.content)))
+                self.end_headers()
+                self.wfile.write(response.content)
+
+        logger.info("Pure stand-in serving at http://{}:{}/ws/api", host, port)
+        ThreadingHTTPServer((host, port), Handler).serve_forever()
+
+
+def sample_record(i: int, rng: random.Random) -> dict:
+    """
+    Generate a research output in the Pure JSON shape
+    """
+    return {
+        "pureId": 100_000 + i,
+        "uuid": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "systemName": "ResearchOutput",
+        "typeDiscriminator": "ContributionToJournal",
+        "title": {"value": f"Research output {i}"},
+        "type": {
+            "uri": "/dk/atira/pure/researchoutput/researchoutputtypes/contributiontojournal/article",
+            "term": {"en_GB": "Article"},
+        },
+        "publicationStatuses": [
+            {
+                "current": True,
+                "publicationStatus": {"term": {"en_GB": "Published"}},
+                "publicationDate": {"year": rng.randint(2000, 2025)},
+            }
+        ],
+        "contributors": [
+            {
+                "typeDiscriminator": "InternalContributorAssociation",
+                "name": {"firstName": f"Author{j}", "lastName": f"Surname{i}"},
+            }
+            for j in range(rng.randint(1, 5))
+        ],
+        "electronicVersions": [
+            {
+                "typeDiscriminator": "DoiElectronicVersion",
+                "doi": f"https://doi.org/10.5555/standin.{i}",
+            }
+        ],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a stand-in Pure api")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--api-key", default=None)
+    args = parser.parse_args()
+    PureStandIn.with_sample_records(args.records, api_key=args.api_key).serve(
+        args.host, args.port
+    )
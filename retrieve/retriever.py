@@ -4,31 +4,47 @@ main functionality to retrieve data from various sources
 user inputs an id and the retriever will return data from all valid sources for that id
 """
 
+import asyncio
+import itertools
 from collections import defaultdict
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import ThreadPoolExecutor
 
+import httpx
+
+from data.constants import (
+    CACHE_ENABLED,
+    MAX_CONCURRENT_REQUESTS,
+    MAX_CONCURRENT_REQUESTS_PER_CONNECTOR,
+)
 from models.enums import Identifier
+from models.validate import get_validator
 
+from .cache import ResponseCache
 from .connectors import (
     Connector,
     CrossrefConnector,
     DataCiteConnector,
+    LocalOpenAlexConnector,
     OpenAIREConnector,
     OpenAlexConnector,
     ORCIDConnector,
     PubMedConnector,
     PureConnector,
 )
+from .inflight import IN_FLIGHT
+from .transport import aclose_async_client, get_async_client
 
 CONNECTOR_MAPPING: dict[Identifier, list[Connector]] = {
     Identifier.DOI: [
-        OpenAlexConnector,
+        LocalOpenAlexConnector,
         OpenAIREConnector,
         CrossrefConnector,
         DataCiteConnector,
         PureConnector,
     ],
     Identifier.PMID: [
-        OpenAlexConnector,
+        LocalOpenAlexConnector,
         OpenAIREConnector,
         PubMedConnector,
     ],
@@ -57,22 +73,101 @@ def group_by_id(iterable):
     return dict(ret)
 
 
+def is_implemented(connector: type[Connector]) -> bool:
+    """
+    check if a connector class actually implements retrieval,
+    i.e. it overrides get() instead of relying on the Connector protocol stub
+    """
+    return getattr(connector, "get", Connector.get) is not Connector.get
+
+
+def canonicalize(id_value: str, id_type: Identifier) -> str | None:
+    """
+    canonicalize an id using the validator for its type
+    returns None (and prints the reason) if the id is invalid
+    """
+    validator = get_validator(id_type.value)
+    if validator is None:
+        return str(id_value).strip()
+    try:
+        return validator(id_value)
+    except ValueError as e:
+        print(f"Invalid {id_type.value}: {e}")
+        return None
+
+
+def unwrap_single_results(data: dict[str, dict]) -> dict[str, dict]:
+    """
+    unwrap single-element result lists so each source maps to a single record
+    """
+    for k, v in data.items():
+        if v and isinstance(v, dict):
+            for source, result in v.items():
+                if isinstance(result, list) and len(result) == 1:
+                    data[k][source] = result[0]
+    return data
+
+
 class Retriever:
     """
     main class to retrieve data from various sources
     usage:
     1. create the retriever instance
     2. use retriever.add_id({id_type: str, id: str}) to add an id to the retriever
+    3. call retriever.retrieve(), or await retriever.aretrieve() to run all
+       requests concurrently
+    to process records as soon as they arrive, iterate over retriever.iter_retrieve()
+    or retriever.aiter_retrieve() instead.
     """
 
-    def __init__(self):
+    def __init__(
+        self, cache: ResponseCache | None = None, *, use_cache: bool = CACHE_ENABLED
+    ):
         self.ids: list[tuple[Identifier, str]] = []
+        self._id_set: set[tuple[Identifier, str]] = set()
         self.data: dict[str, dict[str, dict]] = {}
+        self.cache: ResponseCache | None = None
+        if use_cache:
+            self.cache = cache if cache is not None else ResponseCache()
+
+    def from_cache(
+        self, source: str, id_type: Identifier, id_values: list[str]
+    ) -> tuple[dict[str, dict], list[str]]:
+        """
+        look up ids in the cache
+        returns the cached records by id, and the ids that still need to be retrieved
+        """
+        if self.cache is None:
+            return {}, list(id_values)
+        cached: dict[str, dict] = {}
+        missing: list[str] = []
+        for id_value in id_values:
+            record = self.cache.get(source, id_type, id_value)
+            if record is None:
+                missing.append(id_value)
+            else:
+                cached[id_value] = record
+        return cached, missing
+
+    def to_cache(
+        self, source: str, id_type: Identifier, results: dict[str, dict]
+    ) -> None:
+        """
+        store retrieved records in the cache
+        """
+        if self.cache is None:
+            return
+        for id_value, result in results.items():
+            self.cache.put(source, id_type, id_value, result)
 
     def add_id(self, id: tuple[Identifier, str] | list[tuple[Identifier, str]]):
         """
         add an id or list of ids to the retriever
         each id should be a tuple with the id type + id value
+
+        ids are canonicalized with the validators from models.validate and deduplicated,
+        so different spellings of the same id (e.g. `doi:10.x` and `https://doi.org/10.x`)
+        are only retrieved once. The retrieved data is keyed by the canonical id.
         """
 
         def check_id_type(id_type: Identifier | str) -> Identifier | None:
@@ -92,8 +187,13 @@ class Retriever:
         for id_tuple in id:
             id_type, id_value = id_tuple
             id_type = check_id_type(id_type)
-            if id_type:
-                self.ids.append((id_type, id_value))
+            if not id_type:
+                continue
+            id_value = canonicalize(id_value, id_type)
+            if id_value is None or (id_type, id_value) in self._id_set:
+                continue
+            self._id_set.add((id_type, id_value))
+            self.ids.append((id_type, id_value))
 
     def retrieve(self) -> dict:
         """
@@ -142,22 +242,219 @@ class Retriever:
                 print(f"No connector found for id type {id_type}.")
                 continue
             for connector in connectors:
-                connector_instance: Connector = connector()
-                if str(connector_instance) != "OpenAlex":
+                if not is_implemented(connector):
                     continue
-                for id_value in id_values:
-                    connector_instance.add_id(id_value, id_type)
-                results: dict[str, dict] = connector_instance.get()
+                connector_instance: Connector = connector()
+                source = str(connector_instance)
+                results = self.retrieve_from(connector_instance, id_type, id_values)
                 for id_value, result in results.items():
-                    full_data[id_value][str(connector_instance)] = result
+                    full_data[id_value][source] = result
 
         self.data.update(full_data)
-        data = dict(full_data)
+        return unwrap_single_results(dict(full_data))
 
-        for k, v in data.items():
-            if v and isinstance(v, dict):
-                for source, result in v.items():
-                    if isinstance(result, list) and len(result) == 1:
-                        data[k][source] = result[0]
+    def retrieve_from(
+        self, connector: Connector, id_type: Identifier, id_values: list[str]
+    ) -> dict[str, dict]:
+        """
+        retrieve ids of one type from a single connector: serve what we can from the cache,
+        wait for ids that are already being retrieved elsewhere and fetch the rest.
+        returns the records by id
+        """
+        source = str(connector)
+        results, missing = self.from_cache(source, id_type, id_values)
+        owned, shared = IN_FLIGHT.claim(source, id_type, missing)
+        retrieved: dict[str, dict] = {}
+        try:
+            if owned:
+                for id_value in owned:
+                    connector.add_id(id_value, id_type)
+                retrieved = connector.get()
+                self.to_cache(source, id_type, retrieved)
+        finally:
+            IN_FLIGHT.resolve(source, id_type, owned, retrieved)
+        results |= retrieved
+        for id_value, future in shared.items():
+            if (result := future.result()) is not None:
+                results[id_value] = result
+        return results
 
-        return data
+    def plan(
+        self, connector_instances: dict[type[Connector], Connector]
+    ) -> Iterator[tuple[Connector, Identifier, list[str]]]:
+        """
+        lazily generate the work for the async retrieval: (connector, id type, ids) items,
+        with the ids split into batches of the connector's BATCH_SIZE.
+        items of different connectors are interleaved, so no single connector
+        can hold up the rest.
+        """
+        per_connector: list[Iterator[tuple[Connector, Identifier, list[str]]]] = []
+        for id_type, id_values in group_by_id(self.ids).items():
+            connectors = CONNECTOR_MAPPING.get(id_type)
+            if not connectors:
+                print(f"No connector found for id type {id_type}.")
+                continue
+            for connector in connectors:
+                if not is_implemented(connector):
+                    continue
+                if connector not in connector_instances:
+                    connector_instances[connector] = connector()
+                batches = itertools.batched(
+                    id_values, getattr(connector, "BATCH_SIZE", 1), strict=False
+                )
+                per_connector.append(
+                    zip(
+                        itertools.repeat(connector_instances[connector]),
+                        itertools.repeat(id_type),
+                        map(list, batches),
+                        strict=False,
+                    )
+                )
+        # round robin over the connectors
+        while per_connector:
+            for work in list(per_connector):
+                item = next(work, None)
+                if item is None:
+                    per_connector.remove(work)
+                else:
+                    yield item
+
+    async def aiter_retrieve(
+        self,
+        client: httpx.AsyncClient | None = None,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+        max_per_connector: int = MAX_CONCURRENT_REQUESTS_PER_CONNECTOR,
+    ) -> AsyncIterator[tuple[str, str, dict]]:
+        """
+        async generator variant of retrieve: yields each record as soon as it is retrieved.
+
+        Requests run concurrently on a shared httpx.AsyncClient, with at most
+        max_concurrency requests in flight. Work is only scheduled when there is room
+        for it, so memory use stays bounded for very large id lists.
+
+        Args:
+            client: the client to use for all requests. If None, the shared
+                rate-limited client from retrieve.transport is used.
+            max_concurrency: the max number of requests in flight over all connectors
+            max_per_connector: the max number of requests in flight per connector
+
+        Yields:
+            tuples of (input id, source name, record)
+        """
+        if not self.ids:
+            print("No ids, nothing to retrieve")
+            return
+
+        if client is None:
+            client = get_async_client()
+
+        connector_instances: dict[type[Connector], Connector] = {}
+        connector_limits: dict[Connector, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(max_per_connector)
+        )
+
+        async def fetch(
+            connector: Connector, id_type: Identifier, ids: list[str]
+        ) -> list[tuple[str, str, dict]]:
+            source = str(connector)
+            results, missing = await asyncio.to_thread(
+                self.from_cache, source, id_type, ids
+            )
+            owned, shared = IN_FLIGHT.claim(source, id_type, missing)
+            retrieved: dict[str, dict] = {}
+            try:
+                if owned:
+                    async with connector_limits[connector]:
+                        retrieved = await connector.aget(
+                            client, dict.fromkeys(owned, id_type)
+                        )
+                    await asyncio.to_thread(self.to_cache, source, id_type, retrieved)
+            finally:
+                IN_FLIGHT.resolve(source, id_type, owned, retrieved)
+            results |= retrieved
+            for id_value, future in shared.items():
+                if (result := await asyncio.wrap_future(future)) is not None:
+                    results[id_value] = result
+            return [(id_value, source, r) for id_value, r in results.items()]
+
+        work = self.plan(connector_instances)
+        pending: set[asyncio.Task] = set()
+        try:
+            while True:
+                while len(pending) < max_concurrency and (item := next(work, None)):
+                    pending.add(asyncio.create_task(fetch(*item)))
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    for id_value, source, result in task.result():
+                        if isinstance(result, list) and len(result) == 1:
+                            result = result[0]  # noqa: PLW2901
+                        yield id_value, source, result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def aretrieve(
+        self,
+        client: httpx.AsyncClient | None = None,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+        max_per_connector: int = MAX_CONCURRENT_REQUESTS_PER_CONNECTOR,
+    ) -> dict:
+        """
+        async variant of retrieve: runs every (connector, id) pair concurrently
+        on a shared httpx.AsyncClient. Connectors that support batched lookups
+        (see BATCH_SIZE) get one request per batch of ids instead.
+
+        Args:
+            client: the client to use for all requests. If None, the shared
+                rate-limited client from retrieve.transport is used.
+            max_concurrency: the max number of requests in flight over all connectors
+            max_per_connector: the max number of requests in flight per connector
+
+        Returns:
+            the retrieved data, in the same shape as retrieve()
+        """
+        full_data: dict[str, dict[str, dict]] = defaultdict(dict)
+        async for id_value, source, result in self.aiter_retrieve(
+            client, max_concurrency, max_per_connector
+        ):
+            full_data[id_value][source] = result
+
+        self.data.update(full_data)
+        return dict(full_data)
+
+    def iter_retrieve(
+        self,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+        max_per_connector: int = MAX_CONCURRENT_REQUESTS_PER_CONNECTOR,
+    ) -> Iterator[tuple[str, str, dict]]:
+        """
+        sync iterator variant of aiter_retrieve, for use outside of async code.
+
+        The async retrieval runs on a private event loop in a worker thread, so this
+        also works when called from a thread that already runs an event loop.
+        Retrieval only progresses while the caller is waiting for the next item.
+
+        Yields:
+            tuples of (input id, source name, record)
+        """
+        loop = asyncio.new_event_loop()
+        results = self.aiter_retrieve(
+            max_concurrency=max_concurrency, max_per_connector=max_per_connector
+        )
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            try:
+                while True:
+                    try:
+                        yield executor.submit(
+                            loop.run_until_complete, anext(results)
+                        ).result()
+                    except StopAsyncIteration:
+                        break
+            finally:
+                executor.submit(loop.run_until_complete, results.aclose()).result()
+                executor.submit(loop.run_until_complete, aclose_async_client()).result()
+                loop.close()
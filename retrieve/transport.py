@@ -0,0 +1,281 @@
+"""
+shared, rate-limit-aware HTTP transport for all connectors and api helpers
+
+All outgoing requests should go through the clients returned by get_client() (sync) or
+get_async_client() (async). These share:
+    - a pooled transport that keeps connections alive between requests
+    - a token bucket rate limiter per host (see RATE_LIMITS)
+    - retries with exponential backoff + jitter on RETRY_STATUS_CODES and connection errors,
+      honoring the Retry-After header if the server sends one
+
+usage:
+    client = get_async_client()
+    response = await client.get("https://api.openalex.org/works", params={...})
+"""
+
+import asyncio
+import random
+import threading
+import time
+import weakref
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+
+import httpx
+from loguru import logger
+
+from data.constants import (
+    DEFAULT_RATE_LIMIT,
+    HTTP_TIMEOUT,
+    MAX_CONCURRENT_REQUESTS,
+    MAX_RETRIES,
+    MAX_RETRY_WAIT,
+    RATE_LIMITS,
+    RETRY_BACKOFF_FACTOR,
+    RETRY_STATUS_CODES,
+)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Instead of blocking, reserve() returns how long the caller has to wait before sending
+    its request, so the same bucket can be used from sync and async code.
+
+    Attributes:
+        rate: the number of requests per second
+        capacity: the max number of requests that can be sent in a burst
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token from the bucket.
+
+        Returns:
+            float: the number of seconds to wait before the request may be sent
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """
+        Make sure no new requests are sent for the given number of seconds,
+        e.g. after the server responded with a 429.
+        """
+        with self._lock:
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+_buckets: dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(host: str) -> TokenBucket:
+    """
+    Get the (shared) rate limiter for a host
+    """
+    with _buckets_lock:
+        if host not in _buckets:
+            _buckets[host] = TokenBucket(RATE_LIMITS.get(host, DEFAULT_RATE_LIMIT))
+        return _buckets[host]
+
+
+def retry_delay(response: httpx.Response | None, attempt: int) -> float:
+    """
+    Determine how long to wait before retrying a request.
+
+    Uses the Retry-After header if present, otherwise exponential backoff with jitter.
+
+    Args:
+        response: the response of the failed attempt, None if the request failed to connect
+        attempt: the number of the failed attempt, starting at 0
+    Returns:
+        float: the number of seconds to wait, at most MAX_RETRY_WAIT
+    """
+    if response is not None and (retry_after := response.headers.get("Retry-After")):
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+                delay = (retry_at - datetime.now(UTC)).total_seconds()
+            except (TypeError, ValueError):
+                delay = 0.0
+        if delay > 0:
+            return min(delay, MAX_RETRY_WAIT)
+    backoff = RETRY_BACKOFF_FACTOR * (2**attempt)
+    return min(random.uniform(backoff / 2, backoff * 1.5), MAX_RETRY_WAIT)
+
+
+class RetryTransport(httpx.BaseTransport):
+    """
+    Sync transport that applies the per-host rate limits and retries failed requests.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport | None = None,
+        max_retries: int = MAX_RETRIES,
+        retry_status_codes: list[int] = RETRY_STATUS_CODES,
+    ) -> None:
+        self.transport = transport or httpx.HTTPTransport(limits=default_limits())
+        self.max_retries = max_retries
+        self.retry_status_codes = set(retry_status_codes)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        bucket = get_bucket(request.url.host)
+        attempt = 0
+        while True:
+            time.sleep(bucket.reserve())
+            try:
+                response = self.transport.handle_request(request)
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = retry_delay(None, attempt)
+                logger.debug("{} for {}, retrying in {:.2f}s", e, request.url, delay)
+            else:
+                if (
+                    response.status_code not in self.retry_status_codes
+                    or attempt >= self.max_retries
+                ):
+                    return response
+                delay = retry_delay(response, attempt)
+                if response.status_code == 429:  # noqa: PLR2004
+                    bucket.pause(delay)
+                logger.debug(
+                    "{} for {}, retrying in {:.2f}s",
+                    response.status_code,
+                    request.url,
+                    delay,
+                )
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class AsyncRetryTransport(httpx.AsyncBaseTransport):
+    """
+    Async transport that applies the per-host rate limits and retries failed requests.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport | None = None,
+        max_retries: int = MAX_RETRIES,
+        retry_status_codes: list[int] = RETRY_STATUS_CODES,
+    ) -> None:
+        self.transport = transport or httpx.AsyncHTTPTransport(limits=default_limits())
+        self.max_retries = max_retries
+        self.retry_status_codes = set(retry_status_codes)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        bucket = get_bucket(request.url.host)
+        attempt = 0
+        while True:
+            await asyncio.sleep(bucket.reserve())
+            try:
+                response = await self.transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = retry_delay(None, attempt)
+                logger.debug("{} for {}, retrying in {:.2f}s", e, request.url, delay)
+            else:
+                if (
+                    response.status_code not in self.retry_status_codes
+                    or attempt >= self.max_retries
+                ):
+                    return response
+                delay = retry_delay(response, attempt)
+                if response.status_code == 429:  # noqa: PLR2004
+                    bucket.pause(delay)
+                logger.debug(
+                    "{} for {}, retrying in {:.2f}s",
+                    response.status_code,
+                    request.url,
+                    delay,
+                )
+                await response.aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def default_limits() -> httpx.Limits:
+    """
+    Connection pool limits for the shared transports
+    """
+    return httpx.Limits(
+        max_connections=MAX_CONCURRENT_REQUESTS,
+        max_keepalive_connections=MAX_CONCURRENT_REQUESTS,
+        keepalive_expiry=30,
+    )
+
+
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+# async clients are bound to the event loop they are used in, so keep one per loop
+_async_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, httpx.AsyncClient
+] = weakref.WeakKeyDictionary()
+
+
+def get_client() -> httpx.Client:
+    """
+    Get the shared sync client. A new client is created if the previous one was closed.
+    """
+    global _client  # noqa: PLW0603
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(
+                transport=RetryTransport(),
+                timeout=HTTP_TIMEOUT,
+                follow_redirects=True,
+            )
+        return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Get the shared async client for the running event loop.
+    A new client is created if the previous one was closed.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            transport=AsyncRetryTransport(),
+            timeout=HTTP_TIMEOUT,
+            follow_redirects=True,
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def aclose_async_client() -> None:
+    """
+    Close the shared async client for the running event loop, if there is one.
+    """
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -1,12 +1,20 @@
+import argparse
 import asyncio
-import json
+from functools import partial
+from pathlib import Path
 from typing import Any
 
 import duckdb
 import httpx
 import polars as pl
+import srsly
 from rich import print
 
+from data.constants import CACHE_DIR, OPENALEX_API_KEY
+from parse.abstract import invert_abstract, invert_abstracts
+from parse.identifiers import identifier_frame
+from retrieve.transport import get_async_client
+
 
 async def get_from_autocomplete(
     search_str: str,
@@ -44,9 +52,366 @@ async def get_from_autocomplete(
     data: dict[str, dict | list[dict]] = response.json()
     count: int = data.get("meta", {}).get("count") or 0
     results = data.get("results", [])
+    return count, results_frame(results)
+
+
+def results_frame(results: list[dict]) -> pl.DataFrame:
+    """Convert a page of OpenAlex results to a DataFrame."""
+    # rebuild the abstracts of works: as a column, the inverted index would become a
+    # struct with a field for every word in the page
+    if any("abstract_inverted_index" in result for result in results):
+        abstracts = invert_abstracts(
+            [result.pop("abstract_inverted_index", None) for result in results]
+        )
+        for result, abstract in zip(results, abstracts, strict=True):
+            result["abstract"] = abstract
 
-    results: pl.DataFrame = pl.from_dicts(results) if results else pl.DataFrame()
-    return count, results
+    return pl.from_dicts(results) if results else pl.DataFrame()
+
+
+# columns of the tables in the openalex schema
+DUCKDB_TABLES: dict[str, list[str]] = {
+    # Authors tables
+    "authors": [
+        "id TEXT",
+        "orcid TEXT",
+        "display_name TEXT",
+        "display_name_alternatives JSON",
+        "works_count INTEGER",
+        "cited_by_count INTEGER",
+        "last_known_institution TEXT",
+        "works_api_url TEXT",
+        "updated_date TIMESTAMP",
+    ],
+    "authors_counts_by_year": [
+        "author_id TEXT",
+        "year INTEGER",
+        "works_count INTEGER",
+        "cited_by_count INTEGER",
+        "oa_works_count INTEGER",
+    ],
+    "authors_ids": [
+        "author_id TEXT",
+        "openalex TEXT",
+        "orcid TEXT",
+        "scopus TEXT",
+        "twitter TEXT",
+        "wikipedia TEXT",
+        "mag BIGINT",
+    ],
+    # Topics table
+    "topics": [
+        "id TEXT",
+        "display_name TEXT",
+        "subfield_id TEXT",
+        "subfield_display_name TEXT",
+        "field_id TEXT",
+        "field_display_name TEXT",
+        "domain_id TEXT",
+        "domain_display_name TEXT",
+        "description TEXT",
+        "keywords TEXT",
+        "works_api_url TEXT",
+        "wikipedia_id TEXT",
+        "works_count INTEGER",
+        "cited_by_count INTEGER",
+        "updated_date TIMESTAMP",
+    ],
+    # Concepts tables
+    "concepts": [
+        "id TEXT",
+        "wikidata TEXT",
+        "display_name TEXT",
+        "level INTEGER",
+        "description TEXT",
+        "works_count INTEGER",
+        "cited_by_count INTEGER",
+        "image_url TEXT",
+        "image_thumbnail_url TEXT",
+        "works_api_url TEXT",
+        "updated_date TIMESTAMP",
+    ],
+    "concepts_ancestors": [
+        "concept_id TEXT",
+        "ancestor_id TEXT",
+    ],
+    "concepts_counts_by_year": [
+        "concept_id TEXT",
+        "year INTEGER",
+        "works_count INTEGER",
+        "cited_by_count INTEGER",
+        "oa_works_count INTEGER",
+    ],
+    "concepts_ids": [
+        "concept_id TEXT",
+        "openalex TEXT",
+        "wikidata TEXT",
+        "wikipedia TEXT",
+        "umls_aui JSON",
+        "umls_cui JSON",
+        "mag BIGINT",
+    ],
+    "concepts_related_concepts": [
+        "concept_id TEXT",
+        "related_concept_id TEXT",
+        "score REAL",
+    ],
+    # Institutions tables
+    "institutions": [
+        "id TEXT",
+        "ror TEXT",
+        "display_name TEXT",
+        "country_code TEXT",
+        "type TEXT",
+        "homepage_url TEXT",
+        "image_url TEXT",
+        "image_thumbnail_url TEXT",
+        "display_name_acronyms JSON",
+        "display_name_alternatives JSON",
+        "works_count INTEGER",
+        "cited_by_count INTEGER",
+        "works_api_url TEXT",
+        "updated_date TIMESTAMP",
+    ],
+    "institutions_associated_institutions": [
+        "institution_id TEXT",
+        "associated_institution_id TEXT",
+        "relationship TEXT",
+    ],
+    "institutions_counts_by_year": [
+        "institution_id TEXT",
+        "year INTEGER",
+        "works_count INTEGER",
+        "cited_by_count INTEGER",
+        "oa_works_count INTEGER",
+    ],
+    "institutions_geo": [
+        "institution_id TEXT",
+        "city TEXT",
+        "geonames_city_id TEXT",
+        "region TEXT",
+        "country_code TEXT",
+        "country TEXT",
+        "latitude REAL",
+        "longitude REAL",
+    ],
+    "institutions_ids": [
+        "institution_id TEXT",
+        "openalex TEXT",
+        "ror TEXT",
+        "grid TEXT",
+        "wikipedia TEXT",
+        "wikidata TEXT",
+        "mag BIGINT",
+    ],
+    # Publishers tables
+    "publishers": [
+        "id TEXT",
+        "display_name TEXT",
+        "alternate_titles JSON",
+        "country_codes JSON",
+        "hierarchy_level INTEGER",
+        "parent_publisher TEXT",
+        "works_count INTEGER",
+        "cited_by_count INTEGER",
+        "sources_api_url TEXT",
+        "updated_date TIMESTAMP",
+    ],
+    "publishers_counts_by_year": [
+        "publisher_id TEXT",
+        "year INTEGER",
+        "works_count INTEGER",
+        "cited_by_count INTEGER",
+        "oa_works_count INTEGER",
+    ],
+    "publishers_ids": [
+        "publisher_id TEXT",
+        "openalex TEXT",
+        "ror TEXT",
+        "wikidata TEXT",
+    ],
+    # Sources tables
+    "sources": [
+        "id TEXT",
+        "issn_l TEXT",
+        "issn JSON",
+        "display_name TEXT",
+        "publisher TEXT",
+        "works_count INTEGER",
+        "cited_by_count INTEGER",
+        "is_oa BOOLEAN",
+        "is_in_doaj BOOLEAN",
+        "homepage_url TEXT",
+        "works_api_url TEXT",
+        "updated_date TIMESTAMP",
+    ],
+    "sources_counts_by_year": [
+        "source_id TEXT",
+        "year INTEGER",
+        "works_count INTEGER",
+        "cited_by_count INTEGER",
+        "oa_works_count INTEGER",
+    ],
+    "sources_ids": [
+        "source_id TEXT",
+        "openalex TEXT",
+        "issn_l TEXT",
+        "issn JSON",
+        "mag BIGINT",
+        "wikidata TEXT",
+        "fatcat TEXT",
+    ],
+    # Works tables
+    "works": [
+        "id TEXT",
+        "doi TEXT",
+        "title TEXT",
+        "display_name TEXT",
+        "publication_year INTEGER",
+        "publication_date TEXT",
+        "type TEXT",
+        "cited_by_count INTEGER",
+        "is_retracted BOOLEAN",
+        "is_paratext BOOLEAN",
+        "cited_by_api_url TEXT",
+        "abstract TEXT",
+        "language TEXT",
+        "updated_date TIMESTAMP",
+    ],
+    "works_primary_locations": [
+        "work_id TEXT",
+        "source_id TEXT",
+        "landing_page_url TEXT",
+        "pdf_url TEXT",
+        "is_oa BOOLEAN",
+        "version TEXT",
+        "license TEXT",
+    ],
+    "works_locations": [
+        "work_id TEXT",
+        "source_id TEXT",
+        "landing_page_url TEXT",
+        "pdf_url TEXT",
+        "is_oa BOOLEAN",
+        "version TEXT",
+        "license TEXT",
+    ],
+    "works_best_oa_locations": [
+        "work_id TEXT",
+        "source_id TEXT",
+        "landing_page_url TEXT",
+        "pdf_url TEXT",
+        "is_oa BOOLEAN",
+        "version TEXT",
+        "license TEXT",
+    ],
+    "works_authorships": [
+        "work_id TEXT",
+        "author_position TEXT",
+        "author_id TEXT",
+        "institution_id TEXT",
+        "raw_affiliation_string TEXT",
+    ],
+    "works_biblio": [
+        "work_id TEXT",
+        "volume TEXT",
+        "issue TEXT",
+        "first_page TEXT",
+        "last_page TEXT",
+    ],
+    "works_topics": [
+        "work_id TEXT",
+        "topic_id TEXT",
+        "score REAL",
+    ],
+    "works_concepts": [
+        "work_id TEXT",
+        "concept_id TEXT",
+        "score REAL",
+    ],
+    "works_ids": [
+        "work_id TEXT",
+        "openalex TEXT",
+        "doi TEXT",
+        "mag BIGINT",
+        "pmid TEXT",
+        "pmcid TEXT",
+    ],
+    "works_mesh": [
+        "work_id TEXT",
+        "descriptor_ui TEXT",
+        "descriptor_name TEXT",
+        "qualifier_ui TEXT",
+        "qualifier_name TEXT",
+        "is_major_topic BOOLEAN",
+    ],
+    "works_open_access": [
+        "work_id TEXT",
+        "is_oa BOOLEAN",
+        "oa_status TEXT",
+        "oa_url TEXT",
+        "any_repository_has_fulltext BOOLEAN",
+    ],
+    "works_referenced_works": [
+        "work_id TEXT",
+        "referenced_work_id TEXT",
+    ],
+    "works_related_works": [
+        "work_id TEXT",
+        "related_work_id TEXT",
+    ],
+    # Identifier index, see parse.identifiers
+    "identifiers": [
+        "entity_id TEXT",
+        "entity_type TEXT",
+        "id_type TEXT",
+        "id_value TEXT",
+    ],
+}
+
+DUCKDB_PRIMARY_KEYS: dict[str, list[str]] = {
+    "authors": ["id"],
+    "authors_counts_by_year": ["author_id", "year"],
+    "authors_ids": ["author_id"],
+    "topics": ["id"],
+    "concepts": ["id"],
+    "concepts_counts_by_year": ["concept_id", "year"],
+    "concepts_ids": ["concept_id"],
+    "institutions": ["id"],
+    "institutions_counts_by_year": ["institution_id", "year"],
+    "institutions_geo": ["institution_id"],
+    "institutions_ids": ["institution_id"],
+    "publishers": ["id"],
+    "publishers_counts_by_year": ["publisher_id", "year"],
+    "sources": ["id"],
+    "sources_counts_by_year": ["source_id", "year"],
+    "works": ["id"],
+    "works_biblio": ["work_id"],
+    "works_ids": ["work_id"],
+    "works_open_access": ["work_id"],
+    "identifiers": ["id_type", "id_value", "entity_type"],
+}
+
+# indexes to improve query performance: name -> (table, column)
+DUCKDB_INDEXES: dict[str, tuple[str, str]] = {
+    "concepts_ancestors_concept_id_idx": ("concepts_ancestors", "concept_id"),
+    "concepts_related_concepts_concept_id_idx": (
+        "concepts_related_concepts",
+        "concept_id",
+    ),
+    "concepts_related_concepts_related_concept_id_idx": (
+        "concepts_related_concepts",
+        "related_concept_id",
+    ),
+    "works_authorships_work_id_idx": ("works_authorships", "work_id"),
+    "works_concepts_work_id_idx": ("works_concepts", "work_id"),
+    "works_primary_locations_work_id_idx": ("works_primary_locations", "work_id"),
+    "works_locations_work_id_idx": ("works_locations", "work_id"),
+    "works_best_oa_locations_work_id_idx": ("works_best_oa_locations", "work_id"),
+    # identifier lookups of the local-first OpenAlex connector
+    "works_ids_doi_idx": ("works_ids", "doi"),
+    "works_ids_pmid_idx": ("works_ids", "pmid"),
+}
 
 
 def create_duckdb_connection(
@@ -56,433 +421,145 @@ def create_duckdb_connection(
     return duckdb.connect(db_path)
 
 
-def setup_duckdb_schema(conn: duckdb.DuckDBPyConnection) -> None:
-    """Create tables in DuckDB based on OpenAlex schema."""
+def setup_duckdb_schema(
+    conn: duckdb.DuckDBPyConnection, *, bulk_load: bool = False
+) -> None:
+    """Create tables in DuckDB based on OpenAlex schema.
+
+    Columns that are missing from existing tables (e.g. after a column was added to
+    DUCKDB_TABLES) are added to them.
+
+    In bulk-load mode the tables are created without primary keys and indexes, so
+    inserts don't have to maintain them. Call finalize_duckdb_schema() once all data is
+    loaded to add them in one pass.
+    """
 
     # Create the schema
     conn.execute("CREATE SCHEMA IF NOT EXISTS openalex")
-
-    # Authors tables
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.authors (
-            id TEXT PRIMARY KEY,
-            orcid TEXT,
-            display_name TEXT,
-            display_name_alternatives JSON,
-            works_count INTEGER,
-            cited_by_count INTEGER,
-            last_known_institution TEXT,
-            works_api_url TEXT,
-            updated_date TIMESTAMP
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.authors_counts_by_year (
-            author_id TEXT,
-            year INTEGER,
-            works_count INTEGER,
-            cited_by_count INTEGER,
-            oa_works_count INTEGER,
-            PRIMARY KEY (author_id, year)
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.authors_ids (
-            author_id TEXT PRIMARY KEY,
-            openalex TEXT,
-            orcid TEXT,
-            scopus TEXT,
-            twitter TEXT,
-            wikipedia TEXT,
-            mag BIGINT
+    existing = conn.execute("""
+        SELECT table_name, list(column_name) FROM duckdb_columns()
+        WHERE schema_name = 'openalex' GROUP BY table_name
+    """).fetchall()
+    # the identifier index is filled from the *_ids tables when it is missing, and
+    # rebuilt when it is from before entity_type was part of the key (it can't be
+    # altered to the new primary key)
+    identifiers_columns = dict(existing).get("identifiers")
+    rebuild = identifiers_columns is None or "entity_type" not in identifiers_columns
+    if identifiers_columns is not None and rebuild:
+        conn.execute("DROP TABLE openalex.identifiers")
+    for table, table_columns in existing:
+        for column in DUCKDB_TABLES.get(table, []):
+            if table != "identifiers" and column.split()[0] not in table_columns:
+                conn.execute(f"ALTER TABLE openalex.{table} ADD COLUMN {column}")
+
+    for table, columns in DUCKDB_TABLES.items():
+        definitions = columns
+        if not bulk_load and table in DUCKDB_PRIMARY_KEYS:
+            primary_key = ", ".join(DUCKDB_PRIMARY_KEYS[table])
+            definitions = [*columns, f"PRIMARY KEY ({primary_key})"]
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS openalex.{table} ({', '.join(definitions)})"
         )
-    """)
 
-    # Topics table
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.topics (
-            id TEXT PRIMARY KEY,
-            display_name TEXT,
-            subfield_id TEXT,
-            subfield_display_name TEXT,
-            field_id TEXT,
-            field_display_name TEXT,
-            domain_id TEXT,
-            domain_display_name TEXT,
-            description TEXT,
-            keywords TEXT,
-            works_api_url TEXT,
-            wikipedia_id TEXT,
-            works_count INTEGER,
-            cited_by_count INTEGER,
-            updated_date TIMESTAMP
-        )
-    """)
+    if rebuild:
+        rebuild_identifiers(conn)
+    if not bulk_load:
+        create_duckdb_indexes(conn)
 
-    # Concepts tables
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.concepts (
-            id TEXT PRIMARY KEY,
-            wikidata TEXT,
-            display_name TEXT,
-            level INTEGER,
-            description TEXT,
-            works_count INTEGER,
-            cited_by_count INTEGER,
-            image_url TEXT,
-            image_thumbnail_url TEXT,
-            works_api_url TEXT,
-            updated_date TIMESTAMP
-        )
-    """)
 
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.concepts_ancestors (
-            concept_id TEXT,
-            ancestor_id TEXT
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.concepts_counts_by_year (
-            concept_id TEXT,
-            year INTEGER,
-            works_count INTEGER,
-            cited_by_count INTEGER,
-            oa_works_count INTEGER,
-            PRIMARY KEY (concept_id, year)
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.concepts_ids (
-            concept_id TEXT PRIMARY KEY,
-            openalex TEXT,
-            wikidata TEXT,
-            wikipedia TEXT,
-            umls_aui JSON,
-            umls_cui JSON,
-            mag BIGINT
-        )
-    """)
+def rebuild_identifiers(conn: duckdb.DuckDBPyConnection) -> None:
+    """Fill the identifier index from the authors_ids, concepts_ids and works_ids."""
+    for entity in ("authors", "concepts", "works"):
+        ids = conn.execute(f"SELECT * FROM openalex.{entity}_ids").pl()
+        rows = identifier_frame(ids.lazy(), entity).collect()
+        if rows.is_empty():
+            continue
+        conn.register("identifier_rows", rows.to_arrow())
+        try:
+            conn.execute(
+                "INSERT OR IGNORE INTO openalex.identifiers BY NAME "
+                "SELECT * FROM identifier_rows"
+            )
+        finally:
+            conn.unregister("identifier_rows")
 
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.concepts_related_concepts (
-            concept_id TEXT,
-            related_concept_id TEXT,
-            score REAL
-        )
-    """)
 
-    # Institutions tables
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.institutions (
-            id TEXT PRIMARY KEY,
-            ror TEXT,
-            display_name TEXT,
-            country_code TEXT,
-            type TEXT,
-            homepage_url TEXT,
-            image_url TEXT,
-            image_thumbnail_url TEXT,
-            display_name_acronyms JSON,
-            display_name_alternatives JSON,
-            works_count INTEGER,
-            cited_by_count INTEGER,
-            works_api_url TEXT,
-            updated_date TIMESTAMP
+def create_duckdb_indexes(conn: duckdb.DuckDBPyConnection) -> None:
+    """Create the DUCKDB_INDEXES that don't exist yet."""
+    for index, (table, column) in DUCKDB_INDEXES.items():
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {index} ON openalex.{table}({column})"
         )
-    """)
 
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.institutions_associated_institutions (
-            institution_id TEXT,
-            associated_institution_id TEXT,
-            relationship TEXT
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.institutions_counts_by_year (
-            institution_id TEXT,
-            year INTEGER,
-            works_count INTEGER,
-            cited_by_count INTEGER,
-            oa_works_count INTEGER,
-            PRIMARY KEY (institution_id, year)
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.institutions_geo (
-            institution_id TEXT PRIMARY KEY,
-            city TEXT,
-            geonames_city_id TEXT,
-            region TEXT,
-            country_code TEXT,
-            country TEXT,
-            latitude REAL,
-            longitude REAL
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.institutions_ids (
-            institution_id TEXT PRIMARY KEY,
-            openalex TEXT,
-            ror TEXT,
-            grid TEXT,
-            wikipedia TEXT,
-            wikidata TEXT,
-            mag BIGINT
-        )
-    """)
-
-    # Publishers tables
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.publishers (
-            id TEXT PRIMARY KEY,
-            display_name TEXT,
-            alternate_titles JSON,
-            country_codes JSON,
-            hierarchy_level INTEGER,
-            parent_publisher TEXT,
-            works_count INTEGER,
-            cited_by_count INTEGER,
-            sources_api_url TEXT,
-            updated_date TIMESTAMP
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.publishers_counts_by_year (
-            publisher_id TEXT,
-            year INTEGER,
-            works_count INTEGER,
-            cited_by_count INTEGER,
-            oa_works_count INTEGER,
-            PRIMARY KEY (publisher_id, year)
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.publishers_ids (
-            publisher_id TEXT,
-            openalex TEXT,
-            ror TEXT,
-            wikidata TEXT
-        )
-    """)
 
-    # Sources tables
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.sources (
-            id TEXT PRIMARY KEY,
-            issn_l TEXT,
-            issn JSON,
-            display_name TEXT,
-            publisher TEXT,
-            works_count INTEGER,
-            cited_by_count INTEGER,
-            is_oa BOOLEAN,
-            is_in_doaj BOOLEAN,
-            homepage_url TEXT,
-            works_api_url TEXT,
-            updated_date TIMESTAMP
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.sources_counts_by_year (
-            source_id TEXT,
-            year INTEGER,
-            works_count INTEGER,
-            cited_by_count INTEGER,
-            oa_works_count INTEGER,
-            PRIMARY KEY (source_id, year)
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.sources_ids (
-            source_id TEXT,
-            openalex TEXT,
-            issn_l TEXT,
-            issn JSON,
-            mag BIGINT,
-            wikidata TEXT,
-            fatcat TEXT
-        )
-    """)
+def finalize_duckdb_schema(
+    conn: duckdb.DuckDBPyConnection, *, deduplicate: bool = False
+) -> pl.DataFrame:
+    """Add the primary keys and indexes to tables created in bulk-load mode.
 
-    # Works tables
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.works (
-            id TEXT PRIMARY KEY,
-            doi TEXT,
-            title TEXT,
-            display_name TEXT,
-            publication_year INTEGER,
-            publication_date TEXT,
-            type TEXT,
-            cited_by_count INTEGER,
-            is_retracted BOOLEAN,
-            is_paratext BOOLEAN,
-            cited_by_api_url TEXT,
-            abstract TEXT,
-            language TEXT
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.works_primary_locations (
-            work_id TEXT,
-            source_id TEXT,
-            landing_page_url TEXT,
-            pdf_url TEXT,
-            is_oa BOOLEAN,
-            version TEXT,
-            license TEXT
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.works_locations (
-            work_id TEXT,
-            source_id TEXT,
-            landing_page_url TEXT,
-            pdf_url TEXT,
-            is_oa BOOLEAN,
-            version TEXT,
-            license TEXT
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.works_best_oa_locations (
-            work_id TEXT,
-            source_id TEXT,
-            landing_page_url TEXT,
-            pdf_url TEXT,
-            is_oa BOOLEAN,
-            version TEXT,
-            license TEXT
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.works_authorships (
-            work_id TEXT,
-            author_position TEXT,
-            author_id TEXT,
-            institution_id TEXT,
-            raw_affiliation_string TEXT
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.works_biblio (
-            work_id TEXT PRIMARY KEY,
-            volume TEXT,
-            issue TEXT,
-            first_page TEXT,
-            last_page TEXT
-        )
-    """)
+    Before a primary key is added, the table is checked for duplicate keys. Tables with
+    duplicates don't get a primary key, unless deduplicate is True: then only the last
+    inserted row of every key is kept, as an INSERT OR REPLACE would have done.
 
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.works_topics (
-            work_id TEXT,
-            topic_id TEXT,
-            score REAL
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.works_concepts (
-            work_id TEXT,
-            concept_id TEXT,
-            score REAL
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.works_ids (
-            work_id TEXT PRIMARY KEY,
-            openalex TEXT,
-            doi TEXT,
-            mag BIGINT,
-            pmid TEXT,
-            pmcid TEXT
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.works_mesh (
-            work_id TEXT,
-            descriptor_ui TEXT,
-            descriptor_name TEXT,
-            qualifier_ui TEXT,
-            qualifier_name TEXT,
-            is_major_topic BOOLEAN
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.works_open_access (
-            work_id TEXT PRIMARY KEY,
-            is_oa BOOLEAN,
-            oa_status TEXT,
-            oa_url TEXT,
-            any_repository_has_fulltext BOOLEAN
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.works_referenced_works (
-            work_id TEXT,
-            referenced_work_id TEXT
-        )
-    """)
-
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS openalex.works_related_works (
-            work_id TEXT,
-            related_work_id TEXT
+    Returns
+    -------
+    pl.DataFrame
+        Validation report with a row per table: the number of rows, the number of
+        duplicated keys and the status of its primary key.
+    """
+    existing = {
+        row[0]
+        for row in conn.execute("""
+            SELECT table_name FROM duckdb_constraints()
+            WHERE schema_name = 'openalex' AND constraint_type = 'PRIMARY KEY'
+        """).fetchall()
+    }
+    report = []
+    for table, key in DUCKDB_PRIMARY_KEYS.items():
+        columns = ", ".join(key)
+        rows, keys = conn.execute(
+            f"SELECT count(*), count(DISTINCT ({columns})) FROM openalex.{table}"
+        ).fetchone()
+        duplicates = rows - keys
+        if table in existing:
+            status = "exists"
+        elif duplicates and not deduplicate:
+            status = "skipped: duplicate keys"
+        else:
+            if duplicates:
+                conn.execute(f"""
+                    DELETE FROM openalex.{table} WHERE rowid IN (
+                        SELECT rowid FROM openalex.{table}
+                        QUALIFY row_number() OVER (
+                            PARTITION BY {columns} ORDER BY rowid DESC
+                        ) > 1
+                    )
+                """)
+            conn.execute(f"ALTER TABLE openalex.{table} ADD PRIMARY KEY ({columns})")
+            status = "deduplicated" if duplicates else "added"
+        report.append(
+            {
+                "table": table,
+                "primary_key": columns,
+                "rows": rows,
+                "duplicate_keys": duplicates,
+                "status": status,
+            }
         )
-    """)
 
-    # Indexes to improve query performance
-    conn.execute(
-        "CREATE INDEX IF NOT EXISTS concepts_ancestors_concept_id_idx ON openalex.concepts_ancestors(concept_id)"
-    )
-    conn.execute(
-        "CREATE INDEX IF NOT EXISTS concepts_related_concepts_concept_id_idx ON openalex.concepts_related_concepts(concept_id)"
-    )
-    conn.execute(
-        "CREATE INDEX IF NOT EXISTS concepts_related_concepts_related_concept_id_idx ON openalex.concepts_related_concepts(related_concept_id)"
-    )
-    conn.execute(
-        "CREATE INDEX IF NOT EXISTS works_authorships_work_id_idx ON openalex.works_authorships(work_id)"
-    )
-    conn.execute(
-        "CREATE INDEX IF NOT EXISTS works_concepts_work_id_idx ON openalex.works_concepts(work_id)"
-    )
-    conn.execute(
-        "CREATE INDEX IF NOT EXISTS works_primary_locations_work_id_idx ON openalex.works_primary_locations(work_id)"
-    )
-    conn.execute(
-        "CREATE INDEX IF NOT EXISTS works_locations_work_id_idx ON openalex.works_locations(work_id)"
-    )
-    conn.execute(
-        "CREATE INDEX IF NOT EXISTS works_best_oa_locations_work_id_idx ON openalex.works_best_oa_locations(work_id)"
-    )
+    create_duckdb_indexes(conn)
+    return pl.DataFrame(report)
 
 
 class OpenAlexParser:
-    """Class to parse and flatten OpenAlex API data for database ingestion."""
+    """Class to parse and flatten OpenAlex API data for database ingestion.
+
+    The parse methods take a page of API results, either as a list of dicts or as a
+    pl.DataFrame with the nested fields as struct / list columns (as returned by
+    get_from_autocomplete), and build every table with column expressions
+    (unnest / explode) instead of looping over the records in Python.
+    Fields that are missing from the page are returned as null columns.
+    """
 
     @staticmethod
     def invert_abstract(inv_index: dict | None):
@@ -498,380 +575,518 @@ class OpenAlexParser:
         str
             Inverted abstract.
         """
-        if inv_index is None:
-            return None
-        try:
-            l_inv_new = {}
-            for w, pos in inv_index.items():
-                if not pos:
-                    continue
-                l_inv_new[w] = pos
-            l_inv = [(w, p) for w, pos in l_inv_new.items() for p in pos if pos]
-        except TypeError:
-            print(l_inv_new)
-
-            input("Press Enter to continue...")
-            return None
-        return " ".join(map(lambda x: x[0], sorted(l_inv, key=lambda x: x[1])))
+        return invert_abstract(inv_index)
 
     @staticmethod
-    def parse_authors(data: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
-        """Parse authors data from API response."""
-        results = {"authors": [], "authors_ids": [], "authors_counts_by_year": []}
+    def to_frame(data: pl.DataFrame | list[dict[str, Any]]) -> pl.DataFrame:
+        """Get a page of API results as a DataFrame, without rows that have no id.
 
-        for author in data:
-            author_id = author.get("id")
-            if not author_id:
-                continue
+        The abstract_inverted_index of works is replaced by the rebuilt abstract: as a
+        column it is a struct with a field for every word in the page, which is very
+        slow to build and to work with.
+        """
+        if not isinstance(data, pl.DataFrame):
+            abstracts = None
+            if any("abstract_inverted_index" in record for record in data):
+                abstracts = invert_abstracts(
+                    [record.get("abstract_inverted_index") for record in data]
+                )
+                data = [
+                    {k: v for k, v in record.items() if k != "abstract_inverted_index"}
+                    for record in data
+                ]
+            data = (
+                pl.from_dicts(data, infer_schema_length=None)
+                if data
+                else pl.DataFrame()
+            )
+            if abstracts is not None:
+                data = data.with_columns(abstracts)
+        elif "abstract_inverted_index" in data.columns:
+            data = data.with_columns(
+                invert_abstracts(data.get_column("abstract_inverted_index"))
+            ).drop("abstract_inverted_index")
+        if "id" not in data.columns:
+            return pl.DataFrame(schema={"id": pl.String})
+        return data.filter(pl.col("id").is_not_null())
 
-            # Main author data
-            author_data = {
-                "id": author_id,
-                "orcid": author.get("orcid"),
-                "display_name": author.get("display_name"),
-                "display_name_alternatives": json.dumps(
-                    author.get("display_name_alternatives") or []
-                ),
-                "works_count": author.get("works_count"),
-                "cited_by_count": author.get("cited_by_count"),
-                "last_known_institution": (
-                    author.get("last_known_institution") or {}
-                ).get("id"),
-                "works_api_url": author.get("works_api_url"),
-                "updated_date": author.get("updated_date"),
-            }
-            results["authors"].append(author_data)
-
-            # Author IDs
-            if ids := author.get("ids"):
-                ids_data = {
-                    "author_id": author_id,
-                    "openalex": ids.get("openalex"),
-                    "orcid": ids.get("orcid"),
-                    "scopus": ids.get("scopus"),
-                    "twitter": ids.get("twitter"),
-                    "wikipedia": ids.get("wikipedia"),
-                    "mag": ids.get("mag"),
-                }
-                results["authors_ids"].append(ids_data)
-
-            # Counts by year
-            for count in author.get("counts_by_year") or []:
-                count_data = {
-                    "author_id": author_id,
-                    "year": count.get("year"),
-                    "works_count": count.get("works_count"),
-                    "cited_by_count": count.get("cited_by_count"),
-                    "oa_works_count": count.get("oa_works_count"),
-                }
-                results["authors_counts_by_year"].append(count_data)
+    @staticmethod
+    def field(
+        schema: pl.Schema, column: str, *path: str, dtype: pl.DataType = pl.String
+    ) -> pl.Expr:
+        """Get a (nested struct) field of a column, or a null literal if it is missing.
 
-        return results
+        Parameters
+        ----------
+        schema : pl.Schema
+            The schema of the frame the expression is used on.
+        column : str
+            The name of the column.
+        *path : str
+            The names of the nested struct fields, e.g. "author", "id".
+        dtype : pl.DataType
+            The type of the null literal if the field is missing.
+        """
+        if column not in schema:
+            return pl.lit(None, dtype)
+        expr, current = pl.col(column), schema[column]
+        for name in path:
+            if not isinstance(current, pl.Struct):
+                return pl.lit(None, dtype)
+            fields = {f.name: f.dtype for f in current.fields}
+            if name not in fields:
+                return pl.lit(None, dtype)
+            expr, current = expr.struct.field(name), fields[name]
+        return expr
 
     @staticmethod
-    def parse_concepts(data: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
-        """Parse concepts data from API response."""
-        results = {
-            "concepts": [],
-            "concepts_ids": [],
-            "concepts_ancestors": [],
-            "concepts_counts_by_year": [],
-            "concepts_related_concepts": [],
-        }
-
-        for concept in data:
-            concept_id = concept.get("id")
-            if not concept_id:
-                continue
+    def explode(
+        df: pl.LazyFrame,
+        schema: pl.Schema,
+        key: str,
+        column: str,
+        fields: dict[str, tuple[str, ...]],
+    ) -> pl.LazyFrame:
+        """Explode a list-of-structs column into a child table.
+
+        Parameters
+        ----------
+        df : pl.LazyFrame
+            The parent table, with an "id" column.
+        schema : pl.Schema
+            The schema of the parent table.
+        key : str
+            The name of the parent id column in the child table, e.g. "work_id".
+        column : str
+            The list column to explode, e.g. "concepts".
+        fields : dict[str, tuple[str, ...]]
+            The child table columns: column name -> path of the struct field.
 
-            # Main concept data
-            concept_data = {
-                "id": concept_id,
-                "wikidata": concept.get("wikidata"),
-                "display_name": concept.get("display_name"),
-                "level": concept.get("level"),
-                "description": concept.get("description"),
-                "works_count": concept.get("works_count"),
-                "cited_by_count": concept.get("cited_by_count"),
-                "image_url": concept.get("image_url"),
-                "image_thumbnail_url": concept.get("image_thumbnail_url"),
-                "works_api_url": concept.get("works_api_url"),
-                "updated_date": concept.get("updated_date"),
+        Returns
+        -------
+        pl.LazyFrame
+            The child table, with a row for each list element.
+        """
+        if isinstance(schema.get(column), pl.List):
+            items = (
+                df.select(pl.col("id").alias(key), pl.col(column))
+                .explode(column)
+                .filter(pl.col(column).is_not_null())
+            )
+        else:
+            items = pl.LazyFrame(schema={key: pl.String})
+        item_schema = items.collect_schema()
+        return items.select(
+            pl.col(key),
+            *(
+                OpenAlexParser.field(item_schema, column, *path).alias(name)
+                for name, path in fields.items()
+            ),
+        )
+
+    @staticmethod
+    def json_list(schema: pl.Schema, column: str, *path: str) -> pl.Expr:
+        """Encode a list field as a json string, "[]" if it is missing."""
+        expr = OpenAlexParser.field(schema, column, *path)
+        encoded = (
+            pl.struct(expr.alias("list"))
+            .struct.json_encode()
+            .str.strip_prefix('{"list":')
+            .str.strip_suffix("}")
+        )
+        return pl.when(expr.is_null()).then(pl.lit("[]")).otherwise(encoded)
+
+    @staticmethod
+    def counts_by_year(df: pl.LazyFrame, schema: pl.Schema, key: str) -> pl.LazyFrame:
+        """Build the counts_by_year child table of an entity."""
+        return OpenAlexParser.explode(
+            df,
+            schema,
+            key,
+            "counts_by_year",
+            {
+                "year": ("year",),
+                "works_count": ("works_count",),
+                "cited_by_count": ("cited_by_count",),
+                "oa_works_count": ("oa_works_count",),
+            },
+        )
+
+    @staticmethod
+    def collect(tables: dict[str, pl.LazyFrame]) -> dict[str, pl.DataFrame]:
+        """Collect all tables of a page in one go, so common work is shared."""
+        return dict(zip(tables, pl.collect_all(tables.values()), strict=True))
+
+    @staticmethod
+    def parse_authors(
+        data: pl.DataFrame | list[dict[str, Any]],
+    ) -> dict[str, pl.DataFrame]:
+        """Parse authors data from API response."""
+        df = OpenAlexParser.to_frame(data)
+        schema, lf = df.schema, df.lazy()
+        f = partial(OpenAlexParser.field, schema)
+
+        authors = lf.select(
+            pl.col("id"),
+            f("orcid").alias("orcid"),
+            f("display_name").alias("display_name"),
+            OpenAlexParser.json_list(schema, "display_name_alternatives").alias(
+                "display_name_alternatives"
+            ),
+            f("works_count", dtype=pl.Int64).alias("works_count"),
+            f("cited_by_count", dtype=pl.Int64).alias("cited_by_count"),
+            f("last_known_institution", "id").alias("last_known_institution"),
+            f("works_api_url").alias("works_api_url"),
+            f("updated_date").alias("updated_date"),
+        )
+
+        authors_ids = lf.filter(f("ids").is_not_null()).select(
+            pl.col("id").alias("author_id"),
+            *(
+                f("ids", name).alias(name)
+                for name in ("openalex", "orcid", "scopus", "twitter", "wikipedia")
+            ),
+            f("ids", "mag", dtype=pl.Int64).alias("mag"),
+        )
+
+        return OpenAlexParser.collect(
+            {
+                "authors": authors,
+                "authors_ids": authors_ids,
+                "authors_counts_by_year": OpenAlexParser.counts_by_year(
+                    lf, schema, "author_id"
+                ),
+                "identifiers": identifier_frame(authors_ids, "authors"),
             }
-            results["concepts"].append(concept_data)
-
-            # Concept IDs
-            if ids := concept.get("ids"):
-                ids_data = {
-                    "concept_id": concept_id,
-                    "openalex": ids.get("openalex"),
-                    "wikidata": ids.get("wikidata"),
-                    "wikipedia": ids.get("wikipedia"),
-                    "umls_aui": json.dumps(ids.get("umls_aui") or []),
-                    "umls_cui": json.dumps(ids.get("umls_cui") or []),
-                    "mag": ids.get("mag"),
-                }
-                results["concepts_ids"].append(ids_data)
+        )
 
-            # Ancestors
-            for ancestor in concept.get("ancestors") or []:
-                if ancestor_id := ancestor.get("id"):
-                    results["concepts_ancestors"].append(
-                        {"concept_id": concept_id, "ancestor_id": ancestor_id}
-                    )
+    @staticmethod
+    def parse_concepts(
+        data: pl.DataFrame | list[dict[str, Any]],
+    ) -> dict[str, pl.DataFrame]:
+        """Parse concepts data from API response."""
+        df = OpenAlexParser.to_frame(data)
+        schema, lf = df.schema, df.lazy()
+        f = partial(OpenAlexParser.field, schema)
+
+        concepts = lf.select(
+            pl.col("id"),
+            f("wikidata").alias("wikidata"),
+            f("display_name").alias("display_name"),
+            f("level", dtype=pl.Int64).alias("level"),
+            f("description").alias("description"),
+            f("works_count", dtype=pl.Int64).alias("works_count"),
+            f("cited_by_count", dtype=pl.Int64).alias("cited_by_count"),
+            f("image_url").alias("image_url"),
+            f("image_thumbnail_url").alias("image_thumbnail_url"),
+            f("works_api_url").alias("works_api_url"),
+            f("updated_date").alias("updated_date"),
+        )
 
-            # Counts by year
-            for count in concept.get("counts_by_year") or []:
-                count_data = {
-                    "concept_id": concept_id,
-                    "year": count.get("year"),
-                    "works_count": count.get("works_count"),
-                    "cited_by_count": count.get("cited_by_count"),
-                    "oa_works_count": count.get("oa_works_count"),
-                }
-                results["concepts_counts_by_year"].append(count_data)
-
-            # Related concepts
-            for related in concept.get("related_concepts") or []:
-                if related_id := related.get("id"):
-                    results["concepts_related_concepts"].append(
-                        {
-                            "concept_id": concept_id,
-                            "related_concept_id": related_id,
-                            "score": related.get("score"),
-                        }
-                    )
+        concepts_ids = lf.filter(f("ids").is_not_null()).select(
+            pl.col("id").alias("concept_id"),
+            f("ids", "openalex").alias("openalex"),
+            f("ids", "wikidata").alias("wikidata"),
+            f("ids", "wikipedia").alias("wikipedia"),
+            OpenAlexParser.json_list(schema, "ids", "umls_aui").alias("umls_aui"),
+            OpenAlexParser.json_list(schema, "ids", "umls_cui").alias("umls_cui"),
+            f("ids", "mag", dtype=pl.Int64).alias("mag"),
+        )
 
-        return results
+        ancestors = OpenAlexParser.explode(
+            lf, schema, "concept_id", "ancestors", {"ancestor_id": ("id",)}
+        ).filter(pl.col("ancestor_id").is_not_null())
+
+        related = OpenAlexParser.explode(
+            lf,
+            schema,
+            "concept_id",
+            "related_concepts",
+            {"related_concept_id": ("id",), "score": ("score",)},
+        ).filter(pl.col("related_concept_id").is_not_null())
+
+        return OpenAlexParser.collect(
+            {
+                "concepts": concepts,
+                "concepts_ids": concepts_ids,
+                "concepts_ancestors": ancestors,
+                "concepts_counts_by_year": OpenAlexParser.counts_by_year(
+                    lf, schema, "concept_id"
+                ),
+                "concepts_related_concepts": related,
+                "identifiers": identifier_frame(concepts_ids, "concepts"),
+            }
+        )
 
     @staticmethod
-    def parse_works(data: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    def parse_works(
+        data: pl.DataFrame | list[dict[str, Any]],
+    ) -> dict[str, pl.DataFrame]:
         """Parse works data from API response."""
-        results = {
-            "works": [],
-            "works_authorships": [],
-            "works_concepts": [],
-            "works_ids": [],
-            "works_open_access": [],
-        }
-
-        for work in data:
-            work_id = work.get("id")
-            if not work_id:
-                continue
+        df = OpenAlexParser.to_frame(data)
+        schema, lf = df.schema, df.lazy()
+        f = partial(OpenAlexParser.field, schema)
+
+        works = lf.select(
+            pl.col("id"),
+            f("doi").alias("doi"),
+            f("title").alias("title"),
+            f("display_name").alias("display_name"),
+            f("publication_year", dtype=pl.Int64).alias("publication_year"),
+            f("publication_date").alias("publication_date"),
+            f("type").alias("type"),
+            f("cited_by_count", dtype=pl.Int64).alias("cited_by_count"),
+            f("is_retracted", dtype=pl.Boolean).alias("is_retracted"),
+            f("is_paratext", dtype=pl.Boolean).alias("is_paratext"),
+            f("cited_by_api_url").alias("cited_by_api_url"),
+            f("abstract").alias("abstract"),
+            f("language").alias("language"),
+            f("updated_date").alias("updated_date"),
+        )
 
-            # Main work data
-            abstract = OpenAlexParser.invert_abstract(
-                work.get("abstract_inverted_index")
+        # one row per (authorship, institution), or a single row with a null
+        # institution_id if the authorship has no institutions
+        authorships = OpenAlexParser.explode(
+            lf,
+            schema,
+            "work_id",
+            "authorships",
+            {
+                "author_position": ("author_position",),
+                "author_id": ("author", "id"),
+                "institutions": ("institutions",),
+                "raw_affiliation_string": ("raw_affiliation_string",),
+            },
+        ).filter(pl.col("author_id").is_not_null())
+        authorships = authorships.with_row_index("authorship")
+        if isinstance(authorships.collect_schema()["institutions"], pl.List):
+            # null instead of an empty list, so exploding keeps the authorship
+            authorships = authorships.with_columns(
+                pl.when(pl.col("institutions").list.len() > 0).then("institutions")
+            ).explode("institutions")
+        institution_id = OpenAlexParser.field(
+            authorships.collect_schema(), "institutions", "id"
+        )
+        authorships = (
+            authorships.with_columns(institution_id.alias("institution_id"))
+            # keep the null institution_id only if there is no other institution
+            .filter(
+                pl.col("institution_id").is_not_null()
+                | pl.col("institution_id").is_null().all().over("authorship")
             )
-            work_data = {
-                "id": work_id,
-                "doi": work.get("doi"),
-                "title": work.get("title"),
-                "display_name": work.get("display_name"),
-                "publication_year": work.get("publication_year"),
-                "publication_date": work.get("publication_date"),
-                "type": work.get("type"),
-                "cited_by_count": work.get("cited_by_count"),
-                "is_retracted": work.get("is_retracted"),
-                "is_paratext": work.get("is_paratext"),
-                "cited_by_api_url": work.get("cited_by_api_url"),
-                "abstract": abstract,
-                "language": work.get("language"),
-            }
-            results["works"].append(work_data)
-
-            # Authorships
-            for authorship in work.get("authorships") or []:
-                author_id = authorship.get("author", {}).get("id")
-                if author_id:
-                    institutions = authorship.get("institutions") or []
-                    institution_ids = [i.get("id") for i in institutions if i.get("id")]
-
-                    # If no institutions, still create record with null institution_id
-                    if not institution_ids:
-                        results["works_authorships"].append(
-                            {
-                                "work_id": work_id,
-                                "author_position": authorship.get("author_position"),
-                                "author_id": author_id,
-                                "institution_id": None,
-                                "raw_affiliation_string": authorship.get(
-                                    "raw_affiliation_string"
-                                ),
-                            }
-                        )
-                    else:
-                        # Create a record for each institution
-                        for institution_id in institution_ids:
-                            results["works_authorships"].append(
-                                {
-                                    "work_id": work_id,
-                                    "author_position": authorship.get(
-                                        "author_position"
-                                    ),
-                                    "author_id": author_id,
-                                    "institution_id": institution_id,
-                                    "raw_affiliation_string": authorship.get(
-                                        "raw_affiliation_string"
-                                    ),
-                                }
-                            )
-
-            # Concepts
-            for concept in work.get("concepts") or []:
-                if concept_id := concept.get("id"):
-                    results["works_concepts"].append(
-                        {
-                            "work_id": work_id,
-                            "concept_id": concept_id,
-                            "score": concept.get("score"),
-                        }
-                    )
+            .select(
+                "work_id",
+                "author_position",
+                "author_id",
+                "institution_id",
+                "raw_affiliation_string",
+            )
+        )
 
-            # IDs
-            if ids := work.get("ids"):
-                ids_data = {
-                    "work_id": work_id,
-                    "openalex": ids.get("openalex"),
-                    "doi": ids.get("doi"),
-                    "mag": ids.get("mag"),
-                    "pmid": ids.get("pmid"),
-                    "pmcid": ids.get("pmcid"),
-                }
-                results["works_ids"].append(ids_data)
-
-            # Open access
-            if oa := work.get("open_access"):
-                oa_data = {
-                    "work_id": work_id,
-                    "is_oa": oa.get("is_oa"),
-                    "oa_status": oa.get("oa_status"),
-                    "oa_url": oa.get("oa_url"),
-                    "any_repository_has_fulltext": oa.get(
-                        "any_repository_has_fulltext"
-                    ),
-                }
-                results["works_open_access"].append(oa_data)
+        works_concepts = OpenAlexParser.explode(
+            lf,
+            schema,
+            "work_id",
+            "concepts",
+            {"concept_id": ("id",), "score": ("score",)},
+        ).filter(pl.col("concept_id").is_not_null())
+
+        works_ids = lf.filter(f("ids").is_not_null()).select(
+            pl.col("id").alias("work_id"),
+            f("ids", "openalex").alias("openalex"),
+            f("ids", "doi").alias("doi"),
+            f("ids", "mag", dtype=pl.Int64).alias("mag"),
+            f("ids", "pmid").alias("pmid"),
+            f("ids", "pmcid").alias("pmcid"),
+        )
 
-        return results
+        works_open_access = lf.filter(f("open_access").is_not_null()).select(
+            pl.col("id").alias("work_id"),
+            f("open_access", "is_oa", dtype=pl.Boolean).alias("is_oa"),
+            f("open_access", "oa_status").alias("oa_status"),
+            f("open_access", "oa_url").alias("oa_url"),
+            f("open_access", "any_repository_has_fulltext", dtype=pl.Boolean).alias(
+                "any_repository_has_fulltext"
+            ),
+        )
+
+        return OpenAlexParser.collect(
+            {
+                "works": works,
+                "works_authorships": authorships,
+                "works_concepts": works_concepts,
+                "works_ids": works_ids,
+                "works_open_access": works_open_access,
+                "identifiers": identifier_frame(works_ids, "works"),
+            }
+        )
 
 
 class OpenAlexIngestor:
-    """Class to ingest flattened OpenAlex data into DuckDB."""
+    """
+    Class to ingest flattened OpenAlex data into DuckDB.
+
+    Parsed pages are buffered and written in bulk: every flush registers the buffered
+    rows of each table as a single Arrow view and upserts them in one transaction, so
+    the number of statements depends on the number of tables, not on the number of
+    pages. The buffer is flushed automatically once it holds batch_size rows, and when
+    the ingestor is used as a context manager and the block exits.
+
+    The first table of every parsed page is the parent table (e.g. works), keyed by id;
+    the other tables are its child tables, keyed by their first column (e.g. work_id).
+    When a parent row is upserted, its child rows are replaced as a whole: rows of the
+    affected parent ids that are not in the new data are deleted, so re-ingesting a page
+    never duplicates child rows and never leaves stale ones behind.
+
+    usage:
+        with OpenAlexIngestor(db_conn) as ingestor:
+            for page in pages:
+                ingestor.ingest_works(parser.parse_works(page))
+    """
 
-    def __init__(self, db_conn: duckdb.DuckDBPyConnection):
+    def __init__(self, db_conn: duckdb.DuckDBPyConnection, batch_size: int = 100_000):
         self.conn = db_conn
+        self.batch_size = batch_size
+        # entity -> table -> buffered frames, in the order the pages were added
+        self.buffer: dict[str, dict[str, list[pl.DataFrame]]] = {}
+        self.buffered_rows = 0
+        self.pages = 0
 
-    def ingest_authors(self, authors_data: dict[str, list[dict[str, Any]]]) -> None:
+    def __enter__(self) -> "OpenAlexIngestor":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.flush()
+
+    def ingest_authors(self, authors_data: dict[str, pl.DataFrame]) -> None:
         """Ingest authors data into database."""
-        # Authors table
-        if authors_data["authors"]:
-            authors_df = pl.DataFrame(authors_data["authors"])
-            self.conn.execute("""
-                INSERT OR REPLACE INTO openalex.authors
-                SELECT * FROM authors_df
-            """)
-
-        # Authors IDs table
-        if authors_data["authors_ids"]:
-            authors_ids_df = pl.DataFrame(authors_data["authors_ids"])
-            self.conn.execute("""
-                INSERT OR REPLACE INTO openalex.authors_ids
-                SELECT * FROM authors_ids_df
-            """)
-
-        # Authors counts by year
-        if authors_data["authors_counts_by_year"]:
-            counts_df = pl.DataFrame(authors_data["authors_counts_by_year"])
-            self.conn.execute("""
-                INSERT OR REPLACE INTO openalex.authors_counts_by_year
-                SELECT * FROM counts_df
-            """)
-
-    def ingest_concepts(self, concepts_data: dict[str, list[dict[str, Any]]]) -> None:
+        self.add("authors", authors_data)
+
+    def ingest_concepts(self, concepts_data: dict[str, pl.DataFrame]) -> None:
         """Ingest concepts data into database."""
-        # Concepts table
-        if concepts_data["concepts"]:
-            concepts_df = pl.DataFrame(concepts_data["concepts"])
-            self.conn.execute("""
-                INSERT OR REPLACE INTO openalex.concepts
-                SELECT * FROM concepts_df
-            """)
-
-        # Concepts IDs table
-        if concepts_data["concepts_ids"]:
-            concepts_ids_df = pl.DataFrame(concepts_data["concepts_ids"])
-            self.conn.execute("""
-                INSERT OR REPLACE INTO openalex.concepts_ids
-                SELECT * FROM concepts_ids_df
-            """)
-
-        # Concepts ancestors
-        if concepts_data["concepts_ancestors"]:
-            ancestors_df = pl.DataFrame(concepts_data["concepts_ancestors"])
-            self.conn.execute("""
-                INSERT INTO openalex.concepts_ancestors
-                SELECT * FROM ancestors_df
-            """)
-
-        # Concepts counts by year
-        if concepts_data["concepts_counts_by_year"]:
-            counts_df = pl.DataFrame(concepts_data["concepts_counts_by_year"])
-            self.conn.execute("""
-                INSERT OR REPLACE INTO openalex.concepts_counts_by_year
-                SELECT * FROM counts_df
-            """)
-
-        # Concepts related concepts
-        if concepts_data["concepts_related_concepts"]:
-            related_df = pl.DataFrame(concepts_data["concepts_related_concepts"])
-            self.conn.execute("""
-                INSERT INTO openalex.concepts_related_concepts
-                SELECT * FROM related_df
-            """)
-
-    def ingest_works(self, works_data: dict[str, list[dict[str, Any]]]) -> None:
+        self.add("concepts", concepts_data)
+
+    def ingest_works(self, works_data: dict[str, pl.DataFrame]) -> None:
         """Ingest works data into database."""
-        # Works table
-        if works_data["works"]:
-            works_df = pl.DataFrame(works_data["works"])
-            self.conn.execute("""
-                INSERT OR REPLACE INTO openalex.works
-                SELECT * FROM works_df
-            """)
-
-        # Works authorships
-        if works_data["works_authorships"]:
-            authorships_df = pl.DataFrame(works_data["works_authorships"])
-            self.conn.execute("""
-                INSERT INTO openalex.works_authorships
-                SELECT * FROM authorships_df
-            """)
-
-        # Works concepts
-        if works_data["works_concepts"]:
-            concepts_df = pl.DataFrame(works_data["works_concepts"])
-            self.conn.execute("""
-                INSERT INTO openalex.works_concepts
-                SELECT * FROM concepts_df
-            """)
-
-        # Works IDs
-        if works_data["works_ids"]:
-            ids_df = pl.DataFrame(works_data["works_ids"])
-            self.conn.execute("""
-                INSERT OR REPLACE INTO openalex.works_ids
-                SELECT * FROM ids_df
-            """)
-
-        # Works open access
-        if works_data["works_open_access"]:
-            oa_df = pl.DataFrame(works_data["works_open_access"])
-            self.conn.execute("""
-                INSERT OR REPLACE INTO openalex.works_open_access
-                SELECT * FROM oa_df
-            """)
+        self.add("works", works_data)
+
+    def add(self, entity: str, data: dict[str, pl.DataFrame]) -> None:
+        """
+        Add a parsed page to the buffer, and flush the buffer if it is full.
+
+        Args:
+            entity: the name of the parent table (authors, concepts, works)
+            data: the parsed page, as returned by the OpenAlexParser
+        """
+        if data[entity].is_empty():
+            return
+        tables = self.buffer.setdefault(entity, {})
+        for table, df in data.items():
+            # tag the rows with their page, so the latest version of a record wins
+            tables.setdefault(table, []).append(
+                df.with_columns(pl.lit(self.pages, dtype=pl.UInt32).alias("_page"))
+            )
+            self.buffered_rows += df.height
+        self.pages += 1
+        if self.buffered_rows >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all buffered pages to the database, in a single transaction."""
+        if not self.buffer:
+            return
+        self.conn.begin()
+        try:
+            for entity, tables in self.buffer.items():
+                self.upsert_entity(entity, tables)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self.buffer = {}
+            self.buffered_rows = 0
+
+    def upsert_entity(self, entity: str, tables: dict[str, list[pl.DataFrame]]) -> None:
+        """
+        Upsert the buffered rows of a parent table and replace the rows of its child
+        tables for the affected parent ids.
+        """
+        parents = self.latest(pl.concat(tables[entity], how="vertical_relaxed"), ["id"])
+        self.upsert(entity, parents.drop("_page"))
+        # only keep the child rows from the page with the latest version of the parent
+        latest_pages = parents.select("id", "_page")
+        for table, frames in tables.items():
+            if table == entity:
+                continue
+            children = pl.concat(frames, how="vertical_relaxed")
+            key = children.columns[0]
+            children = children.join(
+                latest_pages.rename({"id": key}), on=[key, "_page"], how="semi"
+            ).drop("_page")
+            self.replace_children(table, key, latest_pages.get_column("id"), children)
+
+    def upsert(self, table: str, df: pl.DataFrame) -> None:
+        """Insert the rows of df into table, replacing the rows with the same key."""
+        primary_key = self.primary_key(table)
+        insert = "INSERT OR REPLACE" if primary_key else "INSERT"
+        if primary_key:
+            df = self.latest(df, primary_key)
+        self.conn.register("staged_rows", df.to_arrow())
+        try:
+            self.conn.execute(
+                f"{insert} INTO openalex.{table} BY NAME SELECT * FROM staged_rows"
+            )
+        finally:
+            self.conn.unregister("staged_rows")
+
+    def replace_children(
+        self, table: str, key: str, parent_ids: pl.Series, df: pl.DataFrame
+    ) -> None:
+        """
+        Replace the rows of a child table for the given parent ids with the rows of df.
+        """
+        primary_key = self.primary_key(table)
+        self.conn.register("parent_ids", parent_ids.to_frame("id").to_arrow())
+        self.conn.register("staged_rows", df.to_arrow())
+        try:
+            if primary_key:
+                # rows that are in the new data are replaced in place by the upsert
+                # below, so only delete the stale ones
+                matches = " AND ".join(f"s.{c} = t.{c}" for c in primary_key)
+                self.conn.execute(f"""
+                    DELETE FROM openalex.{table} AS t
+                    WHERE t.{key} IN (SELECT id FROM parent_ids)
+                    AND NOT EXISTS (SELECT 1 FROM staged_rows s WHERE {matches})
+                """)
+            else:
+                self.conn.execute(f"""
+                    DELETE FROM openalex.{table}
+                    WHERE {key} IN (SELECT id FROM parent_ids)
+                """)
+        finally:
+            self.conn.unregister("parent_ids")
+            self.conn.unregister("staged_rows")
+        if not df.is_empty():
+            self.upsert(table, df)
+
+    def primary_key(self, table: str) -> list[str]:
+        """Get the primary key columns of a table, empty if it has none."""
+        row = self.conn.execute(
+            """
+            SELECT constraint_column_names FROM duckdb_constraints()
+            WHERE schema_name = 'openalex' AND table_name = ?
+            AND constraint_type = 'PRIMARY KEY'
+            """,
+            [table],
+        ).fetchone()
+        return list(row[0]) if row else []
+
+    @staticmethod
+    def latest(df: pl.DataFrame, key: list[str]) -> pl.DataFrame:
+        """Deduplicate df on key, keeping the last row of every key."""
+        return df.unique(subset=key, keep="last", maintain_order=True)
 
 
 async def retrieve_and_ingest(
@@ -893,27 +1108,209 @@ async def retrieve_and_ingest(
 
     # Parse based on entity type
     parser = OpenAlexParser()
-    ingestor = OpenAlexIngestor(db_conn)
-
-    if entity_type == "authors":
-        parsed_data = parser.parse_authors(data_dicts)
-        ingestor.ingest_authors(parsed_data)
-    elif entity_type == "concepts":
-        parsed_data = parser.parse_concepts(data_dicts)
-        ingestor.ingest_concepts(parsed_data)
-    elif entity_type == "works":
-        parsed_data = parser.parse_works(data_dicts)
-        ingestor.ingest_works(parsed_data)
-    else:
-        # Handle other entity types if needed
-        return count, data_dicts
+
+    with OpenAlexIngestor(db_conn) as ingestor:
+        if entity_type == "authors":
+            parsed_data = parser.parse_authors(data_df)
+            ingestor.ingest_authors(parsed_data)
+        elif entity_type == "concepts":
+            parsed_data = parser.parse_concepts(data_df)
+            ingestor.ingest_concepts(parsed_data)
+        elif entity_type == "works":
+            parsed_data = parser.parse_works(data_df)
+            ingestor.ingest_works(parsed_data)
+        else:
+            # Handle other entity types if needed
+            return count, data_dicts
 
     return count, data_dicts
 
 
+# the max page size of the OpenAlex api
+HARVEST_PAGE_SIZE = 200
+# the number of pages that are ingested between two checkpoints
+HARVEST_CHECKPOINT_PAGES = 25
+
+
+async def get_cursor_page(
+    search_str: str,
+    entity_type: str,
+    client: httpx.AsyncClient,
+    cursor: str,
+    filter_str: str | None = None,
+) -> tuple[int, str | None, pl.DataFrame]:
+    """Get a page of search results with cursor pagination.
+
+    An empty search_str matches all records, a filter_str (e.g.
+    from_updated_date:2025-01-01) restricts the results.
+
+    Returns
+    -------
+    tuple[int, str | None, pl.DataFrame]
+        The total number of results, the cursor of the next page (None after the last
+        page) and the results of this page.
+    """
+    params = {"per-page": HARVEST_PAGE_SIZE, "cursor": cursor}
+    if search_str:
+        params["search"] = search_str
+    if filter_str:
+        params["filter"] = filter_str
+    if OPENALEX_API_KEY:
+        params["api_key"] = OPENALEX_API_KEY
+    response = await client.get(
+        f"https://api.openalex.org/{entity_type}", params=params
+    )
+    response.raise_for_status()
+    data: dict[str, dict | list[dict]] = response.json()
+    meta = data.get("meta", {})
+    results = data.get("results", [])
+    next_cursor = meta.get("next_cursor") if results else None
+    return meta.get("count") or 0, next_cursor, results_frame(results)
+
+
+async def harvest(  # noqa: PLR0913
+    search_str: str,
+    entity_type: str,
+    client: httpx.AsyncClient,
+    db_conn: duckdb.DuckDBPyConnection,
+    checkpoint_path: Path | str | None = None,
+    *,
+    filter_str: str | None = None,
+) -> int:
+    """Retrieve all results of a search and ingest them into the database.
+
+    Walks the cursor pagination of the OpenAlex api, fetching the next page while
+    the current one is parsed and ingested. If a checkpoint_path is given, the query
+    is saved there when the harvest starts, and the cursor of the next page every
+    HARVEST_CHECKPOINT_PAGES pages, after the pages before it were written to the
+    database. A harvest of the same search that
+    finds the checkpoint continues from there; the checkpoint is removed once the
+    harvest is complete.
+
+    Returns
+    -------
+    int
+        The number of records harvested, including those of earlier runs.
+    """
+    parsers = {
+        "authors": (OpenAlexParser.parse_authors, OpenAlexIngestor.ingest_authors),
+        "concepts": (OpenAlexParser.parse_concepts, OpenAlexIngestor.ingest_concepts),
+        "works": (OpenAlexParser.parse_works, OpenAlexIngestor.ingest_works),
+    }
+    if entity_type not in parsers:
+        raise ValueError(f"Can't harvest {entity_type}, only {', '.join(parsers)}")
+    parse, ingest = parsers[entity_type]
+
+    checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+    query = {"search": search_str, "entity_type": entity_type, "filter": filter_str}
+    checkpoint = query | {"cursor": "*", "pages": 0, "records": 0}
+    if checkpoint_path and checkpoint_path.exists():
+        saved = srsly.read_json(checkpoint_path)
+        if all(saved.get(key) == value for key, value in query.items()):
+            print(f"Resuming harvest after {saved['records']} records")
+            checkpoint = saved
+
+    def write_checkpoint() -> None:
+        if checkpoint_path:
+            tmp_path = checkpoint_path.with_suffix(".tmp")
+            srsly.write_json(tmp_path, checkpoint)
+            tmp_path.replace(checkpoint_path)
+
+    def save_checkpoint() -> None:
+        ingestor.flush()
+        write_checkpoint()
+
+    def ingest_page(page: pl.DataFrame) -> None:
+        ingest(ingestor, parse(page))
+        if checkpoint["pages"] % HARVEST_CHECKPOINT_PAGES == 0:
+            save_checkpoint()
+
+    fetch = partial(
+        get_cursor_page, search_str, entity_type, client, filter_str=filter_str
+    )
+    # record the query before anything is ingested
+    write_checkpoint()
+    with OpenAlexIngestor(db_conn) as ingestor:
+        cursor = checkpoint["cursor"]
+        next_page = asyncio.create_task(fetch(cursor)) if cursor else None
+        try:
+            while next_page is not None:
+                count, cursor, page = await next_page
+                next_page = asyncio.create_task(fetch(cursor)) if cursor else None
+                checkpoint |= {
+                    "cursor": cursor,
+                    "pages": checkpoint["pages"] + 1,
+                    "records": checkpoint["records"] + page.height,
+                }
+                if not page.is_empty():
+                    # in a thread, so the next page is retrieved in the meantime
+                    await asyncio.to_thread(ingest_page, page)
+                print(f"Harvested {checkpoint['records']} of {count} {entity_type}")
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    if checkpoint_path:
+        checkpoint_path.unlink(missing_ok=True)
+    return checkpoint["records"]
+
+
+# the entities that are kept up to date by sync()
+SYNC_ENTITIES = ("works", "authors")
+SYNC_CHECKPOINT_DIR = CACHE_DIR / "sync"
+
+
+async def sync(
+    client: httpx.AsyncClient,
+    db_conn: duckdb.DuckDBPyConnection,
+    entity_types: tuple[str, ...] = SYNC_ENTITIES,
+    search_str: str = "",
+) -> dict[str, int]:
+    """Fetch the records that changed since the last sync and upsert them.
+
+    For every entity type, only the records with an updated_date after the latest
+    updated_date in the database are harvested (with the from_updated_date filter),
+    optionally restricted to a search. An interrupted sync resumes from its
+    checkpoint with the same filter, since the latest updated_date in the database
+    has moved on by then. Entity types without any data are skipped: load them with
+    a full harvest (or a snapshot) first.
+
+    Returns
+    -------
+    dict[str, int]
+        The number of records synced per entity type.
+    """
+    synced = {}
+    for entity_type in entity_types:
+        checkpoint_path = SYNC_CHECKPOINT_DIR / f"{entity_type}.json"
+        if checkpoint_path.exists():
+            filter_str = srsly.read_json(checkpoint_path)["filter"]
+        else:
+            (last_updated,) = db_conn.execute(
+                f"SELECT max(updated_date) FROM openalex.{entity_type}"
+            ).fetchone()
+            if last_updated is None:
+                print(f"No {entity_type} to sync, harvest them first")
+                continue
+            filter_str = (
+                f"from_updated_date:{last_updated.isoformat(timespec='seconds')}"
+            )
+        checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        print(f"Syncing {entity_type} with {filter_str}")
+        synced[entity_type] = await harvest(
+            search_str,
+            entity_type,
+            client,
+            db_conn,
+            checkpoint_path,
+            filter_str=filter_str,
+        )
+    return synced
+
+
 async def main():
     """Example usage of the functions."""
-    client = httpx.AsyncClient()
+    client = get_async_client()
     db_conn = create_duckdb_connection()
 
     # Initialize database schema if needed
@@ -939,5 +1336,49 @@ async def main():
     db_conn.close()
 
 
+async def sync_main(
+    entity_types: tuple[str, ...], db_path: str, search_str: str
+) -> None:
+    """Sync the database at db_path, see sync()."""
+    client = get_async_client()
+    db_conn = create_duckdb_connection(db_path)
+    setup_duckdb_schema(db_conn)
+
+    synced = await sync(client, db_conn, entity_types, search_str)
+    for entity_type, records in synced.items():
+        print(f"Synced {records} {entity_type}")
+
+    await client.aclose()
+    db_conn.close()
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Retrieve OpenAlex data into DuckDB.")
+    subparsers = parser.add_subparsers(dest="command")
+    sync_parser = subparsers.add_parser(
+        "sync", help="fetch the records updated since the last sync"
+    )
+    sync_parser.add_argument(
+        "entities",
+        nargs="*",
+        help=f"the entities to sync: {', '.join(SYNC_ENTITIES)} (default: all)",
+    )
+    sync_parser.add_argument(
+        "--db",
+        default="openalex_data.duckdb",
+        help="the DuckDB database to sync (default: openalex_data.duckdb)",
+    )
+    sync_parser.add_argument(
+        "--search",
+        default="",
+        help="only sync the records that match this search",
+    )
+    args = parser.parse_args()
+
+    if args.command == "sync":
+        if unknown := set(args.entities) - set(SYNC_ENTITIES):
+            sync_parser.error(f"unknown entities: {', '.join(sorted(unknown))}")
+        entities = tuple(args.entities) or SYNC_ENTITIES
+        asyncio.run(sync_main(entities, args.db, args.search))
+    else:
+        asyncio.run(main())